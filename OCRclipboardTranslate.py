@@ -1,29 +1,3391 @@
 #!/usr/bin/env python3
 import os
+import sys
+import socket
 import tempfile
+
+
+# --- Cliente da instância única ---
+# Vem antes dos demais imports: `capture`, `show` e `quit` repassados a uma
+# instância aberta não carregam Tk, sqlite3, ctypes etc. (ver InstanceServer)
+
+def instance_socket_path():
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime, f"ocrclipboardtranslate-{os.getuid()}.sock")
+
+
+def send_command(command, path=None, timeout=2.0):
+    # Resposta da instância em execução, ou None se não houver nenhuma
+    path = path or instance_socket_path()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(command.encode("utf-8") + b"\n")
+            return sock.makefile("r", encoding="utf-8").readline().strip()
+    except OSError:
+        return None
+
+
+def run_client(argv):
+    # Só o subcomando, sem opções: se uma instância responder, sai aqui.
+    # Senão (ou com opções), segue para o main() completo
+    if len(argv) == 1 and argv[0] in ("capture", "show", "quit"):
+        if send_command(argv[0]) is not None:
+            sys.exit(0)
+
+
+if __name__ == "__main__":
+    run_client(sys.argv[1:])
+
+import json
+import shutil
+import argparse
+import re
+import urllib.parse
+import glob
 import subprocess
+import threading
+import queue
 import time
+import itertools
+import math
+import io
+import ctypes
+import ctypes.util
+import select
+import errno
+import struct
+import hashlib
+import difflib
+import html
+import sqlite3
+import importlib.util
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed, wait)
 import tkinter as tk
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk, ImageEnhance
-import pytesseract
-from googletrans import Translator
+from tkinter import ttk, messagebox, filedialog
+
+
+def lazy_import(name):
+    # O módulo só é carregado de fato no primeiro acesso a um atributo, para
+    # a janela aparecer antes de numpy/PIL serem importados
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageTk = lazy_import("PIL.ImageTk")
+_modules_lock = threading.Lock()
+
+
+def load_modules():
+    # Primeiro acesso aos módulos lazy, serializado entre as threads (o
+    # carregamento do LazyLoader não é thread-safe)
+    with _modules_lock:
+        np.ndarray, Image.Image, ImageTk.PhotoImage
+
+
+def import_signal_modules():
+    # O tesserocr (via cysignals) instala handlers de sinal ao ser
+    # importado, o que só funciona na thread principal. Chamado nela antes
+    # de o motor ser criado em segundo plano; o resto do import segue lá
+    try:
+        importlib.import_module("cysignals")
+    except ImportError:
+        pass
+
+# Intervalo (ms) de leitura da fila de resultados pela UI
+POLL_MS = 50
+
+# Espera (ms) entre esconder a janela e ler a tela na captura nativa
+NATIVE_CAPTURE_DELAY_MS = 80
+
+# Idiomas do Tesseract
+OCR_LANG = "por+eng"
+
+# Configuração do usuário (JSON), sobreposta aos valores padrão
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".config",
+                           "ocrclipboardtranslate", "config.json")
+DEFAULT_CONFIG = {
+    # auto | tesserocr | pytesseract
+    "ocr_engine": "auto",
+    # Idiomas do Tesseract; "auto" escolhe o pacote pelo idioma detectado
+    "ocr_lang": "auto",
+    # Instâncias do Tesseract mantidas carregadas por idioma (0 = nº de CPUs)
+    "ocr_workers": 0,
+    # Capturas com pelo menos esta altura (px) são segmentadas em blocos,
+    # com OCR em paralelo e texto exibido bloco a bloco
+    "stream_min_height": 300,
+    "stream_block_lines": 6,
+    # x11 (seleção própria, captura em memória) | gnome-screenshot (arquivo)
+    # | maim (PNG direto pelo stdout); auto = x11 quando disponível
+    "capture_tool": "auto",
+    # Tempo máximo (s) esperando o arquivo da captura aparecer
+    "capture_timeout": 10,
+    # OCR adaptativo: modo de segmentação e escala escolhidos pela geometria
+    # da captura; abaixo desta confiança média (0-100) o OCR é refeito no
+    # modo completo
+    "ocr_adaptive": True,
+    "ocr_min_confidence": 60,
+    # Cadeia de pré-processamento (ver PREPROCESS_STAGES)
+    "preprocess": ["gray", "invert", "upscale", "sauvola"],
+    # Teto (MB) estimado para pré-processamento + OCR de uma captura; acima
+    # dele a imagem é processada em faixas (0 = sem limite)
+    "memory_limit_mb": 1024,
+    # Idiomas de destino (códigos ISO, ex. ["pt", "en"]); com mais de um, as
+    # traduções rodam em paralelo a partir do mesmo OCR
+    "target_langs": ["pt"],
+    # Tradução: googletrans | argos (offline) | libretranslate (HTTP)
+    "translation_backend": "googletrans",
+    "translation_url": "http://localhost:5000",
+    "translation_source": "auto",
+    "translation_timeout": 10,
+    # Modo daemon: texto devolvido ao clipboard (ocr | traducao), intervalo
+    # de polling sem clipnotify e espera (s) para agrupar rajadas
+    "daemon_output": "ocr",
+    "daemon_poll": 0.5,
+    "daemon_debounce": 0.4,
+    # Resultado publicado sozinho no clipboard a cada captura, junto com a
+    # imagem (ocr | traducao; vazio = só ao copiar)
+    "clipboard_publish": "",
+    # Cache de resultados: entradas em memória e limite do arquivo SQLite
+    # (0 desativa o disco)
+    "cache_memory_entries": 256,
+    "cache_disk_mb": 64,
+    "cache_path": os.path.join(os.path.expanduser("~"), ".cache",
+                               "ocrclipboardtranslate", "cache.sqlite3"),
+    # Histórico de capturas (SQLite + FTS5); vazio desativa
+    "history_path": os.path.join(os.path.expanduser("~"), ".local", "share",
+                                 "ocrclipboardtranslate", "history.sqlite3"),
+    # Modo observar área: intervalo (s) entre recapturas e fração mínima de
+    # pixels alterados para o quadro contar como mudado
+    "watch_interval": 1.0,
+    "watch_sensitivity": 0.001,
+    # Memória de tradução: frases já traduzidas, iguais ou quase iguais
+    # (erros de OCR), não voltam ao tradutor. Caminho vazio desativa;
+    # `similarity` é a semelhança mínima (0-1) para aproveitar uma frase
+    "translation_memory_path": os.path.join(os.path.expanduser("~"), ".local", "share",
+                                            "ocrclipboardtranslate", "memory.sqlite3"),
+    "translation_memory_entries": 20000,
+    "translation_memory_similarity": 0.9,
+    # Instância única: novas execuções repassam a captura à que já está
+    # aberta; com stay_resident, fechar a janela só a esconde
+    "single_instance": True,
+    "stay_resident": False,
+    # Métricas por estágio: linha na janela com os tempos da última captura,
+    # tamanho da janela móvel dos percentis e arquivo exportado a cada
+    # captura (.prom = texto do Prometheus, senão JSON; vazio desativa)
+    "metrics_status": False,
+    "metrics_window": 512,
+    "metrics_export": "",
+}
+
+
+def load_config(path=CONFIG_PATH):
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(path, encoding="utf-8") as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Aviso: configuração ignorada ({path}): {e}", file=sys.stderr)
+    return config
+
+
+# Título da caixa de erro por estágio
+ERROR_TITLES = {
+    "imagem": "Erro ao abrir imagem",
+    "observar": "Erro ao observar a área",
+    "ocr": "Erro OCR",
+}
+
+
+# --- Pré-processamento (NumPy) ---
+# Cada estágio recebe e devolve um array uint8 (H, W); a cadeia é
+# configurável em "preprocess" como lista de nomes ou [nome, {params}].
+
+def image_to_array(img):
+    if img.mode not in ('L', 'RGB', 'RGBA'):
+        img = img.convert('RGB')
+    return np.asarray(img)
+
+
+def _histogram(arr):
+    return np.bincount(arr.ravel(), minlength=256)
+
+
+def _apply_lut(arr, lut):
+    return np.clip(lut, 0, 255).astype(np.uint8)[arr]
+
+
+def stage_gray(arr):
+    if arr.ndim == 2:
+        return arr
+    rgb = arr[..., :3].astype(np.float32)
+    gray = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return (gray + 0.5).astype(np.uint8)
+
+
+def stage_invert(arr):
+    # Screenshots em modo escuro: fundo predominante escuro → inverte
+    hist = _histogram(arr)
+    if hist[:128].sum() > hist[128:].sum():
+        return 255 - arr
+    return arr
+
+
+def stage_stretch(arr, low=1.0, high=99.0):
+    cdf = np.cumsum(_histogram(arr)) / arr.size
+    lo = int(np.searchsorted(cdf, low / 100))
+    hi = int(np.searchsorted(cdf, high / 100))
+    if hi - lo < 1:
+        return arr
+    lut = (np.arange(256, dtype=np.float32) - lo) * (255.0 / (hi - lo))
+    return _apply_lut(arr, lut)
+
+
+def stage_contrast(arr, factor=2.0):
+    # Equivalente vetorizado de ImageEnhance.Contrast
+    hist = _histogram(arr)
+    mean = int(np.dot(hist, np.arange(256)) / arr.size + 0.5)
+    lut = mean + factor * (np.arange(256, dtype=np.float32) - mean)
+    return _apply_lut(arr, lut)
+
+
+def stage_threshold(arr, level=128):
+    return _apply_lut(arr, np.where(np.arange(256) < level, 0, 255))
+
+
+def stage_otsu(arr):
+    hist = _histogram(arr).astype(np.float64)
+    omega = np.cumsum(hist)
+    mu = np.cumsum(hist * np.arange(256))
+    total = omega[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mu[-1] * omega - mu * total) ** 2 / (omega * (total - omega))
+    if not np.isfinite(between).any():
+        # Imagem de um tom só: nada a separar
+        return stage_threshold(arr, 128)
+    level = int(np.nanargmax(between)) + 1
+    return stage_threshold(arr, level)
+
+
+def _box_sum(a, window):
+    # Soma em janela via imagem integral. As operações são in-place para
+    # manter o pico de memória perto de 3 cópias float64 da entrada
+    r = window // 2
+    padded = np.pad(a, r, mode='edge')
+    ii = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1))
+    np.cumsum(padded, 0, out=ii[1:, 1:])
+    del padded
+    np.cumsum(ii[1:, 1:], 1, out=ii[1:, 1:])
+    w = 2 * r + 1
+    out = ii[w:, w:] - ii[:-w, w:]
+    out -= ii[w:, :-w]
+    out += ii[:-w, :-w]
+    return out
+
+
+def stage_sauvola(arr, window=25, k=0.2, r=128.0):
+    # Limiar local: lida com fundos irregulares (gradientes, sombras)
+    a = arr.astype(np.float64)
+    n = float((2 * (window // 2) + 1) ** 2)
+    mean = _box_sum(a, window)
+    mean /= n
+    np.square(a, out=a)
+    std = _box_sum(a, window)
+    del a
+    std /= n
+    # std = sqrt(max(E[x²] - média², 0)); limiar = média * (1 + k * (std / r - 1))
+    std -= mean * mean
+    np.maximum(std, 0, out=std)
+    np.sqrt(std, out=std)
+    std /= r
+    std -= 1
+    std *= k
+    std += 1
+    std *= mean
+    del mean
+    return np.where(arr > std, 255, 0).astype(np.uint8)
+
+
+def _resize_bilinear(arr, factor):
+    h, w = arr.shape
+    nh, nw = max(1, int(round(h * factor))), max(1, int(round(w * factor)))
+    ys = np.clip((np.arange(nh) + 0.5) / factor - 0.5, 0, h - 1)
+    xs = np.clip((np.arange(nw) + 0.5) / factor - 0.5, 0, w - 1)
+    y0 = ys.astype(np.intp)
+    x0 = xs.astype(np.intp)
+    y1 = np.minimum(y0 + 1, h - 1)
+    x1 = np.minimum(x0 + 1, w - 1)
+    wy = (ys - y0).astype(np.float32)[:, None]
+    wx = (xs - x0).astype(np.float32)
+    a = arr.astype(np.float32)
+    top = a[y0][:, x0] * (1 - wx) + a[y0][:, x1] * wx
+    bottom = a[y1][:, x0] * (1 - wx) + a[y1][:, x1] * wx
+    return (top * (1 - wy) + bottom * wy + 0.5).astype(np.uint8)
+
+
+def text_line_height(arr):
+    # Mediana da altura das faixas de linhas com "tinta" (pixels escuros)
+    rows = (arr < 128).any(axis=1).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], rows, [0])))
+    runs = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    return float(np.median(runs)) if runs.size else 0.0
+
+
+def upscale_factor(height, target=32, max_factor=3.0):
+    # 1.0 quando o texto já tem tamanho suficiente (ou não há texto)
+    if height <= 0 or height >= target:
+        return 1.0
+    factor = min(max_factor, target / height)
+    return factor if factor >= 1.2 else 1.0
+
+
+def stage_upscale(arr, target=32, max_factor=3.0):
+    # Texto miúdo: amplia até a altura de linha chegar perto de `target`
+    factor = upscale_factor(text_line_height(arr), target, max_factor)
+    if factor == 1.0:
+        return arr
+    return _resize_bilinear(arr, factor)
+
+
+def estimate_skew(arr, max_angle=5.0, step=0.5):
+    # Ângulo que maximiza a variância da projeção horizontal da "tinta"
+    stride = max(1, arr.shape[1] // 800)
+    small = arr[::stride, ::stride]
+    ys, xs = np.nonzero(small < 128)
+    if ys.size < 50:
+        return 0.0
+    best, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        t = np.deg2rad(angle)
+        proj = np.round(ys * np.cos(t) - xs * np.sin(t)).astype(np.intp)
+        proj -= proj.min()
+        score = float(np.square(np.bincount(proj)).sum())
+        if score > best_score:
+            best, best_score = float(angle), score
+    return best
+
+
+def _rotate(arr, angle, fill=255):
+    h, w = arr.shape
+    t = np.deg2rad(angle)
+    cy, cx = (h - 1) / 2, (w - 1) / 2
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    yy -= cy
+    xx -= cx
+    src_y = np.round(yy * np.cos(t) + xx * np.sin(t) + cy).astype(np.intp)
+    src_x = np.round(xx * np.cos(t) - yy * np.sin(t) + cx).astype(np.intp)
+    valid = (src_y >= 0) & (src_y < h) & (src_x >= 0) & (src_x < w)
+    out = np.full_like(arr, fill)
+    out[valid] = arr[src_y[valid], src_x[valid]]
+    return out
+
+
+def stage_deskew(arr, max_angle=5.0, step=0.5):
+    angle = estimate_skew(arr, max_angle, step)
+    if abs(angle) < step:
+        return arr
+    return _rotate(arr, angle)
+
+
+PREPROCESS_STAGES = {
+    "gray": stage_gray,
+    "invert": stage_invert,
+    "stretch": stage_stretch,
+    "contrast": stage_contrast,
+    "threshold": stage_threshold,
+    "otsu": stage_otsu,
+    "sauvola": stage_sauvola,
+    "upscale": stage_upscale,
+    "deskew": stage_deskew,
+}
+
+# Cadeia da versão original (contraste 2.0 + limiar fixo 128)
+LEGACY_PREPROCESS = ["gray", "contrast", "threshold"]
+
+
+def parse_chain(chain):
+    stages = []
+    for item in chain:
+        if isinstance(item, str):
+            name, params = item, {}
+        else:
+            name, params = item[0], dict(item[1]) if len(item) > 1 else {}
+        if name not in PREPROCESS_STAGES:
+            raise ValueError(f"Estágio de pré-processamento desconhecido: {name}")
+        stages.append((name, PREPROCESS_STAGES[name], params))
+    return stages
+
+
+def run_preprocess(arr, chain, timings=None):
+    # `timings`, se dado, recebe o tempo (s) de cada estágio
+    stages = parse_chain(chain)
+    if arr.ndim == 3 and (not stages or stages[0][0] != "gray"):
+        stages.insert(0, ("gray", stage_gray, {}))
+    for name, func, params in stages:
+        start = time.perf_counter()
+        arr = func(arr, **params)
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+    return arr
+
+
+# --- Capturas grandes: estimativa de memória e processamento em faixas ---
+
+# Pico de memória de cada estágio, em bytes por pixel da entrada (medido com
+# tracemalloc); "upscale" é por pixel da saída
+PREPROCESS_BYTES_PER_PIXEL = {
+    "gray": 21, "invert": 8, "stretch": 8, "contrast": 8, "threshold": 2,
+    "otsu": 8, "sauvola": 33, "upscale": 17, "deskew": 20,
+}
+# Tesseract, por pixel da imagem binarizada
+OCR_BYTES_PER_PIXEL = 8
+# Faixa mínima antes de reduzir a resolução para caber no limite
+MIN_TILE_ROWS = 128
+
+
+def expected_scale(arr, chain):
+    # Fator do estágio upscale para `arr` (cinza), estimado numa amostra de
+    # colunas; 1.0 se a cadeia não amplia
+    for name, _, params in parse_chain(chain):
+        if name == "upscale":
+            sample = stage_invert(arr[:, ::4])
+            return upscale_factor(text_line_height(sample), **params)
+    return 1.0
+
+
+def estimate_peak_bytes(pixels, chain, scale=1.0):
+    # Pico aproximado de pré-processamento + OCR de uma imagem com `pixels`
+    area = 1.0
+    peak = 0.0
+    for name, _, _ in parse_chain(chain):
+        if name == "upscale":
+            area = scale * scale
+        peak = max(peak, PREPROCESS_BYTES_PER_PIXEL[name] * area)
+    return pixels * (max(peak, OCR_BYTES_PER_PIXEL * area) + area)
+
+
+def row_activity(arr, chunk=256):
+    # Soma das variações horizontais de cada linha: alta onde há texto,
+    # baixa em fundos lisos (claros ou escuros). Em blocos de linhas, para
+    # não alocar uma cópia int16 da imagem inteira
+    out = np.empty(arr.shape[0], dtype=np.int64)
+    for top in range(0, arr.shape[0], chunk):
+        band = arr[top:top + chunk].astype(np.int16)
+        out[top:top + chunk] = np.abs(np.diff(band, axis=1)).sum(axis=1)
+    return out
+
+
+def tile_cuts(arr, rows):
+    # Faixas de ~`rows` linhas, cortadas na linha de menor atividade
+    # (fundo) perto de cada divisa, para não partir linhas de texto
+    height = arr.shape[0]
+    activity = row_activity(arr)
+    tiles, top = [], 0
+    while height - top > rows:
+        lo = top + rows * 3 // 4
+        hi = min(height - 1, top + rows * 5 // 4)
+        cut = lo + int(np.argmin(activity[lo:hi]))
+        tiles.append((top, cut))
+        top = cut
+    tiles.append((top, height))
+    return tiles
+
+
+class TiledCapture:
+    # Captura grande demais para o teto de memória: segue em tons de cinza
+    # até o OCR, que pré-processa e reconhece uma faixa por vez (no máximo
+    # `parallel` faixas em memória ao mesmo tempo)
+    def __init__(self, gray, tiles, parallel):
+        self.gray = gray
+        self.tiles = tiles
+        self.parallel = parallel
+
+
+def plan_tiles(img, chain, limit, workers):
+    # None se a captura inteira cabe em `limit` bytes; senão, TiledCapture.
+    # Se nem uma faixa mínima couber, reduz a resolução pela metade
+    if img.width * img.height * estimate_peak_bytes(1, chain, 3.0) <= limit:
+        return None
+    gray = img.convert('L')
+    while True:
+        arr = np.asarray(gray)
+        per_row = estimate_peak_bytes(gray.width, chain, expected_scale(arr, chain))
+        if gray.height * per_row <= limit:
+            return None if gray.size == img.size else TiledCapture(gray, [(0, gray.height)], 1)
+        # A imagem original e a cinza continuam em memória
+        budget = limit - img.width * img.height * 3 - 2 * arr.nbytes
+        parallel = workers
+        while parallel > 1 and budget / parallel / per_row < MIN_TILE_ROWS:
+            parallel //= 2
+        rows = int(budget / parallel / per_row)
+        if rows >= MIN_TILE_ROWS or gray.height <= MIN_TILE_ROWS:
+            return TiledCapture(gray, tile_cuts(arr, max(rows, MIN_TILE_ROWS)), parallel)
+        print(f"Aviso: captura {gray.width}x{gray.height} acima do limite de memória, "
+              "reduzindo a resolução", file=sys.stderr)
+        del arr
+        gray = gray.reduce(2)
+
+
+# --- Prévia: miniatura e zoom por blocos ---
+# A miniatura sai da imagem já decodificada (PNG não tem decodificação
+# reduzida) numa thread própria, fora do caminho até o OCR. O zoom da
+# prévia é montado com blocos de PREVIEW_TILE px na escala pedida, gerados
+# só quando entram na área visível e reaproveitados ao arrastar.
+
+PREVIEW_SIZE = (500, 200)
+PREVIEW_TILE = 256
+# Escala máxima do zoom (2 = 200%)
+PREVIEW_MAX_ZOOM = 2.0
+
+
+def make_thumbnail(img, size=PREVIEW_SIZE):
+    # reducing_gap: reduce() por fator inteiro até ~2x o tamanho final e só
+    # então o filtro. Em reduções grandes o BILINEAR fica igual ao LANCZOS
+    # na miniatura e custa menos; o LANCZOS fica para as pequenas
+    ratio = min(size[0] / img.width, size[1] / img.height, 1.0)
+    dims = (max(1, round(img.width * ratio)), max(1, round(img.height * ratio)))
+    if dims == img.size:
+        return img.copy()
+    resample = Image.LANCZOS if ratio > 0.5 else Image.BILINEAR
+    return img.resize(dims, resample, reducing_gap=2.0)
+
+
+class PreviewTiles:
+    # Blocos da captura em cada escala do zoom, gerados sob demanda. `source`
+    # é a imagem ou os bytes PNG (decodificados só no primeiro zoom)
+    def __init__(self, source, entries=64):
+        self.source = source
+        self.tiles = LRUCache(entries)
+
+    def image(self):
+        if isinstance(self.source, bytes):
+            img = Image.open(io.BytesIO(self.source))
+            img.load()
+            self.source = img if img.mode in ("RGB", "RGBA", "L") else img.convert("RGB")
+        return self.source
+
+    def scaled_size(self, scale):
+        img = self.image()
+        return max(1, round(img.width * scale)), max(1, round(img.height * scale))
+
+    def tile(self, scale, tx, ty):
+        key = (scale, tx, ty)
+        tile = self.tiles.get(key)
+        if tile is None:
+            img = self.image()
+            width, height = self.scaled_size(scale)
+            left, top = tx * PREVIEW_TILE, ty * PREVIEW_TILE
+            right, bottom = min(left + PREVIEW_TILE, width), min(top + PREVIEW_TILE, height)
+            # Só a região do bloco é lida da captura (box), sem reduzir a inteira
+            box = (left / scale, top / scale,
+                   min(right / scale, img.width), min(bottom / scale, img.height))
+            tile = img.resize((right - left, bottom - top), Image.BILINEAR, box=box,
+                              reducing_gap=2.0 if scale < 0.5 else None)
+            self.tiles.put(key, tile)
+        return tile
+
+    def render(self, view, size):
+        # Área visível `size` da vista (escala, x0, y0), com x0/y0 em px da
+        # imagem já na escala
+        scale, x0, y0 = view
+        width, height = self.scaled_size(scale)
+        out = Image.new(self.image().mode, size, "white")
+        last_x = (min(x0 + size[0], width) - 1) // PREVIEW_TILE
+        last_y = (min(y0 + size[1], height) - 1) // PREVIEW_TILE
+        for ty in range(y0 // PREVIEW_TILE, last_y + 1):
+            for tx in range(x0 // PREVIEW_TILE, last_x + 1):
+                out.paste(self.tile(scale, tx, ty),
+                          (tx * PREVIEW_TILE - x0, ty * PREVIEW_TILE - y0))
+        return out
+
+
+def segment_blocks(arr, max_lines=6, gap_factor=1.5, pad=4):
+    # Faixas horizontais de texto: linhas com "tinta" agrupadas em blocos,
+    # quebrando em espaços maiores que `gap_factor` linhas ou a cada
+    # `max_lines` linhas. Devolve [(topo, base)].
+    rows = (arr < 128).any(axis=1).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], rows, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if starts.size == 0:
+        return []
+    max_gap = gap_factor * float(np.median(ends - starts))
+    blocks = []
+    top, bottom, lines = starts[0], ends[0], 1
+    for start, end in zip(starts[1:], ends[1:]):
+        if start - bottom > max_gap or lines >= max_lines:
+            blocks.append((top, bottom))
+            top, lines = start, 0
+        bottom = end
+        lines += 1
+    blocks.append((top, bottom))
+    height = arr.shape[0]
+    return [(max(0, int(t) - pad), min(height, int(b) + pad)) for t, b in blocks]
+
+
+def preprocess_image(img, chain=None, timings=None):
+    if chain is None:
+        chain = DEFAULT_CONFIG["preprocess"]
+    arr = run_preprocess(image_to_array(img), chain, timings)
+    return Image.fromarray(arr)
+
+
+# --- Resultado estruturado do OCR ---
+# Um reconhecimento guarda cada palavra com caixa e confiança em arrays
+# paralelos (uma posição por palavra); linhas e blocos (parágrafos) são
+# índices crescentes. O texto, as exportações (hOCR, TSV, JSON) e a
+# sobreposição na prévia saem daqui, sem nova chamada ao Tesseract.
+
+class OCRResult:
+    __slots__ = ("size", "words", "boxes", "conf", "line", "block")
+
+    def __init__(self, size, words, boxes, conf, line, block):
+        # `size`: (largura, altura) da imagem a que as caixas se referem;
+        # cada caixa é (esquerda, topo, direita, base)
+        n = len(words)
+        self.size = (int(size[0]), int(size[1]))
+        self.words = list(words)
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(n, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(n)
+        self.line = np.asarray(line, dtype=np.int32).reshape(n)
+        self.block = np.asarray(block, dtype=np.int32).reshape(n)
+
+    @classmethod
+    def empty(cls, size):
+        return cls(size, [], [], [], [], [])
+
+    @classmethod
+    def from_words(cls, size, items):
+        # `items`: (texto, caixa, confiança, novo bloco, nova linha) na ordem
+        # de leitura; palavras vazias são descartadas sem perder as quebras
+        words, boxes, conf, line, block = [], [], [], [], []
+        b = l = -1
+        new_block = new_line = True
+        for text, box, confidence, starts_block, starts_line in items:
+            new_block = new_block or starts_block
+            new_line = new_line or starts_line or starts_block
+            text = text.strip()
+            if not text:
+                continue
+            b += new_block
+            l += new_line
+            new_block = new_line = False
+            words.append(text)
+            boxes.append(box)
+            conf.append(confidence)
+            line.append(l)
+            block.append(b)
+        return cls(size, words, boxes, conf, line, block)
+
+    @classmethod
+    def from_data(cls, data, size):
+        # Saída de image_to_data (pytesseract): cada mudança de (bloco,
+        # parágrafo) abre um bloco e cada mudança de linha, uma linha
+        def items():
+            last = None
+            for i, text in enumerate(data["text"]):
+                if data["level"][i] != 5:
+                    continue
+                key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+                left, top = data["left"][i], data["top"][i]
+                yield (text, (left, top, left + data["width"][i], top + data["height"][i]),
+                       float(data["conf"][i]), last is None or key[:2] != last[:2],
+                       key != last)
+                last = key
+        return cls.from_words(size, items())
+
+    @classmethod
+    def concat(cls, results, size):
+        # Partes da mesma imagem (já nas coordenadas dela), em ordem de
+        # leitura; cada parte começa num bloco novo
+        parts = [r for r in results if r.words]
+        if not parts:
+            return cls.empty(size)
+        lines, blocks = [], []
+        line = block = 0
+        for r in parts:
+            lines.append(r.line - r.line[0] + line)
+            blocks.append(r.block - r.block[0] + block)
+            line, block = int(lines[-1][-1]) + 1, int(blocks[-1][-1]) + 1
+        return cls(size, [w for r in parts for w in r.words],
+                   np.concatenate([r.boxes for r in parts]),
+                   np.concatenate([r.conf for r in parts]),
+                   np.concatenate(lines), np.concatenate(blocks))
+
+    def mapped(self, size, scale=1.0, dx=0, dy=0):
+        # Caixas levadas para outra imagem de tamanho `size`: escala (OCR
+        # numa cópia reduzida ou ampliada) e deslocamento (recorte dela)
+        boxes = self.boxes
+        if scale != 1.0:
+            boxes = np.rint(boxes * scale).astype(np.int32)
+        if dx or dy:
+            boxes = boxes + np.array([dx, dy, dx, dy], dtype=np.int32)
+        return OCRResult(size, self.words, boxes, self.conf, self.line, self.block)
+
+    @property
+    def confidence(self):
+        # Média da confiança das palavras (0-100)
+        return float(self.conf.mean()) if self.words else 0.0
+
+    def _line_starts(self):
+        # Índice da primeira palavra de cada linha, mais o total no fim
+        return [0] + (np.flatnonzero(np.diff(self.line)) + 1).tolist() + [len(self.words)]
+
+    def structure(self):
+        # [[(primeira, última + 1) palavra de cada linha] de cada bloco]
+        if not self.words:
+            return []
+        starts = self._line_starts()
+        blocks = []
+        for first, end in zip(starts, starts[1:]):
+            if not blocks or self.block[first] != self.block[first - 1]:
+                blocks.append([])
+            blocks[-1].append((first, end))
+        return blocks
+
+    def box(self, first, end):
+        # Caixa que envolve as palavras first..end-1
+        part = self.boxes[first:end]
+        return (int(part[:, 0].min()), int(part[:, 1].min()),
+                int(part[:, 2].max()), int(part[:, 3].max()))
+
+    def line_boxes(self):
+        if not self.words:
+            return np.zeros((0, 4), dtype=np.int32)
+        starts = self._line_starts()[:-1]
+        return np.concatenate((np.minimum.reduceat(self.boxes[:, :2], starts),
+                               np.maximum.reduceat(self.boxes[:, 2:], starts)), axis=1)
+
+    def line_at(self, x, y, margin=2):
+        # Índice da linha cuja caixa contém (x, y), ou None
+        boxes = self.line_boxes()
+        hit = np.flatnonzero((boxes[:, 0] - margin <= x) & (x <= boxes[:, 2] + margin)
+                             & (boxes[:, 1] - margin <= y) & (y <= boxes[:, 3] + margin))
+        return int(hit[0]) if hit.size else None
+
+    def compose(self):
+        # (texto, [(início, fim) de cada linha no texto]): espaço entre
+        # palavras, quebra entre linhas e linha em branco entre blocos
+        parts, spans, pos = [], [], 0
+        for lines in self.structure():
+            for k, (first, end) in enumerate(lines):
+                if parts:
+                    parts.append("\n" if k else "\n\n")
+                    pos += len(parts[-1])
+                text = " ".join(self.words[first:end])
+                parts.append(text)
+                spans.append((pos, pos + len(text)))
+                pos += len(text)
+        return "".join(parts), spans
+
+    @property
+    def text(self):
+        return self.compose()[0]
+
+    def to_tsv(self):
+        # Mesmo formato do `tesseract ... tsv` (cada bloco daqui é um
+        # parágrafo do Tesseract)
+        rows = ["level\tpage_num\tblock_num\tpar_num\tline_num\tword_num"
+                "\tleft\ttop\twidth\theight\tconf\ttext"]
+
+        def row(level, nums, box, conf=-1, text=""):
+            left, top, right, bottom = box
+            rows.append("\t".join(str(v) for v in (level, 1) + nums
+                                   + (left, top, right - left, bottom - top))
+                        + f"\t{float(conf):g}\t{text}")
+
+        row(1, (0, 0, 0, 0), (0, 0) + self.size)
+        for b, lines in enumerate(self.structure(), 1):
+            box = self.box(lines[0][0], lines[-1][1])
+            row(2, (b, 0, 0, 0), box)
+            row(3, (b, 1, 0, 0), box)
+            for l, (first, end) in enumerate(lines, 1):
+                row(4, (b, 1, l, 0), self.box(first, end))
+                for w in range(first, end):
+                    row(5, (b, 1, l, w - first + 1), tuple(int(v) for v in self.boxes[w]),
+                        round(float(self.conf[w]), 2), self.words[w])
+        return "\n".join(rows) + "\n"
+
+    def to_hocr(self):
+        def bbox(box):
+            return "bbox {} {} {} {}".format(*box)
+
+        out = ['<?xml version="1.0" encoding="UTF-8"?>',
+               '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"'
+               ' "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">',
+               '<html xmlns="http://www.w3.org/1999/xhtml">',
+               ' <head>',
+               '  <title></title>',
+               '  <meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>',
+               '  <meta name="ocr-system" content="tesseract"/>',
+               '  <meta name="ocr-capabilities"'
+               ' content="ocr_page ocr_carea ocr_par ocr_line ocrx_word"/>',
+               ' </head>',
+               ' <body>',
+               f'  <div class="ocr_page" id="page_1" title="{bbox((0, 0) + self.size)}">']
+        line = 0
+        for b, lines in enumerate(self.structure(), 1):
+            box = bbox(self.box(lines[0][0], lines[-1][1]))
+            out.append(f'   <div class="ocr_carea" id="block_1_{b}" title="{box}">')
+            out.append(f'    <p class="ocr_par" id="par_1_{b}" title="{box}">')
+            for first, end in lines:
+                line += 1
+                out.append(f'     <span class="ocr_line" id="line_1_{line}"'
+                           f' title="{bbox(self.box(first, end))}">')
+                out.append("      " + " ".join(
+                    f'<span class="ocrx_word" id="word_1_{w + 1}"'
+                    f' title="{bbox(self.boxes[w])}; x_wconf {round(float(self.conf[w]))}">'
+                    f'{html.escape(self.words[w])}</span>' for w in range(first, end)))
+                out.append('     </span>')
+            out += ['    </p>', '   </div>']
+        out += ['  </div>', ' </body>', '</html>', '']
+        return "\n".join(out)
+
+    def to_json(self):
+        # Blocos → linhas → palavras, com caixas e confianças
+        return {
+            "width": self.size[0], "height": self.size[1], "text": self.text,
+            "blocks": [{
+                "box": self.box(lines[0][0], lines[-1][1]),
+                "lines": [{
+                    "box": self.box(first, end),
+                    "text": " ".join(self.words[first:end]),
+                    "words": [{"text": self.words[w], "box": self.boxes[w].tolist(),
+                               "conf": round(float(self.conf[w]), 1)}
+                              for w in range(first, end)],
+                } for first, end in lines],
+            } for lines in self.structure()],
+        }
+
+    def to_cache(self):
+        # Forma compacta, serializável em JSON, para o cache de OCR
+        return {"size": self.size, "words": self.words, "boxes": self.boxes.ravel().tolist(),
+                "conf": [round(c, 1) for c in self.conf.tolist()],
+                "line": self.line.tolist(), "block": self.block.tolist()}
+
+    @classmethod
+    def from_cache(cls, data):
+        return cls(data["size"], data["words"], data["boxes"], data["conf"],
+                   data["line"], data["block"])
+
+
+# Exportações do OCR, pela extensão do arquivo
+OCR_EXPORTS = {
+    ".txt": lambda result: result.text + "\n",
+    ".hocr": OCRResult.to_hocr,
+    ".html": OCRResult.to_hocr,
+    ".tsv": OCRResult.to_tsv,
+    ".json": lambda result: json.dumps(result.to_json(), ensure_ascii=False, indent=1),
+}
+
+
+def export_ocr(result, path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in OCR_EXPORTS:
+        raise ValueError(f"Formato de exportação desconhecido: {ext or path} "
+                         f"(use {', '.join(OCR_EXPORTS)})")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(OCR_EXPORTS[ext](result))
+
+
+# --- Motores de OCR ---
+
+# Modos de segmentação de página (PSM) do Tesseract usados aqui
+PSM_AUTO = 3
+PSM_SINGLE_BLOCK = 6
+PSM_SINGLE_LINE = 7
+PSM_SINGLE_WORD = 8
+PSM_SPARSE_TEXT = 11
+
+
+class PytesseractEngine:
+    # Fallback: um processo tesseract novo (e modelos recarregados) por chamada
+    name = "pytesseract"
+
+    def __init__(self):
+        import pytesseract
+        self._pytesseract = pytesseract
+
+    def warm(self, lang):
+        pass
+
+    def image_to_string(self, img, lang=OCR_LANG):
+        return self._pytesseract.image_to_string(img, lang=lang)
+
+    def languages(self):
+        return [lang for lang in self._pytesseract.get_languages() if lang != "osd"]
+
+    def recognize(self, img, lang=OCR_LANG, psm=PSM_AUTO):
+        # OCRResult (palavras com caixa e confiança), numa só chamada ao tesseract
+        data = self._pytesseract.image_to_data(
+            img, lang=lang, config=f"--psm {psm}",
+            output_type=self._pytesseract.Output.DICT)
+        return OCRResult.from_data(data, img.size)
+
+    def close(self):
+        pass
+
+
+class HandlePool:
+    # Até `size` handles, criados sob demanda e reaproveitados
+    def __init__(self, factory, size):
+        self.factory = factory
+        self.size = size
+        self.created = 0
+        self.idle = queue.Queue()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self.created < self.size
+            if create:
+                self.created += 1
+        if not create:
+            return self.idle.get()
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self.created -= 1
+            raise
+
+    def release(self, handle):
+        self.idle.put(handle)
+
+    def close(self, finalize):
+        while True:
+            try:
+                finalize(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+class TesserocrEngine:
+    # libtesseract em processo via tesserocr: cada idioma mantém um pool de
+    # handles PyTessBaseAPI já inicializados (modelos carregados uma só vez)
+    name = "tesserocr"
+
+    def __init__(self, workers=1):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.workers = max(1, int(workers))
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, lang):
+        with self._lock:
+            pool = self._pools.get(lang)
+            if pool is None:
+                pool = self._pools[lang] = HandlePool(
+                    lambda: self._tesserocr.PyTessBaseAPI(lang=lang), self.workers)
+        return pool
+
+    @contextmanager
+    def handle(self, lang):
+        pool = self._pool(lang)
+        api = pool.acquire()
+        try:
+            yield api
+        finally:
+            pool.release(api)
+
+    def warm(self, lang):
+        with self.handle(lang):
+            pass
+
+    def languages(self):
+        # Pacotes instalados; cada um só é carregado quando usado (_pool)
+        return [lang for lang in self._tesserocr.get_languages()[1] if lang != "osd"]
+
+    @staticmethod
+    def set_pixels(api, img):
+        # Entrega os pixels crus ao Tesseract, sem codificar a imagem
+        if img.mode not in ('L', 'RGB'):
+            img = img.convert('L')
+        bpp = len(img.getbands())
+        api.SetImageBytes(img.tobytes(), img.width, img.height, bpp, img.width * bpp)
+
+    def image_to_string(self, img, lang=OCR_LANG):
+        with self.handle(lang) as api:
+            api.SetPageSegMode(PSM_AUTO)
+            self.set_pixels(api, img)
+            return api.GetUTF8Text()
+
+    def recognize(self, img, lang=OCR_LANG, psm=PSM_AUTO):
+        # OCRResult do reconhecimento, lido pelo iterador de palavras; o PSM
+        # é reposto a cada chamada porque os handles são compartilhados
+        with self.handle(lang) as api:
+            api.SetPageSegMode(psm)
+            self.set_pixels(api, img)
+            api.Recognize()
+            return OCRResult.from_words(img.size, self.words(api))
+
+    def words(self, api):
+        ril = self._tesserocr.RIL
+        it = api.GetIterator()
+        if it is None:
+            return
+        for word in self._tesserocr.iterate_level(it, ril.WORD):
+            box = word.BoundingBox(ril.WORD)
+            if box is None:
+                continue
+            yield (word.GetUTF8Text(ril.WORD) or "", box, word.Confidence(ril.WORD),
+                   word.IsAtBeginningOf(ril.PARA), word.IsAtBeginningOf(ril.TEXTLINE))
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close(lambda api: api.End())
+            self._pools.clear()
+
+
+def make_ocr_engine(name="auto", workers=0):
+    workers = workers or os.cpu_count() or 1
+    if name == "pytesseract":
+        return PytesseractEngine()
+    if name not in ("auto", "tesserocr"):
+        raise ValueError(f"Motor de OCR desconhecido: {name}")
+    try:
+        return TesserocrEngine(workers)
+    except ImportError as e:
+        if name == "tesserocr":
+            print(f"Aviso: tesserocr indisponível ({e}), usando pytesseract",
+                  file=sys.stderr)
+        return PytesseractEngine()
+
+
+# --- Parâmetros adaptativos do OCR ---
+# A geometria da captura já binarizada (quantas linhas, vãos entre colunas,
+# espaçamento) escolhe o modo de segmentação mais rápido que serve; texto
+# grande é reduzido antes do OCR (o LSTM normaliza as linhas para ~36 px de
+# qualquer forma). Se a confiança média das palavras sair baixa, o OCR é
+# refeito no modo completo e fica o resultado mais confiável.
+
+OCR_LAYOUTS = {
+    # Com os modelos LSTM, o modo de palavra única (PSM 8) sai menos
+    # confiável que o de linha única e não é mais rápido
+    "palavra": PSM_SINGLE_LINE,
+    "linha": PSM_SINGLE_LINE,
+    "bloco": PSM_SINGLE_BLOCK,
+    # Cada coluna vira um bloco: o modo completo costuma emendar linhas de
+    # colunas vizinhas quando o vão entre elas é estreito
+    "colunas": PSM_SINGLE_BLOCK,
+    # Tamanhos de fonte misturados ou nenhuma "tinta" reconhecível
+    "pagina": PSM_AUTO,
+    "esparso": PSM_SPARSE_TEXT,
+}
+# Altura de linha (px) acima da qual a imagem é reduzida, e o alvo da redução
+OCR_MAX_LINE_HEIGHT = 64
+OCR_TARGET_LINE_HEIGHT = 40
+# Na segunda tentativa, texto abaixo desta altura é ampliado (até 2x)
+OCR_MIN_LINE_HEIGHT = 20
+
+
+def _runs(mask):
+    # (início, fim) das sequências de True num vetor booleano
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def classify_layout(arr):
+    # (classe, altura mediana das linhas, divisas entre colunas) de uma
+    # imagem com texto escuro; as divisas (x) só existem na classe "colunas"
+    ink = arr < 128
+    starts, ends = _runs(ink.any(axis=1))
+    heights = ends - starts
+    # Sujeira de 1-2 px não conta como linha
+    keep = heights >= 3
+    starts, ends, heights = starts[keep], ends[keep], heights[keep]
+    if starts.size == 0:
+        return "pagina", 0.0, []
+    line_h = float(np.median(heights))
+    # Vãos verticais sem "tinta" dentro da área ocupada pelo texto
+    col_starts, col_ends = _runs(ink[starts[0]:ends[-1]].any(axis=0))
+    gaps = col_starts[1:] - col_ends[:-1]
+    if starts.size == 1:
+        # Espaço entre palavras fica em ~1/3 da altura da linha; entre
+        # letras da mesma palavra, bem menos
+        spaced = gaps.size and gaps.max() > 0.25 * line_h
+        return ("linha" if spaced else "palavra"), line_h, []
+    if heights.max() > 2.5 * heights.min():
+        return "pagina", line_h, []
+    wide = np.flatnonzero(gaps >= 2 * line_h)
+    if wide.size:
+        cuts = [int(col_ends[k] + col_starts[k + 1]) // 2 for k in wide]
+        return "colunas", line_h, cuts
+    if (starts[1:] - ends[:-1]).max() > 3 * line_h:
+        return "esparso", line_h, []
+    return "bloco", line_h, []
+
+
+def _scaled(img, arr, factor):
+    if factor == 1.0:
+        return img
+    return Image.fromarray(_resize_bilinear(arr, factor))
+
+
+def recognize_columns(engine, img, lang, cuts, psm=PSM_SINGLE_BLOCK):
+    # Uma chamada por coluna, da esquerda para a direita, com as caixas
+    # devolvidas nas coordenadas de `img`
+    edges = [0] + list(cuts) + [img.width]
+    return OCRResult.concat(
+        [engine.recognize(img.crop((left, 0, right, img.height)), lang, psm)
+         .mapped(img.size, dx=left) for left, right in zip(edges, edges[1:])], img.size)
+
+
+def adaptive_ocr(engine, img, lang, min_confidence=60, timings=None):
+    # OCRResult nas coordenadas de `img`. Em `timings` (se dado) ficam os
+    # segundos da tentativa rápida, sob o nome da classe, e os da segunda
+    # tentativa como "refeito"
+    arr = np.asarray(img if img.mode == "L" else img.convert("L"))
+    layout, line_h, cuts = classify_layout(arr)
+    psm = OCR_LAYOUTS[layout]
+    scale = OCR_TARGET_LINE_HEIGHT / line_h if line_h > OCR_MAX_LINE_HEIGHT else 1.0
+
+    start = time.perf_counter()
+    fast = _scaled(img, arr, scale)
+    if cuts:
+        result = recognize_columns(engine, fast, lang, [round(x * scale) for x in cuts], psm)
+    else:
+        result = engine.recognize(fast, lang, psm)
+    result = result.mapped(img.size, 1 / scale)
+    if timings is not None:
+        timings[layout] = time.perf_counter() - start
+    if result.confidence >= min_confidence:
+        return result
+
+    # Modo completo na escala original; se a primeira tentativa já foi essa,
+    # tenta o modo de texto esparso
+    retry_psm = PSM_SPARSE_TEXT if (psm, scale) == (PSM_AUTO, 1.0) else PSM_AUTO
+    retry_scale = 1.0
+    if 0 < line_h < OCR_MIN_LINE_HEIGHT:
+        retry_scale = min(2.0, OCR_MIN_LINE_HEIGHT / line_h)
+    start = time.perf_counter()
+    retry = engine.recognize(_scaled(img, arr, retry_scale), lang, retry_psm)
+    retry = retry.mapped(img.size, 1 / retry_scale)
+    if timings is not None:
+        timings["refeito"] = time.perf_counter() - start
+    return retry if retry.confidence > result.confidence else result
+
+
+# --- Captura nativa (X11) ---
+# A tela é lida direto do servidor X para a memória (Pillow/XCB), sem
+# processo externo nem PNG intermediário; a seleção da área é feita pela
+# própria janela (RegionSelector) sobre a tela congelada.
+
+def native_capture_available():
+    if not os.environ.get("DISPLAY") or os.environ.get("XDG_SESSION_TYPE") == "wayland":
+        return False
+    from PIL import features
+    return features.check("xcb")
+
+
+def resolve_capture_tool(name):
+    if name == "auto":
+        return "x11" if native_capture_available() else "gnome-screenshot"
+    return name
+
+
+def grab_screen(bbox=None):
+    # Tela inteira (todas as telas do X) ou só `bbox`, como imagem RGB
+    from PIL import ImageGrab
+    return ImageGrab.grab(bbox=bbox, xdisplay=None)
+
+
+# --- Conclusão da captura ---
+
+class CaptureTimeout(Exception):
+    pass
+
+
+class CaptureCancelled(CaptureTimeout):
+    # A ferramenta de captura terminou sem gravar o arquivo (seleção
+    # cancelada com Esc ou clique direito)
+    pass
+
+
+class InotifyWatch:
+    # Observa um diretório via inotify (ctypes, sem dependências) e avisa
+    # quando um arquivo é fechado após escrita ou movido para lá
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(directory),
+                                    self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, os.strerror(err))
+
+    def wait(self, name, timeout):
+        # True se `name` foi escrito dentro do prazo
+        target = os.fsencode(name)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            data = os.read(self.fd, 4096)
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                event_name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if event_name == target:
+                    return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+def file_changed(path, old_mtime):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return old_mtime is None or mtime != old_mtime
+
+
+def wait_for_capture(path, old_mtime, timeout, watch=None, check=None, proc=None):
+    # Espera a captura ser gravada. Com inotify (criado antes do processo de
+    # captura, para que nenhum evento se perca) acorda no próprio close da
+    # escrita; sem ele, faz polling curto do mtime. Sempre limitado por
+    # `timeout`; `check` permite cancelar a espera. Com `proc` (o processo
+    # de captura, ainda rodando) o prazo não corre durante a seleção: quando
+    # ele termina, o arquivo é verificado uma última vez e, se não mudou, a
+    # seleção foi cancelada
+    deadline = time.monotonic() + timeout
+    name = os.path.basename(path)
+    while True:
+        if watch is None and file_changed(path, old_mtime):
+            return
+        if proc is not None:
+            if proc.poll() is not None:
+                if proc.returncode:
+                    raise subprocess.CalledProcessError(proc.returncode, proc.args)
+                if file_changed(path, old_mtime):
+                    return
+                raise CaptureCancelled(path)
+            deadline = time.monotonic() + timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CaptureTimeout(path)
+        if check is not None:
+            check()
+        if watch is not None:
+            if watch.wait(name, min(remaining, 0.25)):
+                return
+        else:
+            time.sleep(min(remaining, 0.01))
+
+
+def open_watch(directory):
+    try:
+        return InotifyWatch(directory)
+    except (OSError, AttributeError):
+        return None
+
+
+# --- Cache de resultados ---
+
+def ocr_cache_key(img, lang, engine, params=""):
+    # Hash do conteúdo da imagem já pré-processada + idioma/motor/parâmetros
+    # (pytesseract e tesserocr não dividem entradas)
+    h = hashlib.sha256()
+    h.update(f"{img.mode}:{img.size}:{lang}:{engine}:{params}:".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def translation_cache_key(text, src, dest, backend):
+    # Origem e backend entram na chave: trocar --from ou o backend não
+    # devolve traduções antigas
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{backend}:{src}:{dest}:{normalized}".encode()).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+                return self._data[key]
+            except KeyError:
+                return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    # Camada SQLite, limitada em bytes; despeja as entradas acessadas há
+    # mais tempo. Um arquivo pode conter vários namespaces.
+    def __init__(self, path, namespace, max_bytes):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " ns TEXT, key TEXT, value TEXT, cost REAL, size INTEGER,"
+            " atime REAL, PRIMARY KEY (ns, key))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_atime ON cache (ns, atime)")
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, cost FROM cache WHERE ns = ? AND key = ?",
+                (self.namespace, key)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE cache SET atime = ? WHERE ns = ? AND key = ?",
+                (time.time(), self.namespace, key))
+            self._db.commit()
+        return json.loads(row[0]), row[1]
+
+    def put(self, key, value, cost):
+        data = json.dumps(value)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, data, cost, len(data), time.time()))
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache WHERE ns = ?",
+            (self.namespace,)).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT key, size FROM cache WHERE ns = ? ORDER BY atime",
+            (self.namespace,))
+        victims = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            victims.append((self.namespace, key))
+            total -= size
+        self._db.executemany("DELETE FROM cache WHERE ns = ? AND key = ?", victims)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ResultCache:
+    # Memória (LRU) na frente do disco. `cost` é o tempo gasto para calcular
+    # o valor; cada acerto soma esse tempo em `saved`.
+    def __init__(self, name, memory_entries=256, disk=None):
+        self.name = name
+        self.memory = LRUCache(memory_entries)
+        self.disk = disk
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.saved = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        tier = "memory"
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            tier = "disk"
+            if entry is not None:
+                self.memory.put(key, entry)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            if tier == "memory":
+                self.hits_memory += 1
+            else:
+                self.hits_disk += 1
+            self.saved += entry[1]
+        return entry[0]
+
+    def put(self, key, value, cost):
+        self.memory.put(key, (value, cost))
+        if self.disk is not None:
+            self.disk.put(key, value, cost)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "saved_seconds": round(self.saved, 3),
+            }
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+def make_caches(config):
+    caches = {}
+    for name in ("ocr", "translation"):
+        disk = None
+        if config["cache_disk_mb"] > 0:
+            try:
+                disk = DiskCache(config["cache_path"], name,
+                                 int(config["cache_disk_mb"] * 1024 * 1024))
+            except (OSError, sqlite3.Error) as e:
+                print(f"Aviso: cache em disco desativado: {e}", file=sys.stderr)
+        caches[name] = ResultCache(name, config["cache_memory_entries"], disk)
+    return caches
+
+
+# --- Histórico de capturas ---
+# Uma linha por imagem distinta (hash do conteúdo): capturar de novo a mesma
+# imagem só atualiza a data, o contador e os textos. A miniatura vai
+# comprimida (WebP) e só é lida quando uma entrada é aberta; a busca usa um
+# índice FTS5 sobre o OCR e a tradução.
+
+def image_hash(img):
+    h = hashlib.sha256()
+    h.update(f"{img.mode}:{img.size}:".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def encode_thumbnail(thumb):
+    buf = io.BytesIO()
+    try:
+        thumb.save(buf, "WEBP", quality=80)
+    except (OSError, KeyError):
+        buf = io.BytesIO()
+        thumb.convert("RGB").save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def fts_query(text):
+    # Texto livre → consulta FTS5: cada palavra entre aspas, como prefixo
+    words = text.split()
+    return " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+
+
+class HistoryStore:
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " id INTEGER PRIMARY KEY, hash TEXT UNIQUE, created REAL, updated REAL,"
+        " count INTEGER, width INTEGER, height INTEGER, thumb BLOB,"
+        " ocr TEXT, translation TEXT, timings TEXT)",
+        "CREATE INDEX IF NOT EXISTS entries_updated ON entries (updated, id)",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5("
+        " ocr, translation, content='entries', content_rowid='id')",
+        # Mantêm o índice externo em dia com a tabela
+        "CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN"
+        " INSERT INTO entries_fts (rowid, ocr, translation)"
+        " VALUES (new.id, new.ocr, new.translation); END",
+        "CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN"
+        " INSERT INTO entries_fts (entries_fts, rowid, ocr, translation)"
+        " VALUES ('delete', old.id, old.ocr, old.translation); END",
+        "CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE OF ocr, translation ON entries BEGIN"
+        " INSERT INTO entries_fts (entries_fts, rowid, ocr, translation)"
+        " VALUES ('delete', old.id, old.ocr, old.translation);"
+        " INSERT INTO entries_fts (rowid, ocr, translation)"
+        " VALUES (new.id, new.ocr, new.translation); END",
+    )
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        for statement in self.SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def add(self, digest, size, thumb, ocr, translation, timings):
+        # `thumb` já comprimida (encode_thumbnail); devolve o id da entrada
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT id FROM entries WHERE hash = ?",
+                                   (digest,)).fetchone()
+            if row is None:
+                cur = self._db.execute(
+                    "INSERT INTO entries (hash, created, updated, count, width, height,"
+                    " thumb, ocr, translation, timings) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?)",
+                    (digest, now, now, size[0], size[1], thumb, ocr, translation,
+                     json.dumps(timings)))
+                entry_id = cur.lastrowid
+            else:
+                entry_id = row[0]
+                self._db.execute(
+                    "UPDATE entries SET updated = ?, count = count + 1, ocr = ?,"
+                    " translation = ?, timings = ? WHERE id = ?",
+                    (now, ocr, translation, json.dumps(timings), entry_id))
+            self._db.commit()
+        return entry_id
+
+    def page(self, query="", before=None, limit=100):
+        # Entradas mais recentes primeiro, sem a miniatura. `before` é o
+        # (updated, id) da última linha da página anterior (paginação por
+        # chave: o custo não cresce com o número de páginas já vistas)
+        sql = ["SELECT e.id, e.updated, e.count, substr(e.ocr, 1, 200) FROM entries e"]
+        where, params = [], []
+        if query.strip():
+            sql.append("JOIN entries_fts f ON f.rowid = e.id")
+            where.append("entries_fts MATCH ?")
+            params.append(fts_query(query))
+        if before is not None:
+            where.append("(e.updated, e.id) < (?, ?)")
+            params.extend(before)
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY e.updated DESC, e.id DESC LIMIT ?")
+        params.append(limit)
+        with self._lock:
+            return self._db.execute(" ".join(sql), params).fetchall()
+
+    def get(self, entry_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT updated, count, width, height, thumb, ocr, translation, timings"
+                " FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        if row is None:
+            return None
+        keys = ("updated", "count", "width", "height", "thumb", "ocr", "translation")
+        entry = dict(zip(keys, row))
+        entry["timings"] = json.loads(row[7] or "{}")
+        return entry
+
+    def delete(self, entry_id):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_history(config):
+    path = config["history_path"]
+    if not path:
+        return None
+    try:
+        return HistoryStore(os.path.expanduser(path))
+    except (OSError, sqlite3.Error) as e:
+        print(f"Aviso: histórico desativado: {e}", file=sys.stderr)
+        return None
+
+
+def format_cache_stats(stats):
+    parts = []
+    for name, label in (("ocr", "OCR"), ("translation", "Tradução")):
+        st = stats.get(name)
+        if st:
+            hits = st["hits_memory"] + st["hits_disk"]
+            parts.append(f"{label}: {hits}/{hits + st['misses']} do cache")
+    st = stats.get("memory")
+    if st:
+        hits = st["hits_exact"] + st["hits_fuzzy"]
+        parts.append(f"Memória: {hits}/{hits + st['misses']} frases")
+    saved = sum(st.get("saved_seconds", 0) for st in stats.values())
+    parts.append(f"{saved:.1f} s economizados")
+    return "Cache — " + " · ".join(parts)
+
+
+# --- Detecção local de idioma ---
+# Modelo de trigramas de caracteres treinado (na primeira chamada) com os
+# textos abaixo; decide em fração de milissegundo, sem rede.
+
+LANGUAGE_SAMPLES = {
+    "pt": (
+        "Não foi possível salvar o arquivo porque o disco está cheio. "
+        "Clique em continuar para tentar novamente ou cancele a operação. "
+        "As configurações foram atualizadas com sucesso e serão aplicadas "
+        "na próxima vez que você abrir o programa. Digite sua senha para "
+        "confirmar a alteração. A conexão com o servidor foi perdida, "
+        "verifique a sua rede e tente de novo mais tarde. Este documento "
+        "contém informações importantes sobre o uso do serviço, leia com "
+        "atenção antes de aceitar os termos. Ele disse que não ia chegar "
+        "a tempo para a reunião de amanhã, então vamos remarcar para a "
+        "semana que vem. Obrigado pela sua mensagem, responderemos assim "
+        "que possível. Os dados são armazenados de forma segura e não são "
+        "compartilhados com terceiros sem a sua autorização."
+    ),
+    "en": (
+        "The file could not be saved because the disk is full. Click "
+        "continue to try again or cancel the operation. Your settings were "
+        "updated successfully and will be applied the next time you open "
+        "the program. Enter your password to confirm the change. The "
+        "connection to the server was lost, check your network and try "
+        "again later. This document contains important information about "
+        "the use of the service, please read it carefully before accepting "
+        "the terms. He said that he would not make it in time for the "
+        "meeting tomorrow, so we will reschedule it for next week. Thank "
+        "you for your message, we will reply as soon as possible. The data "
+        "is stored securely and is never shared with third parties without "
+        "your permission."
+    ),
+    "es": (
+        "No se pudo guardar el archivo porque el disco está lleno. Haga "
+        "clic en continuar para intentarlo de nuevo o cancele la operación. "
+        "La configuración se actualizó correctamente y se aplicará la "
+        "próxima vez que abra el programa. Introduzca su contraseña para "
+        "confirmar el cambio. Se perdió la conexión con el servidor, "
+        "compruebe su red y vuelva a intentarlo más tarde. Este documento "
+        "contiene información importante sobre el uso del servicio, léalo "
+        "con atención antes de aceptar las condiciones. Dijo que no llegaría "
+        "a tiempo para la reunión de mañana, así que la cambiaremos para la "
+        "semana que viene. Gracias por su mensaje, le responderemos lo antes "
+        "posible."
+    ),
+    "fr": (
+        "Le fichier n'a pas pu être enregistré car le disque est plein. "
+        "Cliquez sur continuer pour réessayer ou annulez l'opération. Vos "
+        "paramètres ont été mis à jour avec succès et seront appliqués au "
+        "prochain démarrage du programme. Saisissez votre mot de passe pour "
+        "confirmer la modification. La connexion au serveur a été perdue, "
+        "vérifiez votre réseau et réessayez plus tard. Ce document contient "
+        "des informations importantes sur l'utilisation du service, lisez-le "
+        "attentivement avant d'accepter les conditions. Il a dit qu'il "
+        "n'arriverait pas à temps pour la réunion de demain, nous allons "
+        "donc la reporter à la semaine prochaine. Merci pour votre message."
+    ),
+    "de": (
+        "Die Datei konnte nicht gespeichert werden, weil die Festplatte voll "
+        "ist. Klicken Sie auf Weiter, um es erneut zu versuchen, oder brechen "
+        "Sie den Vorgang ab. Ihre Einstellungen wurden erfolgreich "
+        "aktualisiert und werden beim nächsten Start des Programms "
+        "übernommen. Geben Sie Ihr Passwort ein, um die Änderung zu "
+        "bestätigen. Die Verbindung zum Server wurde getrennt, überprüfen "
+        "Sie Ihr Netzwerk und versuchen Sie es später noch einmal. Dieses "
+        "Dokument enthält wichtige Informationen über die Nutzung des "
+        "Dienstes. Er sagte, dass er es morgen nicht rechtzeitig zur "
+        "Besprechung schafft, deshalb verschieben wir sie auf nächste Woche."
+    ),
+    "it": (
+        "Impossibile salvare il file perché il disco è pieno. Fai clic su "
+        "continua per riprovare oppure annulla l'operazione. Le impostazioni "
+        "sono state aggiornate correttamente e verranno applicate al "
+        "prossimo avvio del programma. Inserisci la tua password per "
+        "confermare la modifica. La connessione al server è stata persa, "
+        "controlla la rete e riprova più tardi. Questo documento contiene "
+        "informazioni importanti sull'uso del servizio, leggilo con "
+        "attenzione prima di accettare le condizioni. Ha detto che non "
+        "sarebbe arrivato in tempo per la riunione di domani, quindi la "
+        "spostiamo alla settimana prossima. Grazie per il tuo messaggio."
+    ),
+}
+
+# Pacote do Tesseract para cada idioma detectado
+TESSERACT_PACKS = {"pt": "por", "en": "eng"}
+
+
+def _normalize_for_ngrams(text):
+    return " " + " ".join(re.findall(r"[^\W\d_]+", text.lower())) + " "
+
+
+class LanguageDetector:
+    def __init__(self, samples=LANGUAGE_SAMPLES, n=3):
+        self.n = n
+        self.models = {}
+        for lang, text in samples.items():
+            counts = {}
+            for gram in self._ngrams(_normalize_for_ngrams(text)):
+                counts[gram] = counts.get(gram, 0) + 1
+            total = sum(counts.values()) + len(counts) + 1
+            self.models[lang] = (
+                {gram: math.log((c + 1) / total) for gram, c in counts.items()},
+                math.log(1 / total),
+            )
+
+    def _ngrams(self, text):
+        n = self.n
+        return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+    def scores(self, text, limit=1000):
+        grams = self._ngrams(_normalize_for_ngrams(text[:limit]))
+        result = {}
+        for lang, (table, unseen) in self.models.items():
+            get = table.get
+            result[lang] = sum(get(g, unseen) for g in grams)
+        return result
+
+    def detect(self, text, min_chars=12, min_margin=1.0):
+        # Idioma mais provável, ou None se o texto for curto demais ou se a
+        # vantagem (log-verossimilhança) sobre o segundo for pequena
+        if len(_normalize_for_ngrams(text)) < min_chars:
+            return None
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        (best, top), (_, second) = ranked[0], ranked[1]
+        if top - second < min_margin:
+            return None
+        return best
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def detect_language(text):
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = LanguageDetector()
+    return _detector.detect(text)
+
+
+# --- Tradução ---
+# Backends trocáveis (config "translation_backend"); todos recebem uma lista
+# de parágrafos e devolvem [(idioma detectado, tradução)] numa só chamada.
+
+def split_paragraphs(text):
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+class GoogleTransBackend:
+    name = "googletrans"
+    SEPARATOR = "\n\n"
+
+    def __init__(self, config):
+        from googletrans import Translator
+        # O Translator mantém o cliente HTTP (e suas conexões) entre chamadas
+        self.translator = Translator()
+        self._lock = threading.Lock()
+
+    def translate(self, texts, dest, src="auto"):
+        # Detecção e tradução na mesma requisição (result.src), com os
+        # parágrafos juntos; se a separação não voltar intacta, traduz a lista
+        with self._lock:
+            result = self.translator.translate(self.SEPARATOR.join(texts),
+                                               dest=dest, src=src)
+            parts = result.text.split(self.SEPARATOR)
+            if len(parts) == len(texts):
+                return [(result.src, part) for part in parts]
+            results = self.translator.translate(list(texts), dest=dest, src=src)
+        return [(r.src, r.text) for r in results]
+
+    def close(self):
+        pass
+
+
+class ArgosBackend:
+    # Tradução offline (argostranslate); modelos ficam carregados no processo
+    name = "argos"
+
+    def __init__(self, config):
+        import argostranslate.translate
+        self.argos = argostranslate.translate
+        source = config["translation_source"]
+        self.source = "en" if source == "auto" else source
+
+    def translate(self, texts, dest, src="auto"):
+        src = self.source if src == "auto" else src
+        if src == dest:
+            return [(src, text) for text in texts]
+        return [(src, self.argos.translate(text, src, dest)) for text in texts]
+
+    def close(self):
+        pass
+
+
+class LibreTranslateBackend:
+    # API HTTP do LibreTranslate (auto-hospedável, e usada pelo servidor stub
+    # dos benchmarks). Uma conexão keep-alive por thread.
+    name = "libretranslate"
+
+    def __init__(self, config):
+        import http.client
+        self.http = http.client
+        url = urllib.parse.urlsplit(config["translation_url"])
+        self.https = url.scheme == "https"
+        self.netloc = url.netloc
+        self.base = url.path.rstrip("/")
+        self.api_key = config.get("translation_api_key")
+        self.timeout = config["translation_timeout"]
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = self.http.HTTPSConnection if self.https else self.http.HTTPConnection
+            conn = self._local.conn = cls(self.netloc, timeout=self.timeout)
+        return conn
+
+    def post(self, path, payload):
+        if self.api_key:
+            payload = dict(payload, api_key=self.api_key)
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", self.base + path, body, headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (self.http.HTTPException, OSError):
+                # Conexão keep-alive fechada pelo servidor: reabre uma vez
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+                continue
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status}: {data[:200].decode(errors='replace')}")
+            return json.loads(data)
+
+    def translate(self, texts, dest, src="auto"):
+        data = self.post("/translate", {"q": list(texts), "source": src,
+                                        "target": dest, "format": "text"})
+        translated = data["translatedText"]
+        detected = data.get("detectedLanguage")
+        if isinstance(translated, str):
+            translated, detected = [translated], [detected]
+        if not isinstance(detected, list):
+            detected = [detected] * len(translated)
+        return [((d or {}).get("language", src), text)
+                for d, text in zip(detected, translated)]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+
+
+TRANSLATION_BACKENDS = {
+    backend.name: backend
+    for backend in (GoogleTransBackend, ArgosBackend, LibreTranslateBackend)
+}
+
+
+class TranslationClient:
+    # Cria o backend na primeira chamada (erros de import viram erro de
+    # tradução, não de inicialização) e oferece submit() para traduzir em
+    # segundo plano, devolvendo um Future. Com uma TranslationMemory, o
+    # texto é traduzido frase a frase e só as frases novas vão ao backend.
+    def __init__(self, config, workers=2, memory=None):
+        name = config["translation_backend"]
+        if name not in TRANSLATION_BACKENDS:
+            raise ValueError(f"Backend de tradução desconhecido: {name}")
+        self.config = config
+        self.memory = memory
+        self.backend_class = TRANSLATION_BACKENDS[name]
+        self._backend = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="translate")
+
+    @property
+    def backend(self):
+        with self._lock:
+            if self._backend is None:
+                self._backend = self.backend_class(self.config)
+            return self._backend
+
+    def translate(self, text, dest='pt', src="auto"):
+        # (idioma de origem predominante, tradução) para o texto inteiro,
+        # com todos os parágrafos numa única chamada ao backend
+        if self.memory is not None:
+            return self.translate_segments(text, dest, src)
+        paragraphs = split_paragraphs(text)
+        if not paragraphs:
+            return dest, ""
+        results = self.backend.translate(paragraphs, dest, src)
+        sources = [src for src, _ in results]
+        src = max(set(sources), key=sources.count)
+        return src, "\n\n".join(translated for _, translated in results)
+
+    def translate_segments(self, text, dest, src="auto"):
+        # Cada frase é procurada na memória; as que faltam vão juntas numa
+        # única chamada ao backend e o texto é remontado na ordem original
+        layout = segment_text(text)
+        segments = list(dict.fromkeys(seg for parts in layout for _, seg in parts))
+        if not segments:
+            return dest, ""
+        # Mesma separação da chave do cache de tradução: backend e origem
+        backend = self.backend_class.name
+        found = self.memory.lookup(segments, dest, src, backend)
+        missing = [seg for seg in segments if seg not in found]
+        if missing:
+            results = self.backend.translate(missing, dest, src)
+            found.update(zip(missing, results))
+            self.memory.add([(seg, dest, lang, translated)
+                             for seg, (lang, translated) in zip(missing, results)],
+                            src, backend)
+        sources = [found[seg][0] for parts in layout for _, seg in parts]
+        src = max(set(sources), key=sources.count)
+        return src, "\n\n".join("".join(sep + found[seg][1] for sep, seg in parts)
+                                 for parts in layout)
+
+    def submit(self, text, dest='pt', src="auto"):
+        return self._executor.submit(self.translate, text, dest, src)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._backend is not None:
+            self._backend.close()
+        if self.memory is not None:
+            self.memory.close()
+
+
+# Nomes exibidos e sugestões do seletor de idiomas de destino
+LANGUAGE_NAMES = {
+    "pt": "português", "en": "inglês", "es": "espanhol", "fr": "francês",
+    "de": "alemão", "it": "italiano", "ja": "japonês", "zh": "chinês",
+}
+
+
+def parse_langs(text):
+    # "pt, en" / "pt en" → ["pt", "en"], sem repetidos
+    return list(dict.fromkeys(code.lower() for code in re.split(r"[\s,;]+", text) if code))
+
+
+def already_in(dest):
+    return f"--- Já está em {LANGUAGE_NAMES.get(dest, dest)} ---"
+
+
+def translate_text(client, texto, dest='pt', src=None):
+    # O detector local evita a chamada ao backend quando o texto já está no
+    # idioma de destino; sem certeza, o backend detecta
+    if src is None:
+        src = detect_language(texto)
+    if src == dest:
+        return already_in(dest)
+    src, traduzido = client.translate(texto, dest, src or "auto")
+    if src == dest:
+        return already_in(dest)
+    return traduzido
+
+
+def source_language(config, texto):
+    # Origem fixada na configuração (--from) dispensa a detecção
+    source = config["translation_source"]
+    return detect_language(texto) if source == "auto" else source
+
+
+def format_translations(translations):
+    # {destino: tradução} → texto único; com vários destinos, uma seção por idioma
+    if len(translations) == 1:
+        return next(iter(translations.values()))
+    return "\n\n".join(f"[{dest.upper()}]\n{text}" for dest, text in translations.items())
+
+
+# --- Memória de tradução ---
+# O texto do OCR é dividido em frases; cada uma é procurada pelo texto
+# exato e, se não houver, por uma frase quase igual (erros típicos de OCR:
+# letras trocadas, pontuação perdida). Candidatas vêm de um índice invertido
+# de trigramas e são confirmadas pela semelhança; números precisam bater
+# exatamente, para "12 GB" não reaproveitar a tradução de "18 GB", e as
+# palavras também: só erros dentro delas, nenhuma a mais ou a menos ("could
+# be saved" não é "could not be saved"). Tudo fica em memória e é
+# persistido em SQLite, limitado às frases usadas há menos tempo, por
+# backend, origem e destino (como a chave do cache de tradução).
+
+# Fim de frase: pontuação seguida de espaço e de algo que inicia frase
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])\s+(?=[\"“'(¿¡0-9A-ZÀ-Ý])")
+# Números soltos (não dígitos no meio de palavras, como o "0" de "sessi0n")
+NUMBER = re.compile(r"\b\d+(?:[.,]\d+)*\b")
+# Frases mais curtas que isso só são aproveitadas se forem idênticas
+FUZZY_MIN_LENGTH = 12
+# Palavras que invertem o sentido: como as curtas, nunca são erro de OCR
+# de outra palavra (em fuzzy_form: minúsculas, sem apóstrofo)
+NEGATIONS = frozenset((
+    "not", "no", "nor", "never", "none", "nothing", "nobody", "nowhere", "cannot",
+    "don", "doesn", "didn", "isn", "aren", "wasn", "weren", "won", "wouldn", "shouldn",
+    "couldn", "can", "without", "não", "nao", "nunca", "nem", "nenhum", "nenhuma",
+    "nada", "ninguém", "sem", "jamais",
+))
+# Trocas de um caractere comuns no OCR; nas palavras curtas só elas contam
+# como erro (senão "in"/"on" ou "all"/"any" passariam)
+OCR_CONFUSIONS = frozenset(frozenset(pair) for pair in
+                           ("o0", "l1", "il", "i1", "ec", "co", "s5", "b6", "g9", "z2", "uv"))
+
+
+def join_wrapped_lines(paragraph):
+    # Linhas quebradas pela largura da área voltam a ser uma só: a anterior
+    # termina em vírgula/hífen, ou não fecha a frase e a seguinte começa em
+    # minúscula
+    lines = []
+    for line in paragraph.split("\n"):
+        line = " ".join(line.split())
+        if not line:
+            continue
+        if lines and (lines[-1][-1] in ",-"
+                      or (line[0].islower() and lines[-1][-1] not in ".!?…:;")):
+            lines[-1] += " " + line
+        else:
+            lines.append(line)
+    return lines
+
+
+def segment_text(text):
+    # Por parágrafo, [(separador, frase)]: o separador ("", " " ou "\n") é o
+    # que vai antes da frase ao remontar o texto
+    layout = []
+    for paragraph in split_paragraphs(text):
+        parts = []
+        for n, line in enumerate(join_wrapped_lines(paragraph)):
+            for i, sentence in enumerate(SENTENCE_SPLIT.split(line)):
+                parts.append((" " if i else "\n" if n else "", sentence))
+        layout.append(parts)
+    return layout
+
+
+def fuzzy_form(text):
+    # Minúsculas, só letras/dígitos separados por um espaço
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    # Levenshtein (inserção, remoção ou troca de um caractere)
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def ocr_variant(a, b):
+    # As duas frases (em fuzzy_form) têm as mesmas palavras, a menos de
+    # erros de OCR dentro delas: nenhuma palavra a mais ou a menos; negações
+    # idênticas; palavras curtas só com uma troca de OCR_CONFUSIONS; e as
+    # demais a poucas edições da outra, sem prefixo ou sufixo acrescentado
+    # ("valid"/"invalid")
+    words_a, words_b = a.split(), b.split()
+    if len(words_a) != len(words_b):
+        return False
+    for x, y in zip(words_a, words_b):
+        if x == y:
+            continue
+        if x in NEGATIONS or y in NEGATIONS:
+            return False
+        if min(len(x), len(y)) <= 3:
+            changed = [pair for pair in zip(x, y) if pair[0] != pair[1]]
+            if (len(x) != len(y) or len(changed) != 1
+                    or frozenset(changed[0]) not in OCR_CONFUSIONS):
+                return False
+            continue
+        if x in y or y in x:
+            return False
+        if edit_distance(x, y) > max(1, max(len(x), len(y)) // 3):
+            return False
+    return True
+
+
+def similarity(a, b, minimum=0.0):
+    # Razão do difflib (0-1); abaixo de `minimum` pode devolver só a cota
+    # superior barata, sem o cálculo completo
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    bound = matcher.quick_ratio()
+    return bound if bound < minimum else matcher.ratio()
+
+
+class TranslationMemory:
+    # Versão 1: chave com backend e origem (a 0 só tinha o destino)
+    VERSION = 1
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS memory ("
+        " backend TEXT, src TEXT, dest TEXT, source TEXT, lang TEXT, target TEXT,"
+        " used REAL, PRIMARY KEY (backend, src, dest, source))",
+        "CREATE INDEX IF NOT EXISTS memory_used ON memory (used)",
+    )
+    # Quantas candidatas do índice de trigramas são comparadas por frase
+    CANDIDATES = 5
+
+    def __init__(self, path, max_entries=20000, min_similarity=0.9):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < self.VERSION:
+            # Entradas antigas não dizem de que backend/origem vieram
+            self._db.execute("DROP TABLE IF EXISTS memory")
+            self._db.execute(f"PRAGMA user_version = {self.VERSION}")
+        for statement in self.SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+        # (backend, origem, destino, frase) → [idioma, tradução, último
+        # uso]; o índice de trigramas, por (backend, origem, destino), aponta
+        # para essas chaves
+        self._entries = None
+        self._grams = {}
+        self.hits_exact = 0
+        self.hits_fuzzy = 0
+        self.misses = 0
+
+    def _load(self):
+        # Na primeira consulta (fora da thread da UI), as frases mais recentes
+        self._entries = {}
+        rows = self._db.execute(
+            "SELECT backend, src, dest, source, lang, target, used FROM memory"
+            " ORDER BY used DESC LIMIT ?", (self.max_entries,))
+        for backend, src, dest, source, lang, target, used in rows:
+            self._insert((backend, src, dest, source), [lang, target, used])
+
+    def _insert(self, key, entry):
+        if key not in self._entries and len(key[3]) >= FUZZY_MIN_LENGTH:
+            for gram in trigrams(fuzzy_form(key[3])):
+                self._grams.setdefault((key[:3], gram), set()).add(key)
+        self._entries[key] = entry
+
+    def _remove(self, key):
+        del self._entries[key]
+        if len(key[3]) >= FUZZY_MIN_LENGTH:
+            for gram in trigrams(fuzzy_form(key[3])):
+                keys = self._grams.get((key[:3], gram))
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._grams[(key[:3], gram)]
+
+    def _fuzzy(self, segment, scope):
+        form = fuzzy_form(segment)
+        grams = trigrams(form)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._grams.get((scope, gram), ()))
+        numbers = NUMBER.findall(segment)
+        best, best_score = None, self.min_similarity
+        for key, shared in counts.most_common(self.CANDIDATES):
+            # Sem metade dos trigramas em comum a semelhança não chega lá
+            if shared < len(grams) / 2:
+                break
+            if NUMBER.findall(key[3]) != numbers:
+                continue
+            other = fuzzy_form(key[3])
+            if not ocr_variant(form, other):
+                continue
+            score = similarity(form, other, best_score)
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def lookup(self, segments, dest, src="auto", backend=""):
+        # {frase: (idioma, tradução)} das frases encontradas
+        scope = (backend, src, dest)
+        found = {}
+        now = time.time()
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            used = []
+            for segment in segments:
+                key = scope + (segment,)
+                if key in self._entries:
+                    self.hits_exact += 1
+                else:
+                    key = None
+                    if len(segment) >= FUZZY_MIN_LENGTH:
+                        key = self._fuzzy(segment, scope)
+                    if key is None:
+                        self.misses += 1
+                        continue
+                    self.hits_fuzzy += 1
+                entry = self._entries[key]
+                entry[2] = now
+                found[segment] = (entry[0], entry[1])
+                used.append((now,) + key)
+            if used:
+                self._db.executemany(
+                    "UPDATE memory SET used = ? WHERE backend = ? AND src = ? AND dest = ?"
+                    " AND source = ?", used)
+                self._db.commit()
+        return found
+
+    def add(self, items, src="auto", backend=""):
+        # items: [(frase, destino, idioma detectado, tradução)], pedidas com
+        # a origem `src` ao `backend`
+        now = time.time()
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            for source, dest, lang, target in items:
+                self._insert((backend, src, dest, source), [lang, target, now])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO memory VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(backend, src, dest, source, lang, target, now)
+                 for source, dest, lang, target in items])
+            excess = len(self._entries) - self.max_entries
+            if excess > 0:
+                oldest = sorted(self._entries, key=lambda k: self._entries[k][2])[:excess]
+                for key in oldest:
+                    self._remove(key)
+                self._db.executemany("DELETE FROM memory WHERE backend = ? AND src = ?"
+                                     " AND dest = ? AND source = ?", oldest)
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {"hits_exact": self.hits_exact, "hits_fuzzy": self.hits_fuzzy,
+                    "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_translation_memory(config):
+    path = config["translation_memory_path"]
+    if not path:
+        return None
+    try:
+        return TranslationMemory(os.path.expanduser(path),
+                                 config["translation_memory_entries"],
+                                 config["translation_memory_similarity"])
+    except (OSError, sqlite3.Error) as e:
+        print(f"Aviso: memória de tradução desativada: {e}", file=sys.stderr)
+        return None
+
+
+# --- Métricas por estágio ---
+# Cada job guarda os tempos dos seus estágios em job.timings; o agregado
+# (janela móvel para os percentis e totais acumulados) fica em StageMetrics.
+
+# Estágios na ordem em que aparecem na linha de status
+TIMING_STAGES = ("captura", "decodificacao", "miniatura", "pre",
+                 "primeiro_bloco", "ocr", "deteccao", "traducao", "total")
+
+
+class StageMetrics:
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, window=512):
+        self.window = window
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+            count, total = self._totals.get(stage, (0, 0.0))
+            self._totals[stage] = (count + 1, total + seconds)
+
+    def snapshot(self):
+        with self._lock:
+            items = [(stage, list(samples), self._totals[stage])
+                     for stage, samples in self._samples.items()]
+        out = {}
+        for stage, samples, (count, total) in items:
+            values = sorted(samples)
+            entry = {"count": count, "sum": total, "last": samples[-1]}
+            for q in self.QUANTILES:
+                # Percentil pelo posto mais próximo, sobre a janela móvel
+                idx = min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))
+                entry[f"p{round(q * 100)}"] = values[idx]
+            out[stage] = entry
+        return out
+
+    def to_prometheus(self):
+        lines = ["# HELP ocrclipboard_stage_seconds Latência por estágio do pipeline",
+                 "# TYPE ocrclipboard_stage_seconds summary"]
+        for stage, entry in sorted(self.snapshot().items()):
+            for q in self.QUANTILES:
+                lines.append(f'ocrclipboard_stage_seconds{{stage="{stage}",quantile="{q}"}} '
+                             f'{entry[f"p{round(q * 100)}"]:.6f}')
+            lines.append(f'ocrclipboard_stage_seconds_sum{{stage="{stage}"}} {entry["sum"]:.6f}')
+            lines.append(f'ocrclipboard_stage_seconds_count{{stage="{stage}"}} {entry["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        # Escrita atômica: quem lê o arquivo nunca vê uma versão pela metade
+        if path.endswith(".prom"):
+            data = self.to_prometheus()
+        else:
+            data = json.dumps({"updated": time.time(), "stages": self.snapshot()},
+                              indent=2) + "\n"
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def format_seconds(seconds):
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    return f"{seconds:.2f} s"
+
+
+def format_timings(timings):
+    parts = [f"{stage} {format_seconds(timings[stage])}"
+             for stage in TIMING_STAGES if stage in timings]
+    return "Última captura — " + " · ".join(parts)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class CaptureJob:
+    _ids = itertools.count(1)
+
+    def __init__(self, directory=None, translate=True):
+        self.id = next(self._ids)
+        # Um arquivo por job: capturas seguidas não se sobrescrevem
+        self.path = None
+        if directory is not None:
+            self.path = os.path.join(directory, f"ocr_area-{self.id}.png")
+        self.translate = translate
+        # Idiomas de destino; None = os da configuração no momento da tradução
+        self.targets = None
+        # Região já capturada em memória (captura nativa): o estágio de
+        # captura só gera a prévia
+        self.image = None
+        self._cancel = threading.Event()
+        # Tempo (s) por estágio, ver TIMING_STAGES
+        self.started = time.perf_counter()
+        self.timings = {}
+        # Resultado, para o histórico (preenchidos pela tarefa `preview`)
+        self.thumb = self.size = self.image_hash = None
+        self.preview = None
+        self.ocr_text = self.translation = ""
+        # Idioma detectado no texto do OCR (ver OCRPipeline.detect)
+        self.language = None
+        # OCRResult da captura (caixas nas coordenadas da imagem reconhecida)
+        self.ocr_result = None
+        self.history_id = None
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def wait(self, timeout):
+        # Dorme até `timeout` s; True se o job foi cancelado nesse meio tempo
+        return self._cancel.wait(timeout)
+
+
+class OCRPipeline:
+    # Pipeline em estágios (captura → pré-processamento → OCR → tradução),
+    # cada um em sua thread, ligados por filas. Os resultados voltam para
+    # a UI pela fila `results`, lida com after() na thread do Tk.
+    def __init__(self, translator, results, engine=None, caches=None, config=None,
+                 history=None):
+        self.config = config or DEFAULT_CONFIG
+        self.translator = translator
+        self.results = results
+        # Sem motor dado, é criado no primeiro uso (ou por warm())
+        self._engine = engine
+        self._engine_lock = threading.Lock()
+        self.caches = caches or {}
+        self.history = history
+        self.metrics = StageMetrics(self.config["metrics_window"])
+        # Pacote do Tesseract para a próxima captura no modo "auto"
+        self.ocr_pack = OCR_LANG
+        # OCR de blocos em paralelo e tradução por bloco
+        self.ocr_workers = os.cpu_count() or 1
+        self.ocr_executor = ThreadPoolExecutor(max_workers=self.ocr_workers,
+                                               thread_name_prefix="ocr-block")
+        self.translate_executor = ThreadPoolExecutor(max_workers=2,
+                                                     thread_name_prefix="translate-block")
+        # Um destino por tarefa; separado para quem espera nele (estágio de
+        # tradução, retranslate) não ocupar os próprios workers
+        self.target_executor = ThreadPoolExecutor(max_workers=4,
+                                                  thread_name_prefix="translate-target")
+        # Miniatura e hash da captura (e o zoom da prévia na UI), em paralelo
+        # ao pré-processamento
+        self.preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        self.stages = [
+            ("captura", self.capture),
+            ("pre", self.preprocess),
+            ("ocr", self.ocr),
+            ("traducao", self.translate),
+        ]
+        self.queues = [queue.Queue() for _ in self.stages]
+        self.threads = []
+        for idx, (name, func) in enumerate(self.stages):
+            t = threading.Thread(target=self._run_stage, args=(idx, func),
+                                 name=f"stage-{name}", daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    @property
+    def engine(self):
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = make_ocr_engine(self.config["ocr_engine"],
+                                               self.config["ocr_workers"])
+            return self._engine
+
+    def submit(self, job):
+        self.queues[0].put((job, None))
+
+    def submit_image(self, job, img):
+        # Imagem já capturada (ex.: clipboard): entra direto no pré-processamento
+        self.queues[1].put((job, img))
+
+    def warm(self):
+        # Cria o motor e carrega os modelos do Tesseract em segundo plano
+        threading.Thread(target=self._warm, name="ocr-warm", daemon=True).start()
+
+    def _warm(self):
+        try:
+            load_modules()
+            self.engine.warm(self.ocr_pack if self.config["ocr_lang"] == "auto"
+                             else self.config["ocr_lang"])
+        except Exception as e:
+            print(f"Aviso: falha ao carregar o motor de OCR: {e}", file=sys.stderr)
+
+    def shutdown(self):
+        for q in self.queues:
+            q.put((None, None))
+        self.ocr_executor.shutdown(wait=False, cancel_futures=True)
+        self.translate_executor.shutdown(wait=False, cancel_futures=True)
+        self.target_executor.shutdown(wait=False, cancel_futures=True)
+        self.preview_executor.shutdown(wait=False, cancel_futures=True)
+        if self._engine is not None:
+            self._engine.close()
+        self.translator.close()
+        for cache in self.caches.values():
+            cache.close()
+        if self.history is not None:
+            self.history.close()
+
+    def emit(self, kind, job, *payload):
+        self.results.put((kind, job) + payload)
+
+    @contextmanager
+    def span(self, job, name):
+        # Só conta estágios concluídos: um job cancelado ou com erro não
+        # entra nas métricas
+        start = time.perf_counter()
+        yield
+        self.record(job, name, time.perf_counter() - start)
+
+    def record(self, job, name, seconds):
+        job.timings[name] = job.timings.get(name, 0.0) + seconds
+        self.metrics.record(name, seconds)
+
+    def finish_job(self, job):
+        if job.preview is not None:
+            # Miniatura e hash para o histórico (em geral já prontos)
+            try:
+                job.preview.result()
+            except Exception as e:
+                print(f"Aviso: falha ao gerar a prévia: {e}", file=sys.stderr)
+        self.record(job, "total", time.perf_counter() - job.started)
+        if self.history is not None and job.thumb is not None:
+            try:
+                job.history_id = self.history.add(
+                    job.image_hash, job.size, encode_thumbnail(job.thumb),
+                    job.ocr_text, job.translation, job.timings)
+            except sqlite3.Error as e:
+                print(f"Aviso: falha ao gravar no histórico: {e}", file=sys.stderr)
+        self.emit("metricas", job, dict(job.timings))
+        path = self.config["metrics_export"]
+        if path:
+            try:
+                self.metrics.export(os.path.expanduser(path))
+            except OSError as e:
+                print(f"Aviso: falha ao exportar métricas ({path}): {e}", file=sys.stderr)
+
+    def _run_stage(self, idx, func):
+        name = self.stages[idx][0]
+        while True:
+            job, data = self.queues[idx].get()
+            if job is None:
+                break
+            if job.cancelled:
+                continue
+            load_modules()
+            try:
+                out = func(job, data)
+            except JobCancelled:
+                continue
+            except Exception as e:
+                self.emit("erro", job, name, str(e))
+                continue
+            if job.cancelled or out is None:
+                continue
+            if idx + 1 < len(self.stages):
+                self.queues[idx + 1].put((job, out))
+
+    # --- Estágios ---
+
+    def capture(self, job, _):
+        if job.image is not None:
+            img, job.image = job.image, None
+            return self.preview(job, img, None)
+        # Sem imagem pronta (inclusive "x11" sem display): ferramenta externa
+        try:
+            if self.config["capture_tool"] == "maim":
+                with self.span(job, "captura"):
+                    png = self.capture_pipe(job)
+            else:
+                png = self.capture_file(job)
+        except (subprocess.CalledProcessError, OSError):
+            self.emit("erro", job, "captura", "Falha ao capturar a área.")
+            return None
+        except CaptureTimeout:
+            self.emit("erro", job, "captura", f"Nenhuma área capturada:\n{job.path}")
+            return None
+
+        # Decodifica uma única vez; esta imagem segue para prévia,
+        # pré-processamento e OCR, e os bytes PNG ficam para o clipboard
+        try:
+            with self.span(job, "decodificacao"):
+                img = Image.open(io.BytesIO(png))
+                img.load()
+        except Exception as e:
+            self.emit("erro", job, "imagem", str(e))
+            return None
+        return self.preview(job, img, png)
+
+    def preview(self, job, img, png):
+        # `png` são os bytes originais, quando houver; sem eles a UI codifica
+        # a imagem só se o usuário copiá-la. A UI só guarda a imagem inteira
+        # se não houver PNG para copiar
+        self.emit("captura", job, png, img if png is None else None, img.size)
+        # A imagem segue já para o pré-processamento; a miniatura chega à
+        # UI depois, como "miniatura"
+        job.preview = self.preview_executor.submit(self.render_preview, job, img)
+        return img
+
+    def render_preview(self, job, img):
+        with self.span(job, "miniatura"):
+            thumb = make_thumbnail(img)
+        if not job.cancelled:
+            self.emit("miniatura", job, thumb)
+        if self.history is not None:
+            job.thumb, job.size, job.image_hash = thumb, img.size, image_hash(img)
+
+    def capture_pipe(self, job):
+        # maim -s devolve o PNG pelo stdout: sem arquivo, sem espera
+        proc = subprocess.run(["maim", "-s", "-f", "png"], check=True,
+                              stdout=subprocess.PIPE)
+        return proc.stdout
+
+    def capture_file(self, job):
+        # Guarda mtime anterior
+        try:
+            old_mtime = os.stat(job.path).st_mtime_ns
+        except FileNotFoundError:
+            old_mtime = None
+
+        # O watch é criado antes do processo para não perder o evento
+        watch = open_watch(os.path.dirname(job.path))
+        try:
+            proc = subprocess.Popen(["gnome-screenshot", "-a", "-f", job.path])
+            try:
+                # "captura" inclui o tempo do usuário selecionando a área
+                with self.span(job, "captura"):
+                    wait_for_capture(job.path, old_mtime, self.config["capture_timeout"],
+                                     watch, job.check, proc)
+            except BaseException:
+                proc.kill()
+                raise
+            finally:
+                proc.wait()
+        finally:
+            if watch is not None:
+                watch.close()
+        try:
+            with open(job.path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(job.path)
+
+    def preprocess(self, job, img):
+        # Além do total, cada estágio da cadeia entra nas métricas como pre:<nome>
+        # (o planejamento das faixas conta no mesmo "pre")
+        limit = self.config["memory_limit_mb"] * 1024 * 1024
+        timings = {}
+        with self.span(job, "pre"):
+            tiled = None
+            if limit:
+                tiled = plan_tiles(img, self.config["preprocess"], limit, self.ocr_workers)
+            if tiled is None:
+                bw = preprocess_image(img, self.config["preprocess"], timings)
+        if tiled is not None:
+            return tiled
+        for name, seconds in timings.items():
+            self.metrics.record(f"pre:{name}", seconds)
+        return bw
+
+    def cached(self, name, key, compute):
+        cache = self.caches.get(name)
+        if cache is not None:
+            value = cache.get(key)
+            if value is not None:
+                return value
+        start = time.perf_counter()
+        value = compute()
+        if cache is not None:
+            cache.put(key, value, time.perf_counter() - start)
+        return value
+
+    def cache_stats(self):
+        stats = {name: cache.stats() for name, cache in self.caches.items()}
+        if self.translator.memory is not None:
+            stats["memory"] = self.translator.memory.stats()
+        return stats
+
+    def run_ocr(self, bw, lang):
+        # OCRResult de `bw`; o cache guarda a forma compacta (to_cache), e
+        # as chaves marcadas como "estruturado" não reaproveitam entradas
+        # antigas, só com o texto
+        if not self.config["ocr_adaptive"]:
+            key = ocr_cache_key(bw, lang, self.engine.name, "estruturado")
+            compute = lambda: self.engine.recognize(bw, lang)
+        else:
+            min_confidence = self.config["ocr_min_confidence"]
+            key = ocr_cache_key(bw, lang, self.engine.name,
+                                f"adaptativo:{min_confidence}:estruturado")
+            compute = lambda: self.ocr_adaptive(bw, lang, min_confidence)
+        return OCRResult.from_cache(self.cached("ocr", key, lambda: compute().to_cache()))
+
+    def ocr_adaptive(self, bw, lang, min_confidence):
+        # Cada classe de captura e as segundas tentativas entram nas
+        # métricas como ocr:<classe> e ocr:refeito
+        timings = {}
+        result = adaptive_ocr(self.engine, bw, lang, min_confidence, timings)
+        for name, seconds in timings.items():
+            self.metrics.record(f"ocr:{name}", seconds)
+        return result
+
+    def current_lang(self):
+        lang = self.config["ocr_lang"]
+        return self.ocr_pack if lang == "auto" else lang
+
+    def ocr(self, job, bw):
+        if isinstance(bw, TiledCapture):
+            return self.ocr_tiles(job, bw)
+        if bw.height >= self.config["stream_min_height"]:
+            blocks = segment_blocks(np.asarray(bw), self.config["stream_block_lines"])
+            if len(blocks) > 1:
+                lang = self.current_lang()
+                return self.ocr_stream(job, len(blocks), bw.size, lambda i: self.run_ocr(
+                    bw.crop((0, blocks[i][0], bw.width, blocks[i][1])), lang
+                ).mapped(bw.size, dy=blocks[i][0]))
+        lang = self.config["ocr_lang"]
+        if lang != "auto":
+            with self.span(job, "ocr"):
+                result = self.run_ocr(bw, lang)
+        else:
+            result = self.ocr_auto(job, bw)
+        job.ocr_result = result
+        job.ocr_text = result.text
+        self.emit("ocr", job, job.ocr_text)
+        return job.ocr_text
+
+    def ocr_auto(self, job, bw):
+        # Usa o pacote de um idioma só (mais rápido que por+eng) do idioma
+        # detectado na captura anterior; se o texto sair em outro idioma,
+        # refaz com o pacote certo
+        # As duas passadas contam como um único "ocr"
+        pack = self.ocr_pack
+        start = time.perf_counter()
+        result = self.run_ocr(bw, pack)
+        seconds = time.perf_counter() - start
+        detected = self.detect(job, result.text)
+        wanted = TESSERACT_PACKS.get(detected, OCR_LANG)
+        if detected is not None and wanted != pack:
+            self.ocr_pack = wanted
+            if pack != OCR_LANG:
+                job.check()
+                start = time.perf_counter()
+                result = self.run_ocr(bw, wanted)
+                seconds += time.perf_counter() - start
+        self.record(job, "ocr", seconds)
+        return result
+
+    def detect(self, job, texto):
+        # Idioma do texto do OCR, detectado uma única vez por captura: o
+        # modo "auto" do OCR e a tradução usam o mesmo resultado
+        if "deteccao" not in job.timings:
+            with self.span(job, "deteccao"):
+                job.language = detect_language(texto)
+        return job.language
+
+    def job_source(self, job, texto):
+        # Origem fixada na configuração (--from) dispensa a detecção
+        source = self.config["translation_source"]
+        return self.detect(job, texto) if source == "auto" else source
+
+    def ocr_tiles(self, job, tiled):
+        # Cada faixa é pré-processada e reconhecida dentro da tarefa, e os
+        # arrays intermediários saem de escopo antes da próxima
+        chain = self.config["preprocess"]
+        lang = self.current_lang()
+        slots = threading.Semaphore(tiled.parallel)
+
+        def ocr_tile(i):
+            top, bottom = tiled.tiles[i]
+            with slots:
+                job.check()
+                band = np.asarray(tiled.gray.crop((0, top, tiled.gray.width, bottom)))
+                bw = Image.fromarray(run_preprocess(band, chain))
+                del band
+                # O pré-processamento pode ter ampliado a faixa
+                return self.run_ocr(bw, lang).mapped(tiled.gray.size,
+                                                     (bottom - top) / bw.height, dy=top)
+
+        return self.ocr_stream(job, len(tiled.tiles), tiled.gray.size, ocr_tile)
+
+    def ocr_stream(self, job, total, size, ocr_block):
+        # Capturas grandes: OCR de cada bloco (`ocr_block(i)` devolve o
+        # OCRResult já nas coordenadas da imagem inteira, de tamanho `size`)
+        # em paralelo; cada bloco é exibido assim que fica pronto e
+        # já segue para a tradução. Faz o papel dos estágios de OCR e
+        # tradução (devolve None). Os tempos de cada bloco vão para as
+        # métricas; no job ficam o OCR completo e o primeiro bloco, medidos
+        # desde o início do estágio.
+        start = time.perf_counter()
+        results = [None] * total
+        texts = [""] * total
+        translations = [""] * total
+        # Os blocos são traduzidos para o primeiro destino no momento em que
+        # ficam prontos (job.targets pode mudar durante o OCR, ver
+        # apply_targets); os demais destinos, e o primeiro se mudou no meio,
+        # recebem o texto completo no fim
+        dests = [None] * total
+        kinds = {}
+        for i in range(total):
+            kinds[self.ocr_executor.submit(self.timed, "ocr_bloco", ocr_block, i)] = ("ocr", i)
+        pending = set(kinds)
+        # Blocos ainda sem resultado guardado: o OCR completo fecha uma única
+        # vez, quando o último chega (vários podem vir no mesmo lote do wait)
+        missing = total
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                job.check()
+                for future in done:
+                    kind, i = kinds[future]
+                    if kind == "ocr":
+                        results[i] = future.result()
+                        texts[i] = results[i].text
+                        missing -= 1
+                        if "primeiro_bloco" not in job.timings:
+                            self.record(job, "primeiro_bloco", time.perf_counter() - start)
+                        self.emit("ocr_bloco", job, i, total, texts[i])
+                        if job.translate and texts[i]:
+                            dests[i] = self.job_targets(job)[0]
+                            tr = self.translate_executor.submit(
+                                self.timed, "traducao_bloco", self.translate_cached,
+                                texts[i], None, dests[i])
+                            kinds[tr] = ("traducao", i)
+                            pending.add(tr)
+                        if not missing:
+                            self.record(job, "ocr", time.perf_counter() - start)
+                            self.finish_stream_ocr(job, results, size)
+                    else:
+                        translations[i] = future.result()
+                        if dests[i] == self.job_targets(job)[0]:
+                            self.emit("traducao_bloco", job, i, total, translations[i])
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        if job.translate:
+            targets = self.job_targets(job)
+            done, rest = {}, targets
+            if all(dest == targets[0] for dest, text in zip(dests, texts) if text):
+                done, rest = {targets[0]: "\n\n".join(t for t in translations if t)}, targets[1:]
+            if rest:
+                done.update(self.translate_targets(job.ocr_text, rest))
+            job.translation = format_translations({dest: done[dest] for dest in targets})
+            self.emit("traducao", job, job.translation)
+            self.emit("cache", job, self.cache_stats())
+        self.finish_job(job)
+        return None
+
+    def timed(self, name, func, *args):
+        # Para tarefas nos executores: mede só para as métricas agregadas
+        start = time.perf_counter()
+        value = func(*args)
+        self.metrics.record(name, time.perf_counter() - start)
+        return value
+
+    def finish_stream_ocr(self, job, results, size):
+        job.ocr_result = OCRResult.concat(results, size)
+        texto = job.ocr_text = job.ocr_result.text
+        self.emit("ocr", job, texto)
+        if self.config["ocr_lang"] == "auto":
+            detected = self.detect(job, texto)
+            if detected is not None:
+                self.ocr_pack = TESSERACT_PACKS.get(detected, OCR_LANG)
+
+    def job_targets(self, job):
+        return job.targets or self.config["target_langs"]
+
+    def translate_cached(self, texto, src=None, dest=None):
+        dest = dest or self.config["target_langs"][0]
+        if src is None and self.config["translation_source"] != "auto":
+            src = self.config["translation_source"]
+        try:
+            key = translation_cache_key(texto, src or "auto", dest,
+                                        self.translator.backend_class.name)
+            return self.cached("translation", key,
+                               lambda: translate_text(self.translator, texto, dest, src))
+        except Exception as e:
+            return f"[Erro na tradução: {e}]"
+
+    def translate_targets(self, texto, targets, src=None):
+        # {destino: tradução}, com os destinos traduzidos em paralelo
+        if len(targets) == 1:
+            return {targets[0]: self.translate_cached(texto, src, targets[0])}
+        futures = [(dest, self.target_executor.submit(self.translate_cached, texto, src, dest))
+                   for dest in targets]
+        return {dest: future.result() for dest, future in futures}
+
+    def translate(self, job, texto):
+        if job.translate:
+            src = self.job_source(job, texto)
+            with self.span(job, "traducao"):
+                job.translation = format_translations(
+                    self.translate_targets(texto, self.job_targets(job), src))
+            self.emit("traducao", job, job.translation)
+            self.emit("cache", job, self.cache_stats())
+        self.finish_job(job)
+
+    def retranslate(self, job, targets):
+        # Novo job com o OCR já feito de `job`, traduzido para `targets` sem
+        # recapturar nem refazer o OCR (nem a detecção do idioma). Não entra
+        # no histórico nem nas métricas de captura.
+        new = CaptureJob()
+        new.ocr_text = job.ocr_text
+        new.language = job.language
+        new.targets = list(targets)
+        self.translate_executor.submit(self._retranslate, new)
+        return new
+
+    def _retranslate(self, job):
+        if job.cancelled:
+            return
+        # Sem spans: só as capturas entram nas métricas
+        src = self.config["translation_source"]
+        if src == "auto":
+            src = job.language or detect_language(job.ocr_text)
+        job.translation = format_translations(
+            self.translate_targets(job.ocr_text, job.targets, src))
+        self.emit("traducao", job, job.translation)
+        self.emit("cache", job, self.cache_stats())
+
+
+# --- Observar área: recaptura periódica de uma região fixa ---
+# Um diff barato do quadro reduzido descarta os ticks sem mudança; nos que
+# mudaram, cada bloco de texto é comparado (hash perceptual) com os do
+# quadro anterior e só os blocos novos vão ao OCR e à tradução.
+
+def dhash(img, width=32, height=8):
+    # Hash de diferenças: compara vizinhos horizontais na imagem reduzida.
+    # Devolve os bits como bytes (width * height bits)
+    small = np.asarray(img.convert('L').resize((width + 1, height), Image.BILINEAR),
+                       dtype=np.int16)
+    return np.packbits(small[:, 1:] > small[:, :-1]).tobytes()
+
+
+def hamming(a, b):
+    return int(np.unpackbits(np.frombuffer(a, np.uint8) ^ np.frombuffer(b, np.uint8)).sum())
+
+
+def frame_signature(img, factor=4):
+    return np.asarray(img.convert('L').reduce(factor), dtype=np.int16)
+
+
+def frame_changed(prev, cur, sensitivity, delta=32):
+    # Mudou se mais que `sensitivity` dos pixels variou mais de `delta` níveis
+    if prev is None or prev.shape != cur.shape:
+        return True
+    return float((np.abs(cur - prev) > delta).mean()) > sensitivity
+
+
+class RegionWatcher:
+    # Bits do dhash que podem diferir para dois blocos contarem como o mesmo
+    # (ruído da binarização, compressão de vídeo)
+    BLOCK_TOLERANCE = 12
+
+    def __init__(self, pipeline, job, bbox, config, grab=None):
+        self.pipeline = pipeline
+        self.job = job
+        self.bbox = bbox
+        self.config = config
+        self.grab = grab or grab_screen
+        self.signature = None
+        # Blocos do último quadro: [(hash, altura, texto, tradução)], com as
+        # traduções para `dest` (o primeiro idioma de destino)
+        self.blocks = []
+        self.dest = None
+        self.ocr_calls = 0
+
+    def start(self):
+        threading.Thread(target=self.run, name="observar", daemon=True).start()
+
+    def retarget(self):
+        # Destino trocado: o próximo tick reprocessa o quadro mesmo sem
+        # mudança, retraduzindo os blocos já conhecidos (sem novo OCR)
+        self.signature = None
+
+    def run(self):
+        interval = self.config["watch_interval"]
+        while not self.job.cancelled:
+            start = time.monotonic()
+            try:
+                load_modules()
+                self.tick()
+            except JobCancelled:
+                return
+            except Exception as e:
+                self.pipeline.emit("erro", self.job, "observar", str(e))
+                return
+            if self.job.wait(max(0.0, interval - (time.monotonic() - start))):
+                return
+
+    def tick(self):
+        # True se o quadro mudou (e os textos foram reemitidos)
+        img = self.grab(self.bbox)
+        signature = frame_signature(img)
+        if not frame_changed(self.signature, signature, self.config["watch_sensitivity"]):
+            return False
+        self.signature = signature
+
+        bw = preprocess_image(img, self.config["preprocess"])
+        spans = segment_blocks(np.asarray(bw), self.config["stream_block_lines"])
+        lang = self.config["ocr_lang"]
+        if lang == "auto":
+            lang = self.pipeline.ocr_pack
+        blocks, pending = [], {}
+        for i, (top, bottom) in enumerate(spans):
+            crop = bw.crop((0, top, bw.width, bottom))
+            h = dhash(crop)
+            known = self.find(h, bottom - top)
+            if known is None:
+                pending[i] = self.pipeline.ocr_executor.submit(self.pipeline.run_ocr, crop, lang)
+                blocks.append((h, bottom - top, None, None))
+            else:
+                blocks.append(known)
+        self.ocr_calls += len(pending)
+        for i, future in pending.items():
+            h, height, _, _ = blocks[i]
+            blocks[i] = (h, height, future.result().text, None)
+            self.job.check()
+        dest = self.pipeline.job_targets(self.job)[0]
+        if self.job.translate:
+            for i, (h, height, texto, traducao) in enumerate(blocks):
+                if texto and (traducao is None or dest != self.dest):
+                    blocks[i] = (h, height, texto,
+                                 self.pipeline.translate_cached(texto, dest=dest))
+                    self.job.check()
+        self.blocks = blocks
+        self.dest = dest
+
+        thumb = make_thumbnail(img)
+        self.pipeline.emit("quadro", self.job, thumb, img)
+        self.pipeline.emit("ocr", self.job, "\n\n".join(b[2] for b in blocks if b[2]))
+        if self.job.translate:
+            self.pipeline.emit("traducao", self.job,
+                               "\n\n".join(b[3] for b in blocks if b[3]))
+        return True
+
+    def find(self, h, height):
+        for block in self.blocks:
+            if abs(block[1] - height) <= 2 and hamming(block[0], h) <= self.BLOCK_TOLERANCE:
+                return block
+        return None
+
+
+# --- Instância única: servidor residente num socket Unix ---
+# A primeira execução escuta no socket; as seguintes (ou um atalho de
+# teclado com `ocrclipboardtranslate capture`) só enviam um comando por
+# linha e saem, sem carregar Tk/PIL/Tesseract de novo.
+
+# "targets pt,en" troca os idiomas de destino da instância aberta
+INSTANCE_COMMANDS = ("capture", "show", "quit", "ping", "targets")
+
+
+# instance_socket_path() e send_command() ficam no início do arquivo
+
+class InstanceServer:
+    def __init__(self, path=None):
+        self.path = path or instance_socket_path()
+        self.sock = None
+        self.commands = queue.Queue()
+
+    def claim(self):
+        # False se outra instância já atende no socket. Um socket órfão
+        # (processo morto) é removido e reaproveitado
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                sock.bind(self.path)
+            except OSError as e:
+                if e.errno != errno.EADDRINUSE:
+                    raise
+                if send_command("ping", self.path) is not None:
+                    sock.close()
+                    return False
+                os.unlink(self.path)
+                sock.bind(self.path)
+            os.chmod(self.path, 0o600)
+            sock.listen(8)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+        threading.Thread(target=self._serve, args=(sock,), name="instancia",
+                         daemon=True).start()
+        return True
+
+    def _serve(self, sock):
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return  # socket fechado
+            with conn:
+                conn.settimeout(2.0)
+                try:
+                    command = conn.makefile("r", encoding="utf-8").readline().strip()
+                    if command.partition(" ")[0] not in INSTANCE_COMMANDS:
+                        conn.sendall(b"erro\n")
+                        continue
+                    # Executado pela UI (poll_commands); aqui só enfileira
+                    if command != "ping":
+                        self.commands.put(command)
+                    conn.sendall(b"ok\n")
+                except OSError:
+                    pass
+
+    def close(self):
+        if self.sock is None:
+            return
+        self.sock.close()
+        self.sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class RegionSelector(tk.Toplevel):
+    # Sobreposição de tela cheia mostrando a tela congelada: o usuário
+    # arrasta um retângulo (Esc ou botão direito cancela) e `callback`
+    # recebe a caixa (x0, y0, x1, y1) ou None
+    MIN_SIZE = 3
+
+    def __init__(self, master, screen, callback):
+        super().__init__(master)
+        self.callback = callback
+        self.origin = None
+        self.overrideredirect(True)
+        self.geometry(f"{screen.width}x{screen.height}+0+0")
+        self.attributes("-topmost", True)
+        self.photo = ImageTk.PhotoImage(screen)
+        self.canvas = tk.Canvas(self, width=screen.width, height=screen.height,
+                                highlightthickness=0, cursor="crosshair")
+        self.canvas.pack()
+        self.canvas.create_image(0, 0, image=self.photo, anchor="nw")
+        self.rect = self.canvas.create_rectangle(0, 0, 0, 0, outline="red", width=2,
+                                                 state="hidden")
+        self.canvas.bind("<ButtonPress-1>", self.on_press)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        self.canvas.bind("<Button-3>", lambda e: self.finish(None))
+        self.bind("<Escape>", lambda e: self.finish(None))
+        self.wait_visibility()
+        self.grab_set()
+        self.focus_force()
+
+    def on_press(self, event):
+        self.origin = (event.x, event.y)
+        self.canvas.coords(self.rect, event.x, event.y, event.x, event.y)
+        self.canvas.itemconfigure(self.rect, state="normal")
+
+    def on_drag(self, event):
+        if self.origin is not None:
+            self.canvas.coords(self.rect, *self.origin, event.x, event.y)
+
+    def on_release(self, event):
+        if self.origin is None:
+            return
+        (x0, y0), (x1, y1) = self.origin, (event.x, event.y)
+        box = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        if box[2] - box[0] < self.MIN_SIZE or box[3] - box[1] < self.MIN_SIZE:
+            box = None
+        self.finish(box)
+
+    def finish(self, box):
+        self.grab_release()
+        self.destroy()
+        self.callback(box)
+
+
+class HistoryPanel(tk.Toplevel):
+    # Histórico pesquisável. As linhas vêm em páginas à medida que a
+    # rolagem chega perto do fim, e a miniatura e os textos completos só são
+    # lidos quando uma entrada é selecionada
+    PAGE_SIZE = 100
+    SEARCH_DELAY_MS = 250
+
+    def __init__(self, app, store):
+        super().__init__(app)
+        self.app = app
+        self.store = store
+        self.title("Histórico")
+        self.geometry("700x650")
+        self.query = ""
+        self.last_key = None
+        self.exhausted = False
+        self.loading = False
+        self.search_after = None
+        self.entry = None
+
+        self.search_var = tk.StringVar()
+        ttk.Entry(self, textvariable=self.search_var).pack(fill="x", padx=10, pady=(10, 5))
+        self.search_var.trace_add("write", self.on_search)
+
+        frame = ttk.Frame(self)
+        frame.pack(fill="both", expand=True, padx=10)
+        self.tree = ttk.Treeview(frame, columns=("data", "vezes", "texto"),
+                                 show="headings", selectmode="browse")
+        self.tree.heading("data", text="Data")
+        self.tree.heading("vezes", text="Vezes")
+        self.tree.heading("texto", text="Texto")
+        self.tree.column("data", width=130, stretch=False)
+        self.tree.column("vezes", width=50, stretch=False, anchor="e")
+        self.scroll = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.scroll.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Double-1>", lambda e: self.restore())
+
+        self.preview = ttk.Label(self)
+        self.preview.pack(pady=5)
+        self.text = tk.Text(self, wrap="word", height=8)
+        self.text.pack(fill="x", padx=10)
+        buttons = ttk.Frame(self)
+        buttons.pack(pady=5)
+        ttk.Button(buttons, text="Abrir na Janela", command=self.restore).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Excluir", command=self.delete).pack(side="left", padx=5)
+        self.reload()
+
+    def reload(self):
+        self.tree.delete(*self.tree.get_children())
+        self.last_key = None
+        self.exhausted = False
+        self.load_page()
+
+    def load_page(self):
+        self.loading = False
+        if self.exhausted:
+            return
+        try:
+            rows = self.store.page(self.query, self.last_key, self.PAGE_SIZE)
+        except sqlite3.Error:
+            rows = []
+        for entry_id, updated, count, text in rows:
+            date = time.strftime("%d/%m/%Y %H:%M", time.localtime(updated))
+            first = (text or "").strip().split("\n", 1)[0]
+            self.tree.insert("", "end", iid=str(entry_id), values=(date, count, first))
+        if len(rows) < self.PAGE_SIZE:
+            self.exhausted = True
+        if rows:
+            self.last_key = (rows[-1][1], rows[-1][0])
+
+    def on_scroll(self, first, last):
+        self.scroll.set(first, last)
+        # Carrega a próxima página fora do callback (inserir linhas o
+        # dispara de novo)
+        if float(last) > 0.9 and not self.exhausted and not self.loading:
+            self.loading = True
+            self.after_idle(self.load_page)
+
+    def on_search(self, *_):
+        if self.search_after is not None:
+            self.after_cancel(self.search_after)
+        self.search_after = self.after(self.SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self.search_after = None
+        self.query = self.search_var.get()
+        self.reload()
+
+    def on_select(self, _event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        self.entry = self.store.get(int(selection[0]))
+        if self.entry is None:
+            return
+        self.photo = ImageTk.PhotoImage(Image.open(io.BytesIO(self.entry["thumb"])))
+        self.preview.configure(image=self.photo)
+        text = self.entry["ocr"]
+        if self.entry["translation"]:
+            text += "\n\n--- Tradução ---\n" + self.entry["translation"]
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", text)
+
+    def restore(self):
+        if self.entry is not None:
+            self.app.show_history_entry(self.entry)
+
+    def delete(self):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        self.store.delete(int(selection[0]))
+        self.tree.delete(selection[0])
+        self.entry = None
+        self.preview.configure(image="")
+        self.text.delete("1.0", tk.END)
+
 
 class OCRClipboardApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, server=None, config=None):
         super().__init__()
         self.title("OCR & Translate Clipboard App")
         self.geometry("600x800")
 
-        # Arquivo temporário absoluto
-        self.tmp = os.path.join(tempfile.gettempdir(), "ocr_area.png")
+        # Diretório temporário privado para as capturas e PNG da captura atual
+        self.tmpdir = tempfile.mkdtemp(prefix="ocrclipboard-")
+        self.png = None
+        self.capture_image = None
+        self.selecting = False
+        self.ocr_blocks = self.trans_blocks = None
+        # Miniatura exibida e OCRResult da captura, para a sobreposição
+        # clicável das linhas (layout_line = linha selecionada)
+        self.thumb = self.layout = self.layout_line = None
+        # Zoom da prévia: tamanho da captura original, vista pedida (escala,
+        # x0, y0; None = miniatura inteira), (imagem, vista) exibida e blocos
+        # (PreviewTiles)
+        self.preview_size = self.view = self.view_image = self.preview_tiles = None
+        # Evento da vista pedida à thread da prévia; marcado quando outra a
+        # substitui
+        self.view_request = None
+        # Arrasto em andamento: (x, y, vista no início, moveu)
+        self.drag = None
+
+        self.settings = config or load_config()
+        # Servidor de instância única (None = sem socket)
+        self.server = server
+        # Cópias para o clipboard (criado em start_backend)
+        self.clipboard_service = None
 
         # Tradutor
-        self.translator = Translator()
+        self.translator = TranslationClient(self.settings,
+                                            memory=open_translation_memory(self.settings))
+
+        # Pipeline em segundo plano e job corrente. O motor de OCR é criado
+        # e aquecido depois que a janela aparece (ver start_backend)
+        self.results = queue.Queue()
+        self.history = open_history(self.settings)
+        self.history_panel = None
+        self.pipeline = OCRPipeline(self.translator, self.results, None,
+                                    make_caches(self.settings), self.settings, self.history)
+        self.job = None
 
         # Botão de captura
-        self.btn = ttk.Button(self, text="Selecionar Área", command=self.select_area_ocr)
-        self.btn.pack(pady=10)
+        buttons = ttk.Frame(self)
+        buttons.pack(pady=10)
+        self.btn = ttk.Button(buttons, text="Selecionar Área", command=self.select_area_ocr)
+        self.btn.pack(side="left", padx=5)
+        # Observar área: recaptura periódica de uma região fixa
+        self.watch_btn = ttk.Button(buttons, text="Observar Área", command=self.toggle_watch)
+        self.watch_btn.pack(side="left", padx=5)
+        self.watcher = None
+        self.history_btn = ttk.Button(buttons, text="Histórico", command=self.open_history_panel,
+                                      state="normal" if self.history is not None else "disabled")
+        self.history_btn.pack(side="left", padx=5)
+
+        # Idiomas: pacote do OCR (vale a partir da próxima captura) e
+        # destinos da tradução (retraduz a captura atual, sem refazer o OCR)
+        langs = ttk.Frame(self)
+        langs.pack(pady=(0, 5))
+        ttk.Label(langs, text="OCR:").pack(side="left")
+        self.ocr_lang_var = tk.StringVar(value=self.settings["ocr_lang"])
+        self.ocr_lang_box = ttk.Combobox(langs, textvariable=self.ocr_lang_var, width=10,
+                                         values=["auto"], postcommand=self.list_ocr_langs)
+        self.ocr_lang_box.pack(side="left", padx=(2, 10))
+        self.ocr_lang_box.bind("<<ComboboxSelected>>", self.apply_ocr_lang)
+        self.ocr_lang_box.bind("<Return>", self.apply_ocr_lang)
+        ttk.Label(langs, text="Traduzir para:").pack(side="left")
+        self.target_var = tk.StringVar(value=", ".join(self.settings["target_langs"]))
+        self.target_box = ttk.Combobox(langs, textvariable=self.target_var, width=14,
+                                       values=list(LANGUAGE_NAMES) + ["pt, en", "pt, en, es"])
+        self.target_box.pack(side="left", padx=2)
+        self.target_box.bind("<<ComboboxSelected>>", self.apply_targets)
+        self.target_box.bind("<Return>", self.apply_targets)
+        self.target_box.bind("<FocusOut>", self.apply_targets)
 
         # Exibição da imagem
         self.image_label = ttk.Label(self)
@@ -35,101 +3397,546 @@ class OCRClipboardApp(tk.Tk):
         self.text_ocr.pack(fill="both", expand=False, padx=10, pady=(0,10))
 
         # Área Tradução
-        ttk.Label(self, text="Tradução (PT):").pack(anchor="w", padx=10)
+        self.trans_label = ttk.Label(self, text=self.translation_title())
+        self.trans_label.pack(anchor="w", padx=10)
         self.text_trans = tk.Text(self, wrap="word", height=8)
         self.text_trans.pack(fill="both", expand=True, padx=10, pady=(0,10))
 
+        # Linha de status (acertos do cache etc.)
+        self.status = ttk.Label(self, text="", anchor="w")
+        self.status.pack(fill="x", padx=10, pady=(0,5))
+
+        # Tempos por estágio da última captura (opcional)
+        self.timings_label = ttk.Label(self, text="", anchor="w")
+        if self.settings["metrics_status"]:
+            self.timings_label.pack(fill="x", padx=10, pady=(0,5))
+
         # Menu de contexto para imagem
         self.image_menu = tk.Menu(self, tearoff=0)
         self.image_menu.add_command(label="Copiar Imagem", command=self.copy_image_to_clipboard)
+        self.image_menu.add_command(label="Copiar Linha", command=self.copy_layout_line)
+        self.image_menu.add_command(label="Exportar OCR…", command=self.export_layout)
+        self.image_menu.add_command(label="Ajustar à Janela", command=self.fit_preview)
         self.image_label.bind("<Button-3>", self.show_image_menu)
+        # Clique numa linha da prévia seleciona a linha no texto; arrastar
+        # move a vista com zoom (roda do mouse)
+        self.image_label.bind("<ButtonPress-1>", self.press_preview)
+        self.image_label.bind("<B1-Motion>", self.drag_preview)
+        self.image_label.bind("<ButtonRelease-1>", self.release_preview)
+        self.image_label.bind("<MouseWheel>",
+                              lambda e: self.zoom_preview(e, 1 if e.delta > 0 else -1))
+        self.image_label.bind("<Button-4>", lambda e: self.zoom_preview(e, 1))
+        self.image_label.bind("<Button-5>", lambda e: self.zoom_preview(e, -1))
 
         # Menu de contexto para text_ocr
         self.ocr_menu = tk.Menu(self, tearoff=0)
         self.ocr_menu.add_command(label="Copiar Texto", command=lambda: self.copy_text(self.text_ocr))
         self.text_ocr.bind("<Button-3>", lambda e: self.show_text_menu(e, self.ocr_menu))
+        # Ctrl+C também passa pelo ClipboardService (a cópia sobrevive à saída)
+        self.text_ocr.bind("<<Copy>>", lambda e: self.copy_text(self.text_ocr) or "break")
 
         # Menu de contexto para text_trans
         self.trans_menu = tk.Menu(self, tearoff=0)
         self.trans_menu.add_command(label="Copiar Texto", command=lambda: self.copy_text(self.text_trans))
         self.text_trans.bind("<Button-3>", lambda e: self.show_text_menu(e, self.trans_menu))
+        self.text_trans.bind("<<Copy>>", lambda e: self.copy_text(self.text_trans) or "break")
+
+        self.protocol("WM_DELETE_WINDOW", self.close_window)
+        self.after(POLL_MS, self.poll_results)
+        self.after_idle(self.start_backend)
+        if self.server is not None:
+            self.after(POLL_MS, self.poll_commands)
+
+    def translation_title(self):
+        return f"Tradução ({', '.join(self.settings['target_langs']).upper()}):"
+
+    def list_ocr_langs(self):
+        # Pacotes instalados, consultados ao abrir a lista
+        try:
+            installed = self.pipeline.engine.languages()
+        except Exception:
+            installed = []
+        values = ["auto"] + installed
+        if "por" in installed and "eng" in installed:
+            values.append(OCR_LANG)
+        self.ocr_lang_box.configure(values=values)
+
+    def apply_ocr_lang(self, event=None):
+        lang = self.ocr_lang_var.get().strip()
+        if lang:
+            self.settings["ocr_lang"] = lang
+
+    def apply_targets(self, event=None):
+        targets = parse_langs(self.target_var.get())
+        if not targets:
+            self.target_var.set(", ".join(self.settings["target_langs"]))
+            return
+        self.target_var.set(", ".join(targets))
+        if targets == self.settings["target_langs"]:
+            return
+        self.settings["target_langs"] = targets
+        self.trans_label.configure(text=self.translation_title())
+        if self.watcher is not None:
+            self.watcher.retarget()
+            return
+        job = self.job
+        if job is None or job.cancelled or not job.translate:
+            return
+        if not job.ocr_text:
+            # OCR ainda em andamento: a tradução já sai nos novos idiomas
+            job.targets = targets
+            return
+        self.trans_blocks = None
+        self.text_trans.delete("1.0", tk.END)
+        self.job = self.pipeline.retranslate(job, targets)
+
+    def start_backend(self):
+        # Roda depois do primeiro desenho da janela: importa numpy/PIL e
+        # carrega o motor de OCR numa thread, sem atrasar a abertura
+        import_signal_modules()
+        self.pipeline.warm()
+        if self.clipboard_service is None:
+            self.clipboard_service = ClipboardService()
 
     def select_area_ocr(self):
+        # Uma seleção nativa já aberta recebe o próximo clique
+        if self.selecting:
+            return
+        # Cancela o job anterior, se ainda estiver em andamento
+        if self.job is not None:
+            self.job.cancel()
+        self.stop_watch()
+
         # Limpa conteúdo antigo
         self.image_label.configure(image='')
         self.text_ocr.delete("1.0", tk.END)
         self.text_trans.delete("1.0", tk.END)
 
-        # Guarda mtime anterior
-        old_mtime = os.path.getmtime(self.tmp) if os.path.exists(self.tmp) else None
-
         # Esconde a janela
         self.withdraw()
         self.update()
 
-        # Captura
+        self.png = self.capture_image = None
+        self.ocr_blocks = self.trans_blocks = None
+        self.clear_preview()
+        self.job = None
+        if resolve_capture_tool(self.settings["capture_tool"]) == "x11":
+            # Dá tempo ao compositor de tirar a janela da tela antes de ler
+            self.after(NATIVE_CAPTURE_DELAY_MS, self.select_area_native)
+        else:
+            self.job = CaptureJob(self.tmpdir)
+            self.pipeline.submit(self.job)
+
+    def select_area_native(self):
+        # A tela inteira é lida agora; a seleção só recorta a imagem em
+        # memória. Sem acesso ao X, cai para a ferramenta externa
+        load_modules()
+        start = time.perf_counter()
+        try:
+            screen = grab_screen()
+        except Exception as e:
+            print(f"Aviso: captura nativa falhou ({e}), usando gnome-screenshot",
+                  file=sys.stderr)
+            self.job = CaptureJob(self.tmpdir)
+            self.pipeline.submit(self.job)
+            return
+        grabbed = time.perf_counter() - start
+        self.selecting = True
+        RegionSelector(self, screen,
+                       lambda box: self.region_selected(screen, box, grabbed))
+
+    def toggle_watch(self):
+        if self.watcher is not None:
+            self.stop_watch()
+            return
+        if self.selecting:
+            return
+        if resolve_capture_tool(self.settings["capture_tool"]) != "x11":
+            messagebox.showerror("Observar Área",
+                                 "O modo observar precisa da captura nativa (X11).")
+            return
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+        self.withdraw()
+        self.update()
+        self.after(NATIVE_CAPTURE_DELAY_MS, self.select_watch_region)
+
+    def select_watch_region(self):
+        load_modules()
         try:
-            subprocess.run(["gnome-screenshot", "-a", "-f", self.tmp], check=True)
-        except subprocess.CalledProcessError:
-            self.deiconify()
-            messagebox.showerror("Erro", "Falha ao capturar a área.")
+            screen = grab_screen()
+        except Exception as e:
+            self.restore_window()
+            messagebox.showerror("Observar Área", f"Falha ao capturar a tela:\n{e}")
+            return
+        self.selecting = True
+        RegionSelector(self, screen, self.watch_region_selected)
+
+    def watch_region_selected(self, box):
+        self.selecting = False
+        self.restore_window()
+        if box is None:
+            return
+        self.png = self.capture_image = None
+        self.ocr_blocks = self.trans_blocks = None
+        self.clear_preview()
+        self.job = CaptureJob()
+        self.watcher = RegionWatcher(self.pipeline, self.job, box, self.settings)
+        self.watcher.start()
+        self.watch_btn.configure(text="Parar de Observar")
+
+    def open_history_panel(self):
+        if self.history_panel is not None and self.history_panel.winfo_exists():
+            self.history_panel.lift()
+            return
+        load_modules()
+        self.history_panel = HistoryPanel(self, self.history)
+
+    def show_history_entry(self, entry):
+        # Entrada do histórico na janela principal (só a miniatura foi guardada)
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+        self.stop_watch()
+        self.png = self.capture_image = None
+        # O histórico guarda só o texto: sem sobreposição das linhas
+        self.clear_preview()
+        self.photo = ImageTk.PhotoImage(Image.open(io.BytesIO(entry["thumb"])))
+        self.image_label.configure(image=self.photo)
+        self.set_text(self.text_ocr, entry["ocr"])
+        self.set_text(self.text_trans, entry["translation"])
+        # Job sem captura, só com o OCR: trocar o destino retraduz a entrada
+        self.job = CaptureJob()
+        self.job.ocr_text = entry["ocr"]
+        self.restore_window()
+
+    def stop_watch(self):
+        if self.watcher is None:
+            return
+        self.watcher.job.cancel()
+        self.watcher = None
+        self.watch_btn.configure(text="Observar Área")
+
+    def region_selected(self, screen, box, grabbed):
+        self.selecting = False
+        if box is None:
+            self.restore_window()
             return
+        start = time.perf_counter()
+        self.job = CaptureJob(self.tmpdir)
+        self.job.image = screen.crop(box)
+        self.pipeline.record(self.job, "captura", grabbed + time.perf_counter() - start)
+        self.pipeline.submit(self.job)
 
-        # Restaura
+    def restore_window(self):
         self.deiconify()
         self.update()
         self.lift()
         self.focus_force()
 
-        # Aguarda novo arquivo
-        while True:
-            if os.path.exists(self.tmp):
-                new_mtime = os.path.getmtime(self.tmp)
-                if old_mtime is None or new_mtime != old_mtime:
-                    break
-            time.sleep(0.1)
-
-        # Verifica existência
-        if not os.path.exists(self.tmp):
-            messagebox.showerror("Erro", f"Nenhuma área capturada:\n{self.tmp}")
-            return
+    def poll_results(self):
+        try:
+            while True:
+                kind, job, *payload = self.results.get_nowait()
+                # Descarta resultados de jobs antigos/cancelados
+                if job is not self.job or job.cancelled:
+                    continue
+                self.handle_result(kind, payload)
+        except queue.Empty:
+            pass
+        self.after(POLL_MS, self.poll_results)
 
-        # Carrega e mostra imagem
+    def poll_commands(self):
+        # Comandos recebidos pelo socket da instância única
         try:
-            img = Image.open(self.tmp)
-        except Exception as e:
-            messagebox.showerror("Erro ao abrir imagem", str(e))
+            while True:
+                command, _, arg = self.server.commands.get_nowait().partition(" ")
+                if command == "capture":
+                    self.select_area_ocr()
+                elif command == "targets":
+                    self.target_var.set(arg)
+                    self.apply_targets()
+                elif command == "show":
+                    self.restore_window()
+                elif command == "quit":
+                    self.on_close()
+                    return
+        except queue.Empty:
+            pass
+        self.after(POLL_MS, self.poll_commands)
+
+    def handle_result(self, kind, payload):
+        if kind == "captura":
+            self.restore_window()
+            self.png, self.capture_image, self.preview_size = payload
+        elif kind == "miniatura":
+            self.thumb = payload[0]
+            self.show_preview()
+        elif kind == "vista":
+            # Vista com zoom pronta; ignorada se já houve outro zoom/arrasto
+            if payload[1] == self.view:
+                self.view_image = tuple(payload)
+                self.show_preview()
+        elif kind == "quadro":
+            # Observar área: só atualiza a prévia, sem trazer a janela à frente.
+            # Com zoom, a vista é refeita com os blocos do quadro novo
+            self.thumb, self.capture_image = payload
+            self.png, self.preview_size = None, self.capture_image.size
+            self.preview_tiles = None
+            if self.view is not None:
+                self.request_view(*self.view)
+            self.show_preview()
+        elif kind == "ocr":
+            self.set_text(self.text_ocr, payload[0])
+            self.layout, self.layout_line = self.job.ocr_result, None
+            self.show_preview()
+            self.publish_result(kind, payload[0])
+        elif kind == "traducao":
+            self.set_text(self.text_trans, payload[0])
+            self.publish_result(kind, payload[0])
+        elif kind == "ocr_bloco":
+            self.ocr_blocks = self.update_blocks(self.text_ocr, self.ocr_blocks, *payload)
+        elif kind == "traducao_bloco":
+            self.trans_blocks = self.update_blocks(self.text_trans, self.trans_blocks, *payload)
+        elif kind == "cache":
+            self.status.configure(text=format_cache_stats(payload[0]))
+        elif kind == "metricas":
+            self.timings_label.configure(text=format_timings(payload[0]))
+            # Nova entrada no topo, se o painel estiver na lista sem busca
+            panel = self.history_panel
+            if panel is not None and panel.winfo_exists() and not panel.query.strip():
+                panel.reload()
+        elif kind == "erro":
+            stage, msg = payload
+            if stage in ("captura", "imagem"):
+                self.restore_window()
+            elif stage == "observar":
+                self.stop_watch()
+            messagebox.showerror(ERROR_TITLES.get(stage, "Erro"), msg)
+
+    def set_text(self, widget, text):
+        widget.delete("1.0", tk.END)
+        widget.insert("1.0", text)
+
+    def publish_result(self, kind, text):
+        # clipboard_publish: o resultado vai sozinho para o clipboard, com a
+        # imagem da captura na mesma posse (colar como texto ou imagem)
+        if self.settings["clipboard_publish"] == kind and text:
+            self.copy_to_clipboard(text=text, png=self.png, image=self.capture_image)
+
+    def copy_to_clipboard(self, **content):
+        if self.clipboard_service is None:
+            self.clipboard_service = ClipboardService()
+        self.clipboard_service.copy(**content)
+
+    def clear_preview(self):
+        self.cancel_view()
+        self.thumb = self.layout = self.layout_line = None
+        self.preview_size = self.view = self.view_image = self.preview_tiles = None
+        self.drag = None
+
+    def show_preview(self):
+        # Miniatura (ou a vista com zoom, quando pronta) com as caixas do OCR
+        img = self.thumb if self.view is None or self.view_image is None else self.view_image[0]
+        if img is None:
             return
-        img.thumbnail((500, 200), Image.LANCZOS)
+        if self.layout is not None:
+            img = self.draw_layout(img)
         self.photo = ImageTk.PhotoImage(img)
         self.image_label.configure(image=self.photo)
 
-        # Pré-processamento OCR
-        gray = Image.open(self.tmp).convert('L')
-        enhancer = ImageEnhance.Contrast(gray)
-        contrast = enhancer.enhance(2.0)
-        bw = contrast.point(lambda x: 0 if x < 128 else 255, '1')
+    def display_transform(self):
+        # Captura original → imagem exibida: (escala, x0, y0). Com um zoom
+        # ainda sendo montado, vale a vista que está na tela
+        if self.view is None or self.view_image is None:
+            return self.thumb.width / self.preview_size[0], 0, 0
+        return self.view_image[1]
+
+    def layout_transform(self):
+        # Coordenadas do OCRResult (imagem reconhecida, proporcional à
+        # captura) → imagem exibida: (sx, sy, x0, y0)
+        scale, x0, y0 = self.display_transform()
+        return (scale * self.preview_size[0] / self.layout.size[0],
+                scale * self.preview_size[1] / self.layout.size[1], x0, y0)
+
+    def draw_layout(self, img):
+        # Caixas das linhas reconhecidas sobre a imagem exibida, com a linha
+        # selecionada destacada
+        from PIL import ImageDraw
+        img = img.convert("RGB")
+        sx, sy, x0, y0 = self.layout_transform()
+        draw = ImageDraw.Draw(img, "RGBA")
+        for k, (left, top, right, bottom) in enumerate(self.layout.line_boxes().tolist()):
+            box = (left * sx - x0, top * sy - y0, right * sx - x0, bottom * sy - y0)
+            if box[2] < 0 or box[3] < 0 or box[0] > img.width or box[1] > img.height:
+                continue
+            if k == self.layout_line:
+                draw.rectangle(box, fill=(255, 200, 0, 90), outline=(230, 140, 0))
+            else:
+                draw.rectangle(box, outline=(40, 120, 255, 150))
+        return img
+
+    def preview_point(self, event):
+        # Posição do evento na imagem exibida (centralizada no rótulo)
+        return (event.x - (self.image_label.winfo_width() - self.photo.width()) / 2,
+                event.y - (self.image_label.winfo_height() - self.photo.height()) / 2)
+
+    def click_layout(self, event):
+        if self.layout is None or self.thumb is None:
+            return
+        x, y = self.preview_point(event)
+        sx, sy, x0, y0 = self.layout_transform()
+        self.layout_line = self.layout.line_at((x + x0) / sx, (y + y0) / sy)
+        self.show_preview()
+        self.text_ocr.tag_remove("sel", "1.0", tk.END)
+        if self.layout_line is None:
+            return
+        text, spans = self.layout.compose()
+        # Só marca no campo se o texto não foi editado desde o OCR
+        if self.text_ocr.get("1.0", "end-1c") == text:
+            start, end = spans[self.layout_line]
+            self.text_ocr.tag_add("sel", f"1.0+{start}c", f"1.0+{end}c")
+            self.text_ocr.see(f"1.0+{start}c")
+
+    def zoom_preview(self, event, step):
+        # Roda do mouse: dobra (ou reduz à metade) a escala em torno do
+        # cursor, da miniatura inteira até PREVIEW_MAX_ZOOM. Precisa da
+        # captura original (entradas do histórico só têm a miniatura)
+        if self.thumb is None or (self.png is None and self.capture_image is None):
+            return
+        fit = self.thumb.width / self.preview_size[0]
+        scale = self.view[0] if self.view is not None else fit
+        new = round(min(scale * 2 if step > 0 else scale / 2, PREVIEW_MAX_ZOOM), 4)
+        if new <= fit * 1.01:
+            self.fit_preview()
+            return
+        if new == scale:
+            return
+        # O ponto sob o cursor (na imagem que está na tela) continua sob ele
+        x, y = self.preview_point(event)
+        shown, x0, y0 = self.display_transform()
+        self.request_view(new, (x + x0) / shown * new - x, (y + y0) / shown * new - y)
+
+    def request_view(self, scale, x0, y0):
+        # A vista é montada na thread da prévia; a atual segue na tela até
+        # a nova chegar ("vista")
+        if self.preview_tiles is None:
+            self.preview_tiles = PreviewTiles(self.capture_image if self.capture_image is not None
+                                              else self.png)
+        # Mesmo tamanho da miniatura: o rótulo não muda e o cursor continua
+        # apontando para o mesmo lugar da imagem
+        width, height = (round(n * scale) for n in self.preview_size)
+        size = self.thumb.size
+        x0 = int(min(max(x0, 0), width - size[0]))
+        y0 = int(min(max(y0, 0), height - size[1]))
+        self.view = (scale, x0, y0)
+        self.cancel_view()
+        self.view_request = threading.Event()
+        self.pipeline.preview_executor.submit(self.render_view, self.results, self.job,
+                                              self.preview_tiles, self.view, size,
+                                              self.view_request)
+
+    def cancel_view(self):
+        if self.view_request is not None:
+            self.view_request.set()
+            self.view_request = None
 
-        # Executa OCR
+    @staticmethod
+    def render_view(results, job, tiles, view, size, replaced):
+        # Thread da prévia: só usa os argumentos (vista fixada na thread da
+        # UI) e devolve pela fila. Vistas já substituídas por outro
+        # zoom/arrasto (`replaced`) nem são montadas
+        if replaced.is_set():
+            return
         try:
-            texto = pytesseract.image_to_string(bw, lang="por+eng")
+            img = tiles.render(view, size)
         except Exception as e:
-            messagebox.showerror("Erro OCR", str(e))
+            print(f"Aviso: falha ao montar o zoom da prévia: {e}", file=sys.stderr)
+            return
+        results.put(("vista", job, img, view))
+
+    def fit_preview(self):
+        self.cancel_view()
+        self.view = self.view_image = None
+        self.show_preview()
+
+    def press_preview(self, event):
+        self.drag = (event.x, event.y, self.view, False)
+
+    def drag_preview(self, event):
+        if self.drag is None or self.drag[2] is None:
+            return
+        x, y, (scale, x0, y0), moved = self.drag
+        dx, dy = event.x - x, event.y - y
+        # Poucos pixels ainda contam como clique
+        if not moved and abs(dx) + abs(dy) < 4:
             return
-        self.text_ocr.insert("1.0", texto.strip())
+        self.drag = (x, y, (scale, x0, y0), True)
+        self.request_view(scale, x0 - dx, y0 - dy)
 
-        # Detecta idioma e traduz
+    def release_preview(self, event):
+        drag, self.drag = self.drag, None
+        if drag is None or not drag[3]:
+            self.click_layout(event)
+
+    def copy_layout_line(self):
+        if self.layout is None or self.layout_line is None:
+            return
+        text, spans = self.layout.compose()
+        start, end = spans[self.layout_line]
+        self.copy_to_clipboard(text=text[start:end])
+
+    def export_layout(self):
+        if self.layout is None:
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Exportar OCR", defaultextension=".txt",
+            filetypes=[("Texto", "*.txt"), ("hOCR", "*.hocr"), ("TSV", "*.tsv"),
+                       ("JSON", "*.json")])
+        if not path:
+            return
         try:
-            detected = self.translator.detect(texto)
-            if detected.lang != 'pt':
-                traduzido = self.translator.translate(texto, dest='pt').text
-            else:
-                traduzido = "--- Já está em português ---"
-        except Exception as e:
-            traduzido = f"[Erro na tradução: {e}]"
-        self.text_trans.insert("1.0", traduzido)
+            export_ocr(self.layout, path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Erro", f"Falha ao exportar o OCR:\n{e}")
+
+    def update_blocks(self, widget, blocks, index, total, text):
+        # Resultado parcial de um bloco: reexibe os blocos já prontos, em ordem
+        if blocks is None or len(blocks) != total:
+            blocks = [""] * total
+        blocks[index] = text
+        self.set_text(widget, "\n\n".join(b for b in blocks if b))
+        return blocks
+
+    def close_window(self):
+        # Residente: fechar só esconde a janela e mantém os motores
+        # carregados para a próxima captura (sair com `quit`)
+        if self.server is not None and self.settings["stay_resident"]:
+            self.withdraw()
+        else:
+            self.on_close()
+
+    def on_close(self):
+        if self.job is not None:
+            self.job.cancel()
+        self.stop_watch()
+        if self.server is not None:
+            self.server.close()
+        self.pipeline.shutdown()
+        if self.clipboard_service is not None:
+            self.clipboard_service.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        self.destroy()
 
     def show_image_menu(self, event):
+        # Copiar Linha / Exportar OCR só com um resultado na sobreposição
+        self.image_menu.entryconfigure(
+            1, state="normal" if self.layout_line is not None else "disabled")
+        self.image_menu.entryconfigure(
+            2, state="normal" if self.layout is not None else "disabled")
+        self.image_menu.entryconfigure(
+            3, state="normal" if self.view is not None else "disabled")
         self.image_menu.tk_popup(event.x_root, event.y_root)
         self.image_menu.grab_release()
 
@@ -139,22 +3946,719 @@ class OCRClipboardApp(tk.Tk):
 
     def copy_text(self, widget):
         try:
-            sel = widget.selection_get()
-            self.clipboard_clear()
-            self.clipboard_append(sel)
+            sel = widget.get("sel.first", "sel.last")
         except tk.TclError:
             # sem seleção
-            pass
+            return
+        self.copy_to_clipboard(text=sel)
 
     def copy_image_to_clipboard(self):
+        # Não bloqueia: a captura nativa só vira PNG quando alguém cola
+        if self.png is None and self.capture_image is None:
+            return
+        self.copy_to_clipboard(png=self.png, image=self.capture_image)
+
+
+# --- Clipboard: posse própria da seleção ---
+# No X, o CLIPBOARD é servido pelo próprio processo, numa thread com uma
+# conexão XCB só dela (ctypes; a libxcb é a mesma da captura nativa do
+# Pillow). Uma posse oferece vários alvos de uma vez (texto UTF-8/STRING e
+# image/png), sem um processo por cópia; quem copia só entrega o conteúdo e
+# volta. Ao sair, se a cópia ainda é nossa, um processo auxiliar
+# (`clipboard-hold`) assume a posse até outro programa copiar algo.
+
+CLIPBOARD_TEXT_TARGETS = ("UTF8_STRING", "text/plain;charset=utf-8", "text/plain",
+                          "TEXT", "STRING")
+# Acima disto a transferência é incremental (INCR), em pedaços
+CLIPBOARD_CHUNK = 256 * 1024
+
+
+class ClipboardContent:
+    # Texto e/ou imagem de uma cópia. A imagem em memória (captura nativa)
+    # só vira PNG quando algum programa pede o alvo image/png
+    def __init__(self, text=None, png=None, image=None):
+        self.text = text
+        self.png = png
+        self.image = image
+        self._lock = threading.Lock()
+
+    def targets(self):
+        targets = list(CLIPBOARD_TEXT_TARGETS) if self.text is not None else []
+        if self.png is not None or self.image is not None:
+            targets.append("image/png")
+        return targets
+
+    def encoded_png(self):
+        with self._lock:
+            if self.png is None and self.image is not None:
+                buf = io.BytesIO()
+                self.image.save(buf, "PNG")
+                self.png, self.image = buf.getvalue(), None
+            return self.png
+
+    def data(self, target):
+        # (tipo, bytes) para o alvo pedido, ou None se não houver
+        if target == "image/png":
+            png = self.encoded_png()
+            return None if png is None else ("image/png", png)
+        if self.text is None or target not in CLIPBOARD_TEXT_TARGETS:
+            return None
+        if target == "STRING":
+            return "STRING", self.text.encode("latin-1", "replace")
+        # TEXT aceita qualquer codificação: vai como UTF8_STRING
+        return ("UTF8_STRING" if target == "TEXT" else target), self.text.encode("utf-8")
+
+    def serialize(self):
+        # Cabeçalho JSON numa linha + PNG cru, para o processo auxiliar
+        png = self.encoded_png()
+        header = {"text": self.text, "png": None if png is None else len(png)}
+        return json.dumps(header).encode("utf-8") + b"\n" + (png or b"")
+
+    @classmethod
+    def read(cls, stream):
+        header = json.loads(stream.readline())
+        png = stream.read(header["png"]) if header["png"] is not None else None
+        return cls(header["text"], png)
+
+
+class _XcbScreenIterator(ctypes.Structure):
+    _fields_ = [("data", ctypes.c_void_p), ("rem", ctypes.c_int), ("index", ctypes.c_int)]
+
+
+class XcbClipboardOwner:
+    # Dono do CLIPBOARD numa thread própria. publish() não bloqueia: a
+    # thread assume a posse e responde aos pedidos (TARGETS, texto, PNG;
+    # INCR para os grandes). `released` fica marcado enquanto não somos os
+    # donos; com exit_on_clear, a thread termina ao perder a posse
+    PROPERTY_NOTIFY = 28
+    SELECTION_CLEAR = 29
+    SELECTION_REQUEST = 30
+    SELECTION_NOTIFY = 31
+    PROPERTY_DELETE = 1
+    CW_EVENT_MASK = 0x800
+    EVENT_MASK_PROPERTY_CHANGE = 0x400000
+    WINDOW_CLASS_INPUT_ONLY = 2
+    ATOM_ATOM = 4
+
+    def __init__(self, selection="CLIPBOARD", exit_on_clear=False):
+        path = ctypes.util.find_library("xcb")
+        if not path or not os.environ.get("DISPLAY"):
+            raise OSError("libxcb ou DISPLAY indisponível")
+        self.xcb = xcb = ctypes.CDLL(path)
+        self.libc = ctypes.CDLL(None)
+        self.libc.free.argtypes = [ctypes.c_void_p]
+        self._prototypes()
+        self.exit_on_clear = exit_on_clear
+
+        screen = ctypes.c_int()
+        self.conn = xcb.xcb_connect(None, ctypes.byref(screen))
+        if xcb.xcb_connection_has_error(self.conn):
+            xcb.xcb_disconnect(self.conn)
+            raise OSError("sem conexão com o servidor X")
+        roots = xcb.xcb_setup_roots_iterator(xcb.xcb_get_setup(self.conn))
+        for _ in range(screen.value):
+            xcb.xcb_screen_next(ctypes.byref(roots))
+        root = ctypes.c_uint32.from_address(roots.data).value
+        self.window = xcb.xcb_generate_id(self.conn)
+        xcb.xcb_create_window(self.conn, 0, self.window, root, 0, 0, 1, 1, 0,
+                              self.WINDOW_CLASS_INPUT_ONLY, 0, 0, None)
+
+        names = (selection, "TARGETS", "INCR") + CLIPBOARD_TEXT_TARGETS + ("image/png",)
+        cookies = [(name, xcb.xcb_intern_atom(self.conn, 0, len(name), name.encode()))
+                   for name in names]
+        self.atoms = {}
+        for name, cookie in cookies:
+            reply = xcb.xcb_intern_atom_reply(self.conn, cookie, None)
+            if not reply:
+                xcb.xcb_disconnect(self.conn)
+                raise OSError(f"átomo {name} indisponível")
+            self.atoms[name] = ctypes.c_uint32.from_address(reply + 8).value
+            self.libc.free(reply)
+        self.names = {atom: name for name, atom in self.atoms.items()}
+        self.selection = self.atoms[selection]
+        # Tamanho máximo de requisição vem em palavras de 4 bytes
+        self.chunk = min(CLIPBOARD_CHUNK,
+                         xcb.xcb_get_maximum_request_length(self.conn) * 4 - 1024)
+
+        self.content = None     # conteúdo da posse atual (só a thread troca)
+        self.transfers = {}     # (janela, propriedade) -> [tipo, bytes, posição]
+        self.lost = False
+        self._pending = None
+        self._closing = False
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()
+        self.released = threading.Event()
+        self.released.set()
+        self.thread = threading.Thread(target=self._run, name="clipboard", daemon=True)
+        self.thread.start()
+
+    def _prototypes(self):
+        xcb, p = self.xcb, ctypes.c_void_p
+        u8, u16, u32, i16 = ctypes.c_uint8, ctypes.c_uint16, ctypes.c_uint32, ctypes.c_int16
+        for name, restype, argtypes in (
+                ("xcb_connect", p, [ctypes.c_char_p, ctypes.POINTER(ctypes.c_int)]),
+                ("xcb_connection_has_error", ctypes.c_int, [p]),
+                ("xcb_disconnect", None, [p]),
+                ("xcb_get_setup", p, [p]),
+                ("xcb_setup_roots_iterator", _XcbScreenIterator, [p]),
+                ("xcb_screen_next", None, [ctypes.POINTER(_XcbScreenIterator)]),
+                ("xcb_generate_id", u32, [p]),
+                ("xcb_create_window", ctypes.c_uint,
+                 [p, u8, u32, u32, i16, i16, u16, u16, u16, u16, u32, u32, p]),
+                ("xcb_destroy_window", ctypes.c_uint, [p, u32]),
+                ("xcb_intern_atom", ctypes.c_uint, [p, u8, u16, ctypes.c_char_p]),
+                ("xcb_intern_atom_reply", p, [p, ctypes.c_uint, p]),
+                ("xcb_set_selection_owner", ctypes.c_uint, [p, u32, u32, u32]),
+                ("xcb_change_property", ctypes.c_uint,
+                 [p, u8, u32, u32, u32, u8, u32, ctypes.c_char_p]),
+                ("xcb_change_window_attributes", ctypes.c_uint, [p, u32, u32, p]),
+                ("xcb_send_event", ctypes.c_uint, [p, u8, u32, u32, ctypes.c_char_p]),
+                ("xcb_get_maximum_request_length", u32, [p]),
+                ("xcb_get_file_descriptor", ctypes.c_int, [p]),
+                ("xcb_poll_for_event", p, [p]),
+                ("xcb_flush", ctypes.c_int, [p])):
+            function = getattr(xcb, name)
+            function.restype, function.argtypes = restype, argtypes
+
+    def publish(self, content):
+        with self._lock:
+            self._pending = content
+        os.write(self._wake_w, b"\0")
+
+    def current(self):
+        # Conteúdo que está (ou está para ficar) no clipboard, se for nosso
+        with self._lock:
+            return self._pending or self.content
+
+    def close(self):
+        with self._lock:
+            self._closing = True
+        os.write(self._wake_w, b"\0")
+        self.thread.join(2.0)
+
+    def _run(self):
+        xcb = self.xcb
+        fd = xcb.xcb_get_file_descriptor(self.conn)
         try:
-            subprocess.run([
-                "xclip", "-selection", "clipboard",
-                "-t", "image/png", "-i", self.tmp
-            ], check=True)
+            while not xcb.xcb_connection_has_error(self.conn):
+                while True:
+                    event = xcb.xcb_poll_for_event(self.conn)
+                    if not event:
+                        break
+                    try:
+                        self._handle(ctypes.string_at(event, 32))
+                    except Exception as e:
+                        print(f"Falha ao servir o clipboard: {e}", file=sys.stderr)
+                    finally:
+                        self.libc.free(event)
+                if self.exit_on_clear and self.lost:
+                    break
+                xcb.xcb_flush(self.conn)
+                ready, _, _ = select.select([fd, self._wake_r], [], [])
+                if self._wake_r not in ready:
+                    continue
+                os.read(self._wake_r, 4096)
+                with self._lock:
+                    if self._closing:
+                        break
+                    content, self._pending = self._pending, None
+                if content is not None:
+                    self.content = content
+                    xcb.xcb_set_selection_owner(self.conn, self.window, self.selection, 0)
+                    self.released.clear()
+        finally:
+            self.content = None
+            self.released.set()
+            xcb.xcb_destroy_window(self.conn, self.window)
+            xcb.xcb_flush(self.conn)
+            xcb.xcb_disconnect(self.conn)
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    def _handle(self, event):
+        kind = event[0] & 0x7f
+        if kind == self.SELECTION_REQUEST:
+            time_, _, requestor, selection, target, prop = struct.unpack_from("=6I", event, 4)
+            # Clientes antigos pedem sem propriedade: usa o próprio alvo
+            prop = prop or target
+            content = self.content
+            if content is None or selection != self.selection \
+                    or not self._reply(content, requestor, target, prop):
+                prop = 0
+            notify = struct.pack("=BBHIIIII", self.SELECTION_NOTIFY, 0, 0, time_, requestor,
+                                 selection, target, prop)
+            self.xcb.xcb_send_event(self.conn, 0, requestor, 0, notify.ljust(32, b"\0"))
+        elif kind == self.SELECTION_CLEAR:
+            _, _, selection = struct.unpack_from("=3I", event, 4)
+            if selection == self.selection:
+                self.content = None
+                self.lost = True
+                self.released.set()
+        elif kind == self.PROPERTY_NOTIFY:
+            window, prop, _, state = struct.unpack_from("=3IB", event, 4)
+            if state == self.PROPERTY_DELETE:
+                self._next_chunk(window, prop)
+
+    def _change_property(self, window, prop, type_atom, fmt, data, count):
+        self.xcb.xcb_change_property(self.conn, 0, window, prop, type_atom, fmt, count, data)
+
+    def _reply(self, content, requestor, target, prop):
+        name = self.names.get(target)
+        if name == "TARGETS":
+            atoms = [self.atoms["TARGETS"]] + [self.atoms[t] for t in content.targets()]
+            self._change_property(requestor, prop, self.ATOM_ATOM, 32,
+                                  struct.pack(f"={len(atoms)}I", *atoms), len(atoms))
+            return True
+        data = content.data(name) if name else None
+        if data is None:
+            return False
+        type_atom, payload = self.atoms[data[0]], data[1]
+        if len(payload) <= self.chunk:
+            self._change_property(requestor, prop, type_atom, 8, payload, len(payload))
+            return True
+        # INCR: anuncia o tamanho e manda um pedaço a cada vez que o
+        # destinatário apaga a propriedade (PropertyNotify)
+        self.xcb.xcb_change_window_attributes(
+            self.conn, requestor, self.CW_EVENT_MASK,
+            (ctypes.c_uint32 * 1)(self.EVENT_MASK_PROPERTY_CHANGE))
+        self._change_property(requestor, prop, self.atoms["INCR"], 32,
+                              struct.pack("=I", len(payload)), 1)
+        self.transfers[(requestor, prop)] = [type_atom, payload, 0]
+        return True
+
+    def _next_chunk(self, window, prop):
+        transfer = self.transfers.get((window, prop))
+        if transfer is None:
+            return
+        type_atom, payload, offset = transfer
+        chunk = payload[offset:offset + self.chunk]
+        self._change_property(window, prop, type_atom, 8, chunk, len(chunk))
+        if chunk:
+            transfer[2] = offset + len(chunk)
+        else:
+            # Pedaço vazio encerra a transferência
+            del self.transfers[(window, prop)]
+            self.xcb.xcb_change_window_attributes(self.conn, window, self.CW_EVENT_MASK,
+                                                  (ctypes.c_uint32 * 1)(0))
+
+
+def copy_with_command(content):
+    # Sem posse própria (Wayland, sem libxcb): um alvo só, texto de
+    # preferência, por wl-copy ou xclip
+    if content.text is not None:
+        mime, data = "text/plain;charset=utf-8", content.text.encode("utf-8")
+    else:
+        mime, data = "image/png", content.encoded_png()
+    if os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-copy"):
+        command = ["wl-copy", "--type", mime]
+    else:
+        command = ["xclip", "-selection", "clipboard", "-i"]
+        if mime == "image/png":
+            command += ["-t", mime]
+    try:
+        subprocess.run(command, input=data, check=True)
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Falha ao copiar para o clipboard: {e}", file=sys.stderr)
+
+
+def self_command(*args):
+    # Linha de comando para rodar este programa de novo (script ou binário
+    # do PyInstaller)
+    if getattr(sys, "frozen", False):
+        return [sys.executable, *args]
+    return [sys.executable, os.path.abspath(__file__), *args]
+
+
+class ClipboardService:
+    # Cópias assíncronas: copy() entrega o conteúdo e volta na hora. Com X,
+    # pelo XcbClipboardOwner; senão, por ferramenta externa numa thread
+    def __init__(self):
+        self.owner = self._executor = None
+        if os.environ.get("XDG_SESSION_TYPE") != "wayland":
+            try:
+                self.owner = XcbClipboardOwner()
+            except (OSError, AttributeError):
+                pass
+        if self.owner is None:
+            self._executor = ThreadPoolExecutor(max_workers=1,
+                                                thread_name_prefix="clipboard")
+
+    def copy(self, text=None, png=None, image=None):
+        content = ClipboardContent(text, png, image)
+        if self.owner is not None:
+            self.owner.publish(content)
+        else:
+            self._executor.submit(copy_with_command, content)
+
+    def close(self, persist=True):
+        # Com persist, a cópia que ainda é nossa passa ao `clipboard-hold`
+        # e continua colável depois que o programa sai
+        if self._executor is not None:
+            self._executor.shutdown()
+            return
+        content = self.owner.current() if persist else None
+        if content is not None:
+            try:
+                helper = subprocess.Popen(self_command("clipboard-hold"),
+                                          stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                          start_new_session=True)
+                helper.stdin.write(content.serialize())
+                helper.stdin.close()
+                # O auxiliar assume a posse: chega o SelectionClear
+                self.owner.released.wait(2.0)
+            except OSError as e:
+                print(f"Falha ao manter o clipboard: {e}", file=sys.stderr)
+        self.owner.close()
+
+
+def clipboard_hold():
+    # Processo auxiliar: recebe o conteúdo pelo stdin e serve o CLIPBOARD
+    # até outro programa copiar algo
+    content = ClipboardContent.read(sys.stdin.buffer)
+    try:
+        owner = XcbClipboardOwner(exit_on_clear=True)
+    except (OSError, AttributeError) as e:
+        sys.exit(f"Clipboard indisponível: {e}")
+    owner.publish(content)
+    owner.thread.join()
+
+
+# --- Modo daemon: observa o clipboard ---
+
+def clipboard_targets():
+    proc = subprocess.run(["xclip", "-selection", "clipboard", "-t", "TARGETS", "-o"],
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    if proc.returncode != 0:
+        return []
+    return proc.stdout.decode(errors="replace").split()
+
+
+def read_clipboard_image():
+    # PNG do clipboard, ou None se o conteúdo atual não for imagem
+    if "image/png" not in clipboard_targets():
+        return None
+    proc = subprocess.run(["xclip", "-selection", "clipboard", "-t", "image/png", "-o"],
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return proc.stdout if proc.returncode == 0 and proc.stdout else None
+
+
+class ClipboardDaemon:
+    # Processo residente sem janela: cada imagem nova no clipboard passa por
+    # OCR (motor quente) e o texto volta para o clipboard. Rajadas de
+    # mudanças são agrupadas: só a última imagem após `debounce` segundos
+    # sem novidades é processada, e um job ainda em andamento é cancelado.
+    def __init__(self, config):
+        self.config = config
+        self.output = config["daemon_output"]
+        self.results = queue.Queue()
+        translator = TranslationClient(config, memory=open_translation_memory(config))
+        self.pipeline = OCRPipeline(translator, self.results, None,
+                                    make_caches(config), config)
+        self.changed = threading.Event()
+        self.clipboard = ClipboardService()
+        self.job = None
+        self.png = None
+        self.last_hash = None
+
+    def watch_changes(self):
+        # clipnotify (se instalado) bloqueia até o clipboard mudar; sem ele,
+        # sinaliza a cada `daemon_poll` segundos
+        use_clipnotify = shutil.which("clipnotify") is not None
+        while True:
+            if use_clipnotify:
+                subprocess.run(["clipnotify"], stdout=subprocess.DEVNULL)
+            else:
+                time.sleep(self.config["daemon_poll"])
+            self.changed.set()
+
+    def deliver_results(self):
+        while True:
+            kind, job, *payload = self.results.get()
+            if job is not self.job or job.cancelled:
+                continue
+            if kind == "erro":
+                print(f"[{job.id}] erro ({payload[0]}): {payload[1]}", file=sys.stderr)
+            elif kind == self.output:
+                # O PNG original continua na mesma posse, como image/png
+                self.clipboard.copy(text=payload[0], png=self.png)
+                print(f"[{job.id}] {len(payload[0])} caracteres no clipboard",
+                      file=sys.stderr)
+
+    def submit(self, png):
+        load_modules()
+        try:
+            img = Image.open(io.BytesIO(png))
+            img.load()
         except Exception as e:
-            messagebox.showerror("Erro", f"Falha ao copiar imagem:\n{e}")
+            print(f"Imagem inválida no clipboard: {e}", file=sys.stderr)
+            return
+        if self.job is not None:
+            self.job.cancel()
+        self.job = CaptureJob(translate=self.output == "traducao")
+        self.png = png
+        self.pipeline.submit_image(self.job, img)
+
+    def run(self):
+        import_signal_modules()
+        self.pipeline.warm()
+        threading.Thread(target=self.watch_changes, name="clipboard-watch",
+                         daemon=True).start()
+        threading.Thread(target=self.deliver_results, name="clipboard-out",
+                         daemon=True).start()
+        print("Observando o clipboard (Ctrl+C para sair)", file=sys.stderr)
+
+        # A imagem que já estava no clipboard ao iniciar não é processada
+        png = read_clipboard_image()
+        self.last_hash = hashlib.sha256(png).digest() if png else None
+        pending = None
+        debounce = self.config["daemon_debounce"]
+        try:
+            while True:
+                # Sem mudança pendente espera indefinidamente; com uma
+                # pendente, só até completar o debounce
+                timeout = None
+                if pending is not None:
+                    timeout = max(0.0, pending[2] + debounce - time.monotonic())
+                if self.changed.wait(timeout):
+                    self.changed.clear()
+                    png = read_clipboard_image()
+                    if png is not None:
+                        digest = hashlib.sha256(png).digest()
+                        if digest == self.last_hash:
+                            pending = None
+                        elif pending is None or digest != pending[0]:
+                            pending = (digest, png, time.monotonic())
+                if pending is not None and time.monotonic() - pending[2] >= debounce:
+                    self.last_hash, png, _ = pending
+                    pending = None
+                    self.submit(png)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.job is not None:
+                self.job.cancel()
+            self.pipeline.shutdown()
+            self.clipboard.close()
+
+
+# --- Modo batch: diretórios de imagens em um pool de processos ---
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff", ".webp")
+
+# Estado de cada processo do pool (motor e tradutor carregados uma vez)
+_batch = {}
+
+
+def expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            found = glob.glob(pattern, recursive=True)
+        paths.extend(sorted(p for p in found
+                            if os.path.isfile(p) and p.lower().endswith(IMAGE_EXTENSIONS)))
+    return list(dict.fromkeys(paths))
+
+
+def read_done(output):
+    # Caminhos já processados com sucesso numa saída parcial
+    done = set()
+    try:
+        with open(output, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "error" not in record:
+                    done.add(record["path"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def trim_partial_line(output):
+    # Remove a última linha se ela ficou sem "\n" (interrupção no meio)
+    try:
+        with open(output, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+    except FileNotFoundError:
+        pass
+
+
+def _batch_init(config, translate, layout=False):
+    _batch["config"] = config
+    _batch["layout"] = layout
+    _batch["engine"] = make_ocr_engine(config["ocr_engine"], 1)
+    _batch["translator"] = TranslationClient(config, workers=1) if translate else None
+
+
+def _batch_process(path):
+    config = _batch["config"]
+    start = time.perf_counter()
+    record = {"path": path}
+    try:
+        with Image.open(path) as img:
+            bw = preprocess_image(img, config["preprocess"])
+        lang = config["ocr_lang"] if config["ocr_lang"] != "auto" else OCR_LANG
+        if config["ocr_adaptive"]:
+            result = adaptive_ocr(_batch["engine"], bw, lang, config["ocr_min_confidence"])
+        else:
+            result = _batch["engine"].recognize(bw, lang)
+        texto = record["text"] = result.text
+        if _batch["layout"]:
+            record["layout"] = result.to_json()
+        if _batch["translator"] is not None:
+            # "translation" no primeiro destino; com vários, todos em "translations"
+            targets = config["target_langs"]
+            try:
+                src = source_language(config, texto)
+                translations = {dest: translate_text(_batch["translator"], texto, dest, src)
+                                for dest in targets}
+                record["translation"] = translations[targets[0]]
+                if len(targets) > 1:
+                    record["translations"] = translations
+            except Exception as e:
+                record["translation_error"] = str(e)
+    except Exception as e:
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def run_batch(paths, out, config, workers=None, translate=True, layout=False):
+    # Escreve um JSON por linha em `out`, na ordem em que os resultados
+    # ficam prontos; devolve (processadas, segundos)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    count = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_batch_init,
+                             initargs=(config, translate, layout)) as pool:
+        futures = [pool.submit(_batch_process, path) for path in paths]
+        for future in as_completed(futures):
+            out.write(json.dumps(future.result(), ensure_ascii=False) + "\n")
+            out.flush()
+            count += 1
+    return count, time.perf_counter() - start
+
+
+def batch_command(args):
+    config = apply_language_args(load_config(), args)
+    paths = expand_inputs(args.inputs)
+    mode = "w"
+    if args.output and args.resume:
+        trim_partial_line(args.output)
+        done = read_done(args.output)
+        paths = [p for p in paths if p not in done]
+        mode = "a"
+        print(f"Retomando: {len(done)} já processadas", file=sys.stderr)
+    if not paths:
+        print("Nenhuma imagem para processar.", file=sys.stderr)
+        return
+
+    out = open(args.output, mode, encoding="utf-8") if args.output else sys.stdout
+    try:
+        count, elapsed = run_batch(paths, out, config, args.workers,
+                                   translate=not args.no_translate, layout=args.layout)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{count} imagens em {elapsed:.1f} s ({count / elapsed:.2f} imagens/s)",
+          file=sys.stderr)
+
+
+def apply_language_args(config, args):
+    # --ocr-lang/--from/--to sobrepostos à configuração (só os informados)
+    if getattr(args, "ocr_lang", None):
+        config["ocr_lang"] = args.ocr_lang
+    if getattr(args, "source", None):
+        config["translation_source"] = args.source
+    targets = parse_langs(getattr(args, "to", None) or "")
+    if targets:
+        config["target_langs"] = targets
+    return config
+
+
+def main(argv=None):
+    # Opções de idioma valem antes ou depois do subcomando (SUPPRESS evita
+    # que o padrão do subcomando apague o valor dado antes dele)
+    languages = argparse.ArgumentParser(add_help=False)
+    languages.add_argument("--ocr-lang", default=argparse.SUPPRESS,
+                           help="pacote(s) do Tesseract, ex. eng, por+eng ou auto")
+    languages.add_argument("--from", dest="source", default=argparse.SUPPRESS,
+                           help="idioma de origem da tradução (padrão: detectado)")
+    languages.add_argument("--to", default=argparse.SUPPRESS,
+                           help="idioma(s) de destino, ex. pt ou pt,en,es")
+    parser = argparse.ArgumentParser(prog="ocrclipboardtranslate",
+                                     description="OCR & Translate Clipboard App",
+                                     parents=[languages])
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("daemon", parents=[languages],
+                        help="observa o clipboard e faz OCR das imagens copiadas")
+    commands.add_parser("capture", parents=[languages],
+                        help="captura pela instância aberta (ou abre uma nova)")
+    commands.add_parser("show", help="mostra a janela da instância aberta")
+    commands.add_parser("quit", help="encerra a instância residente")
+    batch = commands.add_parser("batch", parents=[languages],
+                                help="OCR (e tradução) de diretórios de imagens")
+    batch.add_argument("inputs", nargs="+", metavar="DIR|GLOB")
+    batch.add_argument("-o", "--output", help="arquivo JSON Lines (padrão: stdout)")
+    batch.add_argument("--resume", action="store_true",
+                       help="pula as imagens já presentes em --output")
+    batch.add_argument("-j", "--workers", type=int,
+                       help="processos em paralelo (padrão: número de CPUs)")
+    batch.add_argument("--no-translate", action="store_true")
+    batch.add_argument("--layout", action="store_true",
+                       help="inclui blocos, linhas e palavras com caixas e confianças")
+    # Auxiliar que mantém a última cópia no clipboard depois da saída
+    commands.add_parser("clipboard-hold")
+    # Usado por benchmarks/bench_startup.py: fecha após o primeiro desenho
+    parser.add_argument("--startup-probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.command == "daemon":
+        ClipboardDaemon(apply_language_args(load_config(), args)).run()
+    elif args.command == "batch":
+        batch_command(args)
+    elif args.command == "clipboard-hold":
+        clipboard_hold()
+    elif args.command in ("show", "quit"):
+        if send_command(args.command) is None:
+            print("Nenhuma instância em execução", file=sys.stderr)
+            sys.exit(1)
+    else:
+        config = apply_language_args(load_config(), args)
+        server = None
+        if config["single_instance"] and not args.startup_probe:
+            server = InstanceServer()
+            try:
+                claimed = server.claim()
+            except OSError as e:
+                # Ex. XDG_RUNTIME_DIR sem permissão de escrita: abre sem socket
+                print(f"Aviso: modo de instância única desativado: {e}", file=sys.stderr)
+                server, claimed = None, True
+            if not claimed:
+                # Já existe uma instância aquecida: só pede a captura (com os
+                # destinos, se dados na linha de comando)
+                if getattr(args, "to", None):
+                    send_command("targets " + ",".join(config["target_langs"]))
+                send_command("capture")
+                return
+        app = OCRClipboardApp(server, config)
+        if args.command == "capture":
+            app.after_idle(app.select_area_ocr)
+        if args.startup_probe:
+            app.bind("<Map>", lambda e: app.after_idle(startup_probe_done, app), add="+")
+        app.mainloop()
+
+
+def startup_probe_done(app):
+    print("first-frame", flush=True)
+    app.on_close()
+
 
 if __name__ == "__main__":
-    app = OCRClipboardApp()
-    app.mainloop()
+    main()
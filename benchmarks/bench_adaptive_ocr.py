@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# OCR adaptativo: latência e CER do Tesseract sempre no modo completo
+# (PSM 3, como antes) contra o modo escolhido pela geometria da captura,
+# com segunda tentativa quando a confiança sai baixa. O corpus cobre os
+# formatos que a classificação distingue: palavra solta, uma linha, bloco,
+# duas colunas, rótulos esparsos, texto grande e texto miúdo.
+#
+#   python3 benchmarks/bench_adaptive_ocr.py [--count N] [--lang eng] [--min-confidence N]
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, OCR_LANG, adaptive_ocr,
+                                   import_signal_modules, load_modules, make_ocr_engine,
+                                   preprocess_image)
+from PIL import Image, ImageDraw
+from corpus import LINES_BY_LANG, load_font, render_sample
+from common import char_error_rate, percentile
+
+
+def text_lines(lang, rng, n):
+    return rng.sample(LINES_BY_LANG[lang], n)
+
+
+def make_word(lang, rng):
+    word = max(rng.choice(LINES_BY_LANG[lang]).split(), key=len).strip(".,:?()")
+    return render_sample([word], size=rng.choice([14, 18, 24, 32])), word
+
+
+def make_line(lang, rng):
+    lines = text_lines(lang, rng, 1)
+    return render_sample(lines, size=rng.choice([12, 14, 18, 24])), "\n".join(lines)
+
+
+def make_block(lang, rng):
+    lines = text_lines(lang, rng, rng.randint(3, 6))
+    return render_sample(lines, size=rng.choice([12, 14, 18])), "\n".join(lines)
+
+
+def make_columns(lang, rng):
+    # Duas colunas lado a lado, como num artigo ou numa tabela
+    size = rng.choice([14, 18])
+    left_lines, right_lines = text_lines(lang, rng, 4), text_lines(lang, rng, 4)
+    left = render_sample(left_lines, size=size)
+    right = render_sample(right_lines, size=size)
+    img = Image.new("RGB", (left.width + right.width + 60, max(left.height, right.height)),
+                    "white")
+    img.paste(left, (0, 0))
+    img.paste(right, (left.width + 60, 0))
+    return img, "\n".join(left_lines + right_lines)
+
+
+def make_sparse(lang, rng):
+    # Rótulos soltos numa área grande, como numa interface
+    font_size = rng.choice([14, 18])
+    font = load_font(font_size)
+    img = Image.new("RGB", (900, 600), "white")
+    draw = ImageDraw.Draw(img)
+    labels = text_lines(lang, rng, rng.randint(3, 5))
+    rows = sorted(rng.sample(range(0, 560, 70), len(labels)))
+    for label, y in zip(labels, rows):
+        x = rng.randint(10, max(10, 890 - int(font.getlength(label))))
+        draw.text((x, y + 10), label, font=font, fill="black")
+    return img, "\n".join(labels)
+
+
+def make_large(lang, rng):
+    lines = text_lines(lang, rng, 2)
+    return render_sample(lines, size=rng.choice([72, 96])), "\n".join(lines)
+
+
+def make_tiny(lang, rng):
+    lines = text_lines(lang, rng, 3)
+    return render_sample(lines, size=rng.choice([8, 9])), "\n".join(lines)
+
+
+CATEGORIES = {
+    "palavra": make_word,
+    "linha": make_line,
+    "bloco": make_block,
+    "colunas": make_columns,
+    "esparso": make_sparse,
+    "grande": make_large,
+    "miudo": make_tiny,
+}
+
+
+def sorted_lines(text):
+    # A ordem de leitura de rótulos soltos e colunas é ambígua: o CER é
+    # medido sobre as linhas ordenadas (linhas de colunas diferentes
+    # grudadas numa só continuam contando como erro)
+    return "\n".join(sorted(line.strip() for line in text.splitlines() if line.strip()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do OCR adaptativo")
+    parser.add_argument("--count", type=int, default=8, help="imagens por categoria")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lang", default=OCR_LANG)
+    parser.add_argument("--min-confidence", type=float,
+                        default=DEFAULT_CONFIG["ocr_min_confidence"])
+    args = parser.parse_args()
+
+    import_signal_modules()
+    load_modules()
+    engine = make_ocr_engine(DEFAULT_CONFIG["ocr_engine"], 1)
+    engine.warm(args.lang)
+    rng = random.Random(args.seed)
+    text_lang = "por" if args.lang.startswith("por") else "eng"
+
+    print(f"{args.count} imagens por categoria, idioma {args.lang}, "
+          f"confiança mínima {args.min_confidence:g}\n")
+    print(f"{'':<10}{'fixo ms':>9}{'adapt. ms':>11}{'fixo CER':>10}{'adapt. CER':>12}"
+          f"{'refeitos':>10}  classes")
+    fixed_all, adaptive_all, fixed_cer, adaptive_cer = [], [], [], []
+    for category, make in CATEGORIES.items():
+        samples = [make(text_lang, rng) for _ in range(args.count)]
+        images = [preprocess_image(img, DEFAULT_CONFIG["preprocess"]) for img, _ in samples]
+        fixed, adaptive, cer_f, cer_a, classes = [], [], [], [], Counter()
+        retries = 0
+        for bw, (_, truth) in zip(images, samples):
+            start = time.perf_counter()
+            text = engine.image_to_string(bw, lang=args.lang)
+            fixed.append((time.perf_counter() - start) * 1000)
+            cer_f.append(char_error_rate(sorted_lines(truth), sorted_lines(text)))
+
+            timings = {}
+            start = time.perf_counter()
+            text = adaptive_ocr(engine, bw, args.lang, args.min_confidence, timings).text
+            adaptive.append((time.perf_counter() - start) * 1000)
+            cer_a.append(char_error_rate(sorted_lines(truth), sorted_lines(text)))
+            retries += "refeito" in timings
+            classes.update(name for name in timings if name != "refeito")
+        print(f"{category:<10}{statistics.mean(fixed):9.1f}{statistics.mean(adaptive):11.1f}"
+              f"{statistics.mean(cer_f) * 100:9.1f}%{statistics.mean(cer_a) * 100:11.1f}%"
+              f"{retries:>10}  " + ", ".join(f"{k}={v}" for k, v in classes.most_common()))
+        fixed_all += fixed
+        adaptive_all += adaptive
+        fixed_cer += cer_f
+        adaptive_cer += cer_a
+    engine.close()
+
+    print()
+    for label, times, cers in (("fixo (PSM 3)", fixed_all, fixed_cer),
+                               ("adaptativo", adaptive_all, adaptive_cer)):
+        print(f"{label:<14} média={statistics.mean(times):7.1f} ms  "
+              f"p95={percentile(times, 95):7.1f} ms  CER={statistics.mean(cers) * 100:5.1f}%  "
+              f"pior CER={max(cers) * 100:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# Vazão (imagens/s) do modo batch: execução sequencial (1 processo)
+# contra o pool com um processo por CPU, sem tradução.
+#
+#   python3 benchmarks/bench_batch.py [--count N] [--workers N]
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import expand_inputs, load_config, run_batch
+from corpus import generate_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do modo batch")
+    parser.add_argument("--count", type=int, default=48)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    config = load_config()
+    with tempfile.TemporaryDirectory() as directory:
+        for i, (img, _) in enumerate(generate_corpus(args.count)):
+            img.save(os.path.join(directory, f"{i:04d}.png"))
+        paths = expand_inputs([directory])
+
+        with open(os.devnull, "w") as out:
+            results = {}
+            for workers in sorted({1, args.workers}):
+                count, elapsed = run_batch(paths, out, config, workers, translate=False)
+                results[workers] = count / elapsed
+                print(f"{workers:>3} processo(s): {count} imagens em {elapsed:6.2f} s "
+                      f"→ {results[workers]:6.2f} imagens/s")
+        if len(results) > 1:
+            print(f"speedup: {results[args.workers] / results[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
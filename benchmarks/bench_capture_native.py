@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Latência da captura, sem contar a seleção da área: ferramenta externa
+# (processo novo, PNG gravado em disco, espera via inotify, leitura e
+# decodificação) contra a captura nativa (tela lida do X direto para a
+# memória e recortada). Precisa de um display; em máquinas sem X:
+#
+#   xvfb-run -s "-screen 0 1920x1080x24" python3 benchmarks/bench_capture_native.py [--runs N]
+#
+# Sem gnome-screenshot instalado, a ferramenta externa é simulada por um
+# processo Python que lê a tela e grava o PNG (mesmo trabalho, sem GNOME).
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import grab_screen, native_capture_available, open_watch, wait_for_capture
+from PIL import Image
+
+# Área típica de uma seleção
+BOX = (100, 100, 900, 400)
+
+SIMULATED_TOOL = ("import sys; from PIL import ImageGrab; "
+                  "ImageGrab.grab().save(sys.argv[1], 'PNG')")
+
+
+def external_capture(path):
+    if shutil.which("gnome-screenshot"):
+        command = ["gnome-screenshot", "-f", path]
+    else:
+        command = [sys.executable, "-c", SIMULATED_TOOL, path]
+    start = time.perf_counter()
+    watch = open_watch(os.path.dirname(path))
+    try:
+        subprocess.run(command, check=True)
+        wait_for_capture(path, None, 10, watch)
+    finally:
+        if watch is not None:
+            watch.close()
+    with open(path, "rb") as f:
+        png = f.read()
+    os.remove(path)
+    img = Image.open(io.BytesIO(png))
+    img.load()
+    img.crop(BOX)
+    return (time.perf_counter() - start) * 1000
+
+
+def native_capture():
+    start = time.perf_counter()
+    grab_screen().crop(BOX)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da captura nativa")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if not native_capture_available():
+        sys.exit("Captura nativa indisponível (sem DISPLAY, Wayland ou Pillow sem XCB)")
+    print(f"Tela: {grab_screen().size[0]}x{grab_screen().size[1]}")
+    tool = "gnome-screenshot" if shutil.which("gnome-screenshot") else "processo simulado"
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "captura.png")
+        for label, func in ((f"externa ({tool})", lambda: external_capture(path)),
+                            ("nativa (X11 em memória)", native_capture)):
+            times = [func() for _ in range(args.runs)]
+            print(f"{label:<32} mediana={statistics.median(times):7.1f} ms  "
+                  f"máx={max(times):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
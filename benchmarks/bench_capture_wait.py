@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Latência entre a escrita do arquivo da captura e a detecção pelo app:
+# polling de mtime a cada 100 ms (versão antiga) contra inotify.
+# Simula um gnome-screenshot que termina de gravar o PNG com atraso.
+#
+#   python3 benchmarks/bench_capture_wait.py [--runs N]
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import open_watch, wait_for_capture
+
+
+def old_wait(path, old_mtime, watch=None):
+    # Laço original de select_area_ocr
+    while True:
+        if os.path.exists(path):
+            new_mtime = os.path.getmtime(path)
+            if old_mtime is None or new_mtime != old_mtime:
+                break
+        time.sleep(0.1)
+
+
+def new_wait(path, old_mtime, watch=None):
+    old_ns = None if old_mtime is None else os.stat(path).st_mtime_ns
+    wait_for_capture(path, old_ns, timeout=10, watch=watch)
+
+
+def measure(wait, directory, delay, use_watch):
+    path = os.path.join(directory, "ocr_area.png")
+    if os.path.exists(path):
+        os.remove(path)
+    written = {}
+
+    def writer():
+        time.sleep(delay)
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG" + os.urandom(64 * 1024))
+            # Marca o instante logo antes do close (evento do inotify)
+            written["t"] = time.perf_counter()
+
+    watch = open_watch(directory) if use_watch else None
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        wait(path, None, watch)
+        detected = time.perf_counter()
+    finally:
+        if watch is not None:
+            watch.close()
+    t.join()
+    return (detected - written["t"]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da espera pela captura")
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    delays = [rng.uniform(0.0, 0.3) for _ in range(args.runs)]
+    with tempfile.TemporaryDirectory() as directory:
+        for label, wait, use_watch in (("polling 100 ms", old_wait, False),
+                                       ("inotify", new_wait, True)):
+            times = [measure(wait, directory, d, use_watch) for d in delays]
+            print(f"{label:<16} média={statistics.mean(times):7.2f} ms  "
+                  f"máx={max(times):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
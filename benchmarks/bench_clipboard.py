@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Cópias para o clipboard: xclip por cópia (processo novo, PNG codificado
+# antes, quem copia espera) contra o ClipboardService (posse própria via
+# XCB; copy() só entrega o conteúdo). Mede o tempo em que quem copia fica
+# bloqueado, o tempo até um leitor (`xclip -o`) receber o conteúdo, para
+# texto e para uma captura 1920x1080, e a passagem da posse ao processo
+# auxiliar na saída. Precisa de um display e do xclip; em máquinas sem X:
+#
+#   xvfb-run -s "-screen 0 1920x1080x24" python3 benchmarks/bench_clipboard.py [--runs N]
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import ClipboardService, load_modules
+from PIL import Image
+from corpus import LINES_BY_LANG, render_sample
+
+
+def make_screenshot():
+    # Tela cheia com um bloco de texto, como uma captura real
+    img = Image.new("RGB", (1920, 1080), (236, 236, 236))
+    img.paste(render_sample(LINES_BY_LANG["por"][:12], size=18), (200, 150))
+    return img
+
+
+def read_clipboard(target):
+    return subprocess.run(["xclip", "-selection", "clipboard", "-t", target, "-o"],
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+
+
+def wait_clipboard(target, expected, timeout=5.0):
+    # Lê até o conteúdo novo aparecer (a posse é assumida em segundo plano)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data = read_clipboard(target)
+        if expected(data):
+            return
+    raise RuntimeError(f"{target} não chegou ao clipboard")
+
+
+def xclip_copy(text=None, image=None):
+    if image is not None:
+        buf = io.BytesIO()
+        image.save(buf, "PNG")
+        data, command = buf.getvalue(), ["-t", "image/png"]
+    else:
+        data, command = text.encode("utf-8"), []
+    subprocess.run(["xclip", "-selection", "clipboard", "-i", *command], input=data, check=True)
+
+
+def run(label, copy, samples, target, expected):
+    blocked, delivered = [], []
+    for sample in samples:
+        start = time.perf_counter()
+        copy(sample)
+        blocked.append((time.perf_counter() - start) * 1000)
+        wait_clipboard(target, lambda data: expected(sample, data))
+        delivered.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<30} bloqueio={statistics.median(blocked):7.2f} ms  "
+          f"até colar={statistics.median(delivered):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das cópias para o clipboard")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if not os.environ.get("DISPLAY") or not shutil.which("xclip"):
+        sys.exit("Precisa de DISPLAY e do xclip (ex. xvfb-run)")
+    load_modules()
+    service = ClipboardService()
+    if service.owner is None:
+        sys.exit("libxcb indisponível: o ClipboardService cairia no xclip")
+
+    texts = [f"{i}: " + " ".join(LINES_BY_LANG["por"][i % 10:i % 10 + 3])
+             for i in range(args.runs)]
+    same_text = lambda text, data: data.decode("utf-8", "replace") == text
+    # Mesma captura com o primeiro pixel diferente a cada rodada, para o
+    # leitor distinguir uma cópia da anterior
+    screenshot = make_screenshot()
+    images = []
+    for i in range(max(3, args.runs // 4)):
+        img = screenshot.copy()
+        img.putpixel((0, 0), (i, 0, 0))
+        images.append(img)
+    same_image = lambda img, data: (data[:8] == b"\x89PNG\r\n\x1a\n" and
+                                    Image.open(io.BytesIO(data)).getpixel((0, 0))
+                                    == img.getpixel((0, 0)))
+
+    print(f"{args.runs} cópias de texto, {len(images)} de uma captura "
+          f"{screenshot.width}x{screenshot.height}\n")
+    run("texto: xclip por cópia", lambda t: xclip_copy(text=t), texts, "UTF8_STRING", same_text)
+    run("texto: ClipboardService", lambda t: service.copy(text=t), texts, "UTF8_STRING",
+        same_text)
+    run("imagem: PNG + xclip", lambda img: xclip_copy(image=img), images, "image/png", same_image)
+    run("imagem: ClipboardService", lambda img: service.copy(image=img), images, "image/png",
+        same_image)
+
+    # Saída do programa: a última cópia passa ao `clipboard-hold`
+    service.copy(text="continua depois da saída", image=images[0])
+    start = time.perf_counter()
+    service.close()
+    closed = (time.perf_counter() - start) * 1000
+    kept = read_clipboard("UTF8_STRING") == "continua depois da saída".encode("utf-8")
+    kept = kept and read_clipboard("image/png")[:8] == b"\x89PNG\r\n\x1a\n"
+    print(f"\nsaída com passagem da posse: {closed:.0f} ms, texto e imagem "
+          f"{'mantidos' if kept else 'PERDIDOS'} no clipboard")
+    # Libera o auxiliar para não deixar um processo para trás
+    subprocess.run(["xclip", "-selection", "clipboard", "-i"], input=b"", check=True)
+
+
+if __name__ == "__main__":
+    main()
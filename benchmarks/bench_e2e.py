@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# Benchmark ponta a ponta: um corpus variado (fontes, tamanhos, fundo claro,
+# escuro e com gradiente, português/inglês/misturado) passa pelo mesmo
+# OCRPipeline da janela (pré-processamento → OCR → detecção → tradução), com
+# o tradutor apontado para o servidor stub e sem display. Mede latência por
+# captura, vazão com o pipeline cheio, pico de memória e CER, e compara
+# configurações lado a lado. Cada configuração roda num processo próprio,
+# para o pico de memória ser só dela. Sem cache: toda captura vai ao OCR.
+#
+#   python3 benchmarks/bench_e2e.py [--count N] [--seed N] [--preset NOME ...]
+#                                   [--config NOME=arquivo.json ...] [--set CHAVE=VALOR ...]
+#                                   [--json resultado.json]
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import resource
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, LEGACY_PREPROCESS, OCR_LANG, CaptureJob,
+                                   OCRPipeline, StageMetrics, TranslationClient,
+                                   import_signal_modules, load_modules)
+from corpus import generate_varied_corpus
+from common import char_error_rate, percentile
+from stub_server import start_stub_server
+
+# Sobreposições ao DEFAULT_CONFIG
+PRESETS = {
+    "padrao": {},
+    "original": {"preprocess": LEGACY_PREPROCESS, "ocr_lang": OCR_LANG,
+                 "stream_min_height": 10 ** 9},
+    "sem-stream": {"stream_min_height": 10 ** 9},
+    "psm-fixo": {"ocr_adaptive": False},
+    "pytesseract": {"ocr_engine": "pytesseract"},
+}
+
+STAGES = ("pre", "ocr", "deteccao", "traducao")
+
+
+def run_job(pipeline, results, img):
+    # Submete uma captura e espera o fim; devolve (texto OCR, tempos) ou
+    # (None, mensagem de erro)
+    job = CaptureJob()
+    pipeline.submit_image(job, img)
+    return collect(results, {job.id: job})[job.id]
+
+
+def collect(results, jobs):
+    done = {}
+    texts = {}
+    while len(done) < len(jobs):
+        kind, job, *payload = results.get(timeout=300)
+        if job.id not in jobs:
+            continue
+        if kind == "ocr":
+            texts[job.id] = payload[0]
+        elif kind == "metricas":
+            done[job.id] = (texts.get(job.id, ""), payload[0])
+        elif kind == "erro":
+            done[job.id] = (None, f"{payload[0]}: {payload[1]}")
+    return done
+
+
+def run_config(name, overrides, count, seed, latency, max_lines):
+    import_signal_modules()
+    load_modules()
+    server, url = start_stub_server(latency=latency)
+    config = dict(DEFAULT_CONFIG, **overrides)
+    config.update(translation_backend="libretranslate", translation_url=url,
+                  metrics_export="")
+    results = queue.Queue()
+    pipeline = OCRPipeline(TranslationClient(config), results, None, {}, config)
+    corpus = generate_varied_corpus(count, seed, max_lines=max_lines)
+    try:
+        # Aquecimento: modelos do Tesseract e conexão com o tradutor
+        run_job(pipeline, results, corpus[0][0])
+        pipeline.metrics = StageMetrics(config["metrics_window"])
+
+        latencies, cers, errors = [], [], []
+        by_category = {}
+        for img, truth, meta in corpus:
+            text, timings = run_job(pipeline, results, img)
+            if text is None:
+                errors.append(timings)
+                continue
+            latencies.append(timings["total"] * 1000)
+            cer = char_error_rate(truth, text)
+            cers.append(cer)
+            for key in ("style", "lang", "family"):
+                by_category.setdefault(f"{key}={meta[key]}", []).append(cer)
+
+        # Vazão: todas as capturas de uma vez, com os estágios sobrepostos
+        jobs = {}
+        start = time.perf_counter()
+        for img, _, _ in corpus:
+            job = CaptureJob()
+            jobs[job.id] = job
+            pipeline.submit_image(job, img)
+        done = collect(results, jobs)
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for text, _ in done.values() if text is not None)
+        throughput = ok / elapsed if ok else None
+
+        snapshot = pipeline.metrics.snapshot()
+    finally:
+        pipeline.shutdown()
+        server.shutdown()
+
+    return {
+        "name": name,
+        "config": overrides,
+        "count": len(corpus),
+        "errors": errors,
+        "latency_ms": {"mean": statistics.mean(latencies), "p50": percentile(latencies, 50),
+                       "p95": percentile(latencies, 95), "p99": percentile(latencies, 99)}
+        if latencies else {},
+        "stage_p50_ms": {stage: snapshot[stage]["p50"] * 1000
+                         for stage in STAGES if stage in snapshot},
+        "throughput": throughput,
+        # ru_maxrss vem em KiB no Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "cer": statistics.mean(cers) if cers else None,
+        "cer_by": {key: statistics.mean(values) for key, values in sorted(by_category.items())},
+    }
+
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def build_configs(args):
+    configs = [(name, dict(PRESETS[name])) for name in args.preset]
+    for spec in args.config:
+        name, _, path = spec.partition("=")
+        with open(path, encoding="utf-8") as f:
+            configs.append((name, json.load(f)))
+    common = {}
+    for spec in args.set:
+        key, _, value = spec.partition("=")
+        if key not in DEFAULT_CONFIG:
+            raise SystemExit(f"chave desconhecida: {key}")
+        common[key] = parse_value(value)
+    return [(name, dict(overrides, **common)) for name, overrides in configs]
+
+
+def report(results):
+    width = max(12, *(len(r["name"]) for r in results))
+
+    def row(label, values):
+        print(f"{label:<24}" + "".join(f"{v:>{width + 2}}" for v in values))
+
+    def fmt(value, spec):
+        return "-" if value is None else format(value, spec)
+
+    row("", [r["name"] for r in results])
+    for key in ("mean", "p50", "p95", "p99"):
+        row(f"latência {key} (ms)", [fmt(r["latency_ms"].get(key), ".1f") for r in results])
+    for stage in STAGES:
+        row(f"  {stage} p50 (ms)", [fmt(r["stage_p50_ms"].get(stage), ".1f") for r in results])
+    row("vazão (capturas/s)", [fmt(r["throughput"], ".2f") for r in results])
+    row("pico de RSS (MB)", [fmt(r["peak_rss_mb"], ".0f") for r in results])
+    row("CER (%)", [fmt(r["cer"] and r["cer"] * 100, ".1f") for r in results])
+    categories = sorted({key for r in results for key in r["cer_by"]})
+    for key in categories:
+        row(f"  {key}", [fmt(r["cer_by"].get(key) and r["cer_by"][key] * 100, ".1f")
+                         for r in results])
+    row("erros", [str(len(r["errors"])) for r in results])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta")
+    parser.add_argument("--count", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-lines", type=int, default=5,
+                        help="linhas por imagem (acima de ~12 exercita o OCR por blocos)")
+    parser.add_argument("--latency", type=float, default=50,
+                        help="latência simulada do tradutor (ms)")
+    parser.add_argument("--preset", nargs="+", default=["padrao", "original"],
+                        choices=sorted(PRESETS))
+    parser.add_argument("--config", action="append", default=[], metavar="NOME=ARQUIVO",
+                        help="configuração extra em JSON (sobreposta ao padrão)")
+    parser.add_argument("--set", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="aplicado a todas as configurações, ex. ocr_lang=eng")
+    parser.add_argument("--json", help="grava os resultados completos neste arquivo")
+    args = parser.parse_args()
+
+    results = []
+    for name, overrides in build_configs(args):
+        print(f"rodando {name}...", file=sys.stderr)
+        # Processo novo por configuração: motor, caches e pico de RSS isolados
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results.append(executor.submit(run_config, name, overrides, args.count, args.seed,
+                                           args.latency / 1000, args.max_lines).result())
+    report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Histórico com dezenas de milhares de entradas: tempo de gravação, da
+# primeira página, de uma página "funda" (paginação por chave) e da busca
+# FTS5, além do tamanho do arquivo. Capturas repetidas (mesmo hash) não
+# criam entradas novas.
+#
+#   python3 benchmarks/bench_history.py [--entries N]
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import HistoryStore, encode_thumbnail, image_hash
+from corpus import LINES_BY_LANG, generate_corpus
+
+
+def timed(func, runs=20):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do histórico")
+    parser.add_argument("--entries", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    lines = LINES_BY_LANG["eng"] + LINES_BY_LANG["por"]
+    # Poucas miniaturas reais, reaproveitadas: o custo medido é o do banco
+    thumbs = []
+    for img, _ in generate_corpus(8, styles=("light", "dark")):
+        img.thumbnail((500, 200))
+        thumbs.append(encode_thumbnail(img))
+    repeated = generate_corpus(1)[0][0]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.sqlite3")
+        store = HistoryStore(path)
+        start = time.perf_counter()
+        for i in range(args.entries):
+            text = "\n".join(rng.sample(lines, 3)) + f" #{i}"
+            store.add(f"{i:064x}", (800, 200), thumbs[i % len(thumbs)], text,
+                      "[pt] " + text, {"ocr": 0.1})
+        insert = (time.perf_counter() - start) / args.entries * 1000
+        digest = image_hash(repeated)
+        for _ in range(5):
+            store.add(digest, repeated.size, thumbs[0], "repetida", "", {})
+
+        first = store.page(limit=100)
+        deep_key = None
+        rows = first
+        for _ in range(args.entries // 200):
+            rows = store.page(before=(rows[-1][1], rows[-1][0]), limit=100)
+        deep_key = (rows[-1][1], rows[-1][0])
+
+        print(f"{len(store)} entradas ({args.entries} + 1 repetida 5 vezes), "
+              f"arquivo de {os.path.getsize(path) / 1024 / 1024:.1f} MB\n")
+        print(f"gravação                 {insert:7.2f} ms/entrada")
+        print(f"primeira página (100)    {timed(lambda: store.page(limit=100)):7.2f} ms")
+        print(f"página na metade         {timed(lambda: store.page(before=deep_key)):7.2f} ms")
+        print(f"busca 'disk'             {timed(lambda: store.page('disk')):7.2f} ms")
+        print(f"busca 'sessão expirou'   {timed(lambda: store.page('sessão expirou')):7.2f} ms")
+        print(f"abrir entrada            {timed(lambda: store.get(first[0][0])):7.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
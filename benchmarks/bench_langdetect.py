@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Acurácia e custo do detector local de idioma num conjunto misto (frases
+# que não fazem parte do treino), e o tempo de tradução economizado ao não
+# chamar o backend para texto já em português (servidor stub com latência).
+#
+#   python3 benchmarks/bench_langdetect.py [--latency MS]
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, LanguageDetector, TranslationClient,
+                                   translate_text)
+from stub_server import start_stub_server
+
+SAMPLES = [
+    ("pt", "Você tem certeza que deseja excluir esta pasta?"),
+    ("pt", "O pagamento foi aprovado e o pedido será enviado em breve."),
+    ("pt", "Nenhum resultado encontrado para a sua pesquisa."),
+    ("pt", "Atualização disponível: reinicie o aplicativo para instalar."),
+    ("pt", "A reunião começa às nove horas na sala de conferências."),
+    ("pt", "Esqueceu a senha? Enviaremos um link para o seu e-mail."),
+    ("pt", "Os arquivos selecionados serão movidos para a lixeira."),
+    ("pt", "Obrigado por participar da nossa pesquisa de satisfação."),
+    ("en", "Are you sure you want to delete this folder?"),
+    ("en", "The payment was approved and your order will ship soon."),
+    ("en", "No results were found for your search."),
+    ("en", "Update available: restart the application to install."),
+    ("en", "The meeting starts at nine o'clock in the conference room."),
+    ("en", "Forgot your password? We will send a link to your email."),
+    ("en", "Selected files will be moved to the trash."),
+    ("en", "Thank you for taking part in our satisfaction survey."),
+    ("es", "¿Está seguro de que desea eliminar esta carpeta?"),
+    ("es", "No se encontraron resultados para su búsqueda."),
+    ("es", "Gracias por participar en nuestra encuesta de satisfacción."),
+    ("fr", "Êtes-vous sûr de vouloir supprimer ce dossier ?"),
+    ("fr", "Aucun résultat n'a été trouvé pour votre recherche."),
+    ("fr", "Merci d'avoir participé à notre enquête de satisfaction."),
+    ("de", "Sind Sie sicher, dass Sie diesen Ordner löschen möchten?"),
+    ("de", "Für Ihre Suche wurden keine Ergebnisse gefunden."),
+    ("it", "Sei sicuro di voler eliminare questa cartella?"),
+    ("it", "Nessun risultato trovato per la tua ricerca."),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da detecção de idioma")
+    parser.add_argument("--latency", type=float, default=150, help="ms por requisição")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    detector = LanguageDetector()
+    print(f"treino do modelo: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    correct = abstained = pt_errors = 0
+    elapsed = 0.0
+    for expected, text in SAMPLES:
+        start = time.perf_counter()
+        got = detector.detect(text)
+        elapsed += time.perf_counter() - start
+        if got is None:
+            abstained += 1
+        elif got == expected:
+            correct += 1
+        if got is not None and (got == "pt") != (expected == "pt"):
+            pt_errors += 1
+    n = len(SAMPLES)
+    print(f"{n} frases: {correct} corretas ({correct / n:.0%}), "
+          f"{abstained} sem decisão (vão ao backend), "
+          f"{pt_errors} erros de português/não-português")
+    print(f"tempo médio por detecção: {elapsed / n * 1e6:.1f} µs")
+
+    server, url = start_stub_server(latency=args.latency / 1000)
+    client = TranslationClient(dict(DEFAULT_CONFIG, translation_backend="libretranslate",
+                                    translation_url=url))
+    texts = [text for _, text in SAMPLES]
+
+    start = time.perf_counter()
+    for text in texts:
+        client.translate(text, "pt")
+    remote = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts:
+        translate_text(client, text)
+    local = time.perf_counter() - start
+    print(f"tradução de {n} frases com {args.latency:.0f} ms de latência: "
+          f"sempre remoto {remote:.2f} s, com detector local {local:.2f} s "
+          f"({remote - local:.2f} s economizados)")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
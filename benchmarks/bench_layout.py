@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Resultado estruturado do OCR: custo de guardar palavras, caixas e
+# confianças (OCRResult) em vez de só o texto, no mesmo reconhecimento.
+# Mede o OCR só com texto contra o estruturado, o tempo para derivar texto,
+# hOCR, TSV e JSON do resultado (antes, cada formato seria uma nova chamada
+# ao Tesseract) e a memória de um OCRResult contra a mesma estrutura em
+# dicionários aninhados (to_json).
+#
+#   python3 benchmarks/bench_layout.py [--count N] [--lang eng]
+import os
+import sys
+import time
+import argparse
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, OCR_EXPORTS, OCR_LANG, PSM_AUTO, OCRResult,
+                                   import_signal_modules, load_modules, make_ocr_engine,
+                                   preprocess_image)
+from corpus import generate_varied_corpus
+
+FORMATS = (".txt", ".hocr", ".tsv", ".json")
+
+
+def allocated(build):
+    # Bytes alocados por build() que continuam vivos no fim
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do resultado estruturado do OCR")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lang", default=OCR_LANG)
+    args = parser.parse_args()
+
+    import_signal_modules()
+    load_modules()
+    engine = make_ocr_engine(DEFAULT_CONFIG["ocr_engine"], 1)
+    engine.warm(args.lang)
+    images = [preprocess_image(img, DEFAULT_CONFIG["preprocess"])
+              for img, _, _ in generate_varied_corpus(args.count, args.seed, max_lines=8)]
+
+    flat, structured, exports, same = [], [], [], 0
+    compact, nested, words = [], [], 0
+    for bw in images:
+        start = time.perf_counter()
+        text = engine.image_to_string(bw, lang=args.lang)
+        flat.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        result = engine.recognize(bw, args.lang, PSM_AUTO)
+        structured.append((time.perf_counter() - start) * 1000)
+        same += result.text == text.strip()
+        words += len(result.words)
+
+        start = time.perf_counter()
+        for ext in FORMATS:
+            OCR_EXPORTS[ext](result)
+        exports.append((time.perf_counter() - start) * 1000)
+
+        compact.append(allocated(lambda: OCRResult.from_cache(result.to_cache()))[1])
+        nested.append(allocated(result.to_json)[1])
+    engine.close()
+
+    print(f"{len(images)} capturas, {words} palavras, motor {engine.name}, idioma {args.lang}\n")
+    print(f"{'OCR só texto':<28} média={statistics.mean(flat):7.1f} ms")
+    print(f"{'OCR estruturado':<28} média={statistics.mean(structured):7.1f} ms  "
+          f"(texto idêntico em {same}/{len(images)})")
+    print(f"{'exportações derivadas':<28} média={statistics.mean(exports):7.2f} ms  "
+          f"({', '.join(FORMATS)})")
+    # Sem o resultado estruturado, hOCR, TSV e JSON seriam mais um OCR cada
+    print(f"{'exportações refazendo o OCR':<28} média="
+          f"{statistics.mean(flat) * (len(FORMATS) - 1):7.1f} ms  (estimado)")
+    print(f"\nmemória por captura: OCRResult {statistics.mean(compact) / 1024:6.1f} KiB  "
+          f"x dicionários aninhados {statistics.mean(nested) / 1024:6.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
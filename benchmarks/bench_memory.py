@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Pico de memória (RSS) e tempo do pré-processamento + OCR de capturas 4K e
+# 8K, com a imagem inteira de uma vez (memory_limit_mb = 0) e com o teto de
+# memória (processamento em faixas). Cada medida roda num processo próprio,
+# já com a imagem decodificada e o motor aquecido antes da linha de base.
+#
+#   python3 benchmarks/bench_memory.py [--limit MB] [--sizes 4k 8k] [--lang eng]
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import resource
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIZES = {"1080p": (1920, 1080), "4k": (3840, 2160), "8k": (7680, 4320)}
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def screenshot(size):
+    # Tela cheia de "janelas" com texto, lado a lado
+    from PIL import Image
+    from corpus import generate_corpus
+    canvas = Image.new("RGB", size, (240, 240, 240))
+    samples = [img for img, _ in generate_corpus(40, 7, styles=("light", "dark"))]
+    x = y = row = 0
+    i = 0
+    while y < size[1]:
+        img = samples[i % len(samples)]
+        i += 1
+        if x + img.width > size[0]:
+            x, y, row = 0, y + row + 8, 0
+            continue
+        canvas.paste(img, (x, y))
+        x += img.width + 8
+        row = max(row, img.height)
+    return canvas
+
+
+def run(size_name, limit, lang):
+    from OCRclipboardTranslate import (DEFAULT_CONFIG, CaptureJob, OCRPipeline,
+                                       TranslationClient, import_signal_modules, load_modules)
+    import_signal_modules()
+    load_modules()
+    config = dict(DEFAULT_CONFIG, ocr_lang=lang, memory_limit_mb=limit)
+    results = queue.Queue()
+    pipeline = OCRPipeline(TranslationClient(config), results, None, {}, config)
+    pipeline.engine.warm(lang)
+    img = screenshot(SIZES[size_name])
+    base = rss_mb()
+
+    job = CaptureJob(translate=False)
+    start = time.perf_counter()
+    pipeline.ocr(job, pipeline.preprocess(job, img))
+    elapsed = time.perf_counter() - start
+    pipeline.shutdown()
+    return {"base": base, "peak": rss_mb(), "seconds": elapsed, "chars": len(job.ocr_text)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memória em capturas grandes")
+    parser.add_argument("--sizes", nargs="+", default=["4k", "8k"], choices=sorted(SIZES))
+    parser.add_argument("--limit", type=int, default=1024, help="teto em MB")
+    parser.add_argument("--lang", default="por+eng")
+    parser.add_argument("--run", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run(args.run[0], int(args.run[1]), args.lang)))
+        return
+
+    for size in args.sizes:
+        for label, limit in (("inteira", 0), (f"teto {args.limit} MB", args.limit)):
+            out = subprocess.run([sys.executable, __file__, "--lang", args.lang,
+                                  "--run", size, str(limit)],
+                                 check=True, stdout=subprocess.PIPE, text=True).stdout
+            r = json.loads(out.splitlines()[-1])
+            print(f"{size:<6} {label:<14} pico RSS={r['peak']:7.0f} MB "
+                  f"(+{r['peak'] - r['base']:6.0f} MB sobre a imagem)  "
+                  f"tempo={r['seconds']:6.1f} s  caracteres={r['chars']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Latência por captura: tesseract "frio" (pytesseract, um processo por
+# chamada) contra libtesseract "quente" (tesserocr, modelos já carregados).
+#
+#   python3 benchmarks/bench_ocr_engine.py [--corpus DIR] [--repeat N]
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (OCR_LANG, PytesseractEngine, TesserocrEngine,
+                                   preprocess_image)
+from corpus import generate_corpus, load_corpus
+from common import percentile
+
+
+def run(engine, images, repeat, lang):
+    times = []
+    for _ in range(repeat):
+        for img in images:
+            start = time.perf_counter()
+            engine.image_to_string(img, lang=lang)
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(name, times):
+    print(f"{name:<22} n={len(times):<4} "
+          f"média={statistics.mean(times):8.1f} ms  "
+          f"p50={percentile(times, 50):8.1f} ms  "
+          f"p95={percentile(times, 95):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de OCR")
+    parser.add_argument("--corpus", help="diretório com screenshots de exemplo")
+    parser.add_argument("--count", type=int, default=20,
+                        help="tamanho do corpus sintético")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--lang", default=OCR_LANG)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else generate_corpus(args.count)
+    images = [preprocess_image(img) for img, _ in corpus]
+    print(f"{len(images)} imagens, idioma {args.lang}, {args.repeat} repetições\n")
+
+    try:
+        report("pytesseract (frio)", run(PytesseractEngine(), images, args.repeat, args.lang))
+    except OSError as e:
+        print(f"pytesseract indisponível ({e}); motor frio não medido")
+
+    try:
+        warm = TesserocrEngine()
+    except ImportError:
+        print("tesserocr não instalado; motor quente não medido")
+        return
+    start = time.perf_counter()
+    warm.warm(args.lang)
+    print(f"{'tesserocr (carga)':<22} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    report("tesserocr (quente)", run(warm, images, args.repeat, args.lang))
+    warm.close()
+
+
+if __name__ == "__main__":
+    main()
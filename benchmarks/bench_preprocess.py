@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Tempo por estágio e acurácia do OCR (CER) para cada cadeia de
+# pré-processamento, sobre um corpus com fundo claro, escuro e com gradiente.
+#
+#   python3 benchmarks/bench_preprocess.py [--corpus DIR] [--no-ocr]
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (OCR_LANG, LEGACY_PREPROCESS, image_to_array,
+                                   make_ocr_engine, run_preprocess)
+from PIL import Image
+from corpus import generate_corpus, load_corpus
+from common import char_error_rate
+
+CHAINS = {
+    "original": LEGACY_PREPROCESS,
+    "otsu": ["gray", "invert", "stretch", "otsu"],
+    "otsu+upscale": ["gray", "invert", "stretch", "upscale", "otsu"],
+    "sauvola": ["gray", "invert", "sauvola"],
+    "sauvola+upscale": ["gray", "invert", "upscale", "sauvola"],
+    "completa": ["gray", "invert", "stretch", "deskew", "upscale", "sauvola"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pré-processamento")
+    parser.add_argument("--corpus", help="diretório com screenshots (+ .txt)")
+    parser.add_argument("--count", type=int, default=30)
+    parser.add_argument("--no-ocr", action="store_true",
+                        help="mede só o tempo, sem rodar o Tesseract")
+    parser.add_argument("--engine", default="auto")
+    parser.add_argument("--lang", default=OCR_LANG)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = generate_corpus(args.count, styles=("light", "dark", "gradient"))
+    arrays = [(image_to_array(img), truth) for img, truth in corpus]
+    engine = None if args.no_ocr else make_ocr_engine(args.engine)
+
+    for label, chain in CHAINS.items():
+        timings = {}
+        total = 0.0
+        cers = []
+        for arr, truth in arrays:
+            start = time.perf_counter()
+            out = run_preprocess(arr, chain, timings)
+            total += time.perf_counter() - start
+            if engine is not None and truth is not None:
+                text = engine.image_to_string(Image.fromarray(out), lang=args.lang)
+                cers.append(char_error_rate(truth, text))
+        n = len(arrays)
+        stages = "  ".join(f"{name}={t / n * 1000:.2f}" for name, t in timings.items())
+        cer = f"CER={statistics.mean(cers) * 100:5.1f}%" if cers else "CER=  -  "
+        print(f"{label:<16} {total / n * 1000:7.2f} ms/img  {cer}  [{stages}]")
+
+
+if __name__ == "__main__":
+    main()
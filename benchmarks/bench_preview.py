@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# Prévia da captura: custo da miniatura (reduce + LANCZOS, como antes,
+# contra make_thumbnail, BILINEAR nas reduções grandes) em capturas
+# 1080p/4K/8K; atraso até o pré-processamento começar (e até o texto do
+# OCR) com a miniatura e o hash do histórico no estágio de captura
+# (síncronos, como antes) e na thread da prévia; e o zoom da prévia:
+# primeira vista (blocos gerados), arrasto (blocos reaproveitados) contra
+# redimensionar a captura inteira a cada vista.
+#
+#   python3 benchmarks/bench_preview.py [--runs N] [--lang eng]
+import os
+import sys
+import time
+import queue
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, PREVIEW_SIZE, CaptureJob, HistoryStore,
+                                   OCRPipeline, PreviewTiles, TranslationClient,
+                                   import_signal_modules, load_modules, make_thumbnail)
+from PIL import Image
+from corpus import LINES_BY_LANG, render_sample
+
+SIZES = {"1080p": (1920, 1080), "4K": (3840, 2160), "8K": (7680, 4320)}
+
+
+class ProbePipeline(OCRPipeline):
+    # Anota quando a imagem chega ao pré-processamento
+    def preprocess(self, job, img):
+        job.pre_started = time.perf_counter()
+        return super().preprocess(job, img)
+
+
+class InlineExecutor:
+    # Roda a tarefa na hora, na thread de quem chama (prévia síncrona)
+    def submit(self, func, *args):
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+def make_capture(size, seed):
+    img = Image.new("RGB", size, (236, 236, 236))
+    lines = LINES_BY_LANG["eng"][seed % 5:seed % 5 + 8]
+    img.paste(render_sample(lines, size=18), (120, 90))
+    return img
+
+
+def old_thumbnail(img, size=PREVIEW_SIZE):
+    factor = int(max(img.width / size[0], img.height / size[1]) // 2)
+    thumb = img.reduce(factor) if factor >= 2 else img.copy()
+    thumb.thumbnail(size, Image.LANCZOS)
+    return thumb
+
+
+def timed(func, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def run_capture(pipeline, results, img):
+    # (ms até o pré-processamento, ms até o texto do OCR)
+    job = CaptureJob(translate=False)
+    job.image = img
+    start = time.perf_counter()
+    pipeline.submit(job)
+    while True:
+        kind, other, *payload = results.get(timeout=300)
+        if other is not job:
+            continue
+        if kind == "ocr":
+            elapsed = (time.perf_counter() - start) * 1000
+        elif kind == "metricas":
+            return (job.pre_started - start) * 1000, elapsed
+        elif kind == "erro":
+            raise RuntimeError(f"{payload[0]}: {payload[1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da prévia da captura")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--lang", default="eng")
+    args = parser.parse_args()
+
+    import_signal_modules()
+    load_modules()
+    captures = {name: make_capture(size, 0) for name, size in SIZES.items()}
+
+    print("miniatura (mediana):")
+    for name, img in captures.items():
+        old = timed(lambda: old_thumbnail(img), args.runs)
+        new = timed(lambda: make_thumbnail(img), args.runs)
+        print(f"  {name:<6} reduce + LANCZOS={old:6.1f} ms  make_thumbnail={new:6.1f} ms")
+
+    # Com histórico: miniatura + hash da imagem inteira a cada captura
+    print("\ncom histórico, até o pré-processamento / até o texto do OCR (mediana):")
+    config = dict(DEFAULT_CONFIG, ocr_lang=args.lang, metrics_export="",
+                  stream_min_height=100000)
+    with tempfile.TemporaryDirectory() as directory:
+        results = queue.Queue()
+        history = HistoryStore(os.path.join(directory, "history.sqlite3"))
+        pipeline = ProbePipeline(TranslationClient(config), results, None, {}, config, history)
+        background = pipeline.preview_executor
+        try:
+            run_capture(pipeline, results, captures["1080p"])
+            for name, size in SIZES.items():
+                # Imagens novas a cada rodada: o cache de OCR não entra
+                seeds = iter(range(1, 2 * args.runs + 1))
+                row = []
+                for executor in (InlineExecutor(), background):
+                    pipeline.preview_executor = executor
+                    runs = [run_capture(pipeline, results, make_capture(size, next(seeds)))
+                            for _ in range(args.runs)]
+                    row.append(tuple(statistics.median(r[i] for r in runs) for i in (0, 1)))
+                (pre_inline, ocr_inline), (pre_bg, ocr_bg) = row
+                print(f"  {name:<6} no estágio de captura={pre_inline:6.1f} /{ocr_inline:7.1f} ms"
+                      f"  na thread da prévia={pre_bg:6.1f} /{ocr_bg:7.1f} ms")
+        finally:
+            pipeline.preview_executor = background
+            pipeline.shutdown()
+
+    print("\nzoom da prévia, vista 500x200 (mediana):")
+    for name, img in captures.items():
+        fit = make_thumbnail(img)
+        scale = round(fit.width / img.width * 4, 4)
+        width, height = round(img.width * scale), round(img.height * scale)
+        x0, y0 = width // 3, height // 3
+
+        def whole():
+            img.resize((width, height), Image.BILINEAR, reducing_gap=2.0).crop(
+                (x0, y0, x0 + fit.width, y0 + fit.height))
+
+        def first():
+            PreviewTiles(img).render((scale, x0, y0), fit.size)
+
+        tiles = PreviewTiles(img)
+        tiles.render((scale, x0, y0), fit.size)
+        steps = iter(range(10 ** 6))
+
+        def drag():
+            # Arrasto de 20 px por evento, como o mouse entrega
+            step = next(steps) % 20
+            tiles.render((scale, x0 + 20 * step, y0), fit.size)
+
+        print(f"  {name:<6} captura inteira={timed(whole, args.runs):7.1f} ms  "
+              f"blocos (1ª vista)={timed(first, args.runs):6.1f} ms  "
+              f"arrasto={timed(drag, 20):5.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Tempo do início do processo até o primeiro desenho da janela (precisa de
+# um display; use xvfb-run em máquinas sem X). Sem display, mede só o
+# import do módulo, com e sem os módulos pesados carregados de cara. Mede
+# também o cliente `capture` repassando o comando a uma instância residente.
+#
+#   python3 benchmarks/bench_startup.py [--runs N] [--command "dist/ocrclipboardtranslate/ocrclipboardtranslate"]
+import os
+import sys
+import time
+import shlex
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "OCRclipboardTranslate.py")
+sys.path.insert(0, ROOT)
+
+from OCRclipboardTranslate import InstanceServer  # noqa: E402
+
+
+def first_frame(command, timeout=60):
+    start = time.perf_counter()
+    proc = subprocess.Popen(command + ["--startup-probe"], stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True)
+    try:
+        for line in proc.stdout:
+            if line.strip() == "first-frame":
+                return (time.perf_counter() - start) * 1000
+    finally:
+        proc.wait(timeout)
+    raise RuntimeError("a janela não sinalizou o primeiro desenho")
+
+
+def import_time(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
+    return (time.perf_counter() - start) * 1000
+
+
+def trigger_times(command, runs):
+    # Instância "residente" só com o socket (sem janela), num runtime dir
+    # temporário para não falar com uma instância real do usuário
+    with tempfile.TemporaryDirectory() as runtime:
+        env = dict(os.environ, XDG_RUNTIME_DIR=runtime)
+        server = InstanceServer(os.path.join(runtime, f"ocrclipboardtranslate-{os.getuid()}.sock"))
+        server.claim()
+        times = []
+        try:
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(command + ["capture"], check=True, env=env, cwd=ROOT)
+                times.append((time.perf_counter() - start) * 1000)
+                server.commands.get(timeout=5)
+        finally:
+            server.close()
+    return times
+
+
+def report(label, times):
+    print(f"{label:<40} mediana={statistics.median(times):7.1f} ms  "
+          f"mín={min(times):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--command", help="executável a medir (padrão: o script)")
+    args = parser.parse_args()
+
+    command = shlex.split(args.command) if args.command else [sys.executable, SCRIPT]
+    report("cliente capture → instância residente", trigger_times(command, args.runs))
+    if not args.command:
+        # Rodado como script, o arquivo inteiro é compilado a cada execução;
+        # com -m (ou no pacote do PyInstaller) o bytecode já vem pronto
+        report("  idem, python3 -m (bytecode em cache)",
+               trigger_times([sys.executable, "-m", "OCRclipboardTranslate"], args.runs))
+    if os.environ.get("DISPLAY"):
+        report("início → primeiro desenho", [first_frame(command) for _ in range(args.runs)])
+        return
+
+    print("Sem DISPLAY: medindo só o tempo de import\n")
+    report("import (módulos pesados lazy)",
+           [import_time("import OCRclipboardTranslate") for _ in range(args.runs)])
+    report("import + numpy/PIL/pytesseract",
+           [import_time("import OCRclipboardTranslate, numpy, PIL.Image, PIL.ImageTk, "
+                        "pytesseract") for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Vários idiomas de destino: capturas do corpus passam pelo OCRPipeline com
+# o tradutor stub, traduzindo para um destino, para três em sequência
+# (target_executor com um worker) e para três em paralelo. Depois mede a
+# troca de destino de uma captura já feita: captura refeita do zero (pré +
+# OCR + tradução) contra retranslate(), que reaproveita o texto do OCR.
+#
+#   python3 benchmarks/bench_targets.py [--count N] [--targets pt,en,es] [--latency MS]
+import os
+import sys
+import time
+import queue
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, CaptureJob, OCRPipeline, TranslationClient,
+                                   import_signal_modules, load_modules, parse_langs)
+from corpus import generate_varied_corpus
+from common import percentile
+from stub_server import start_stub_server
+
+
+def wait_translation(results, job):
+    # Até a tradução de `job` chegar; devolve (texto OCR, tradução)
+    ocr = None
+    while True:
+        kind, other, *payload = results.get(timeout=300)
+        if other is not job:
+            continue
+        if kind == "ocr":
+            ocr = payload[0]
+        elif kind == "traducao":
+            return ocr, payload[0]
+        elif kind == "erro":
+            raise RuntimeError(f"{payload[0]}: {payload[1]}")
+
+
+def capture(pipeline, results, img, targets):
+    job = CaptureJob()
+    job.targets = targets
+    start = time.perf_counter()
+    pipeline.submit_image(job, img)
+    wait_translation(results, job)
+    return job, (time.perf_counter() - start) * 1000
+
+
+def report(label, times):
+    print(f"{label:<30} média={statistics.mean(times):7.1f} ms  "
+          f"p95={percentile(times, 95):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vários idiomas de destino")
+    parser.add_argument("--count", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--targets", default="pt,en,es")
+    parser.add_argument("--latency", type=float, default=80, help="ms por requisição")
+    parser.add_argument("--lang", default=DEFAULT_CONFIG["ocr_lang"])
+    args = parser.parse_args()
+    targets = parse_langs(args.targets)
+
+    import_signal_modules()
+    load_modules()
+    server, url = start_stub_server(latency=args.latency / 1000)
+    config = dict(DEFAULT_CONFIG, translation_backend="libretranslate", translation_url=url,
+                  metrics_export="", ocr_lang=args.lang)
+    results = queue.Queue()
+    # Sem cache: cada captura vai ao OCR e ao tradutor
+    pipeline = OCRPipeline(TranslationClient(config), results, None, {}, config)
+    corpus = [img for img, _, _ in generate_varied_corpus(args.count, args.seed)]
+    try:
+        capture(pipeline, results, corpus[0], targets)
+        print(f"{len(corpus)} capturas, destinos {', '.join(targets)}, "
+              f"{args.latency:g} ms por requisição\n")
+        report(f"1 destino ({targets[0]})",
+               [capture(pipeline, results, img, targets[:1])[1] for img in corpus])
+
+        concurrent = pipeline.target_executor
+        pipeline.target_executor = ThreadPoolExecutor(max_workers=1)
+        report(f"{len(targets)} destinos em sequência",
+               [capture(pipeline, results, img, targets)[1] for img in corpus])
+        pipeline.target_executor.shutdown()
+        pipeline.target_executor = concurrent
+        report(f"{len(targets)} destinos em paralelo",
+               [capture(pipeline, results, img, targets)[1] for img in corpus])
+
+        # Troca do destino depois da captura: o primeiro destino vira o último
+        print()
+        rotated = targets[1:] + targets[:1]
+        jobs = [capture(pipeline, results, img, targets[:1])[0] for img in corpus]
+        report("troca refazendo a captura",
+               [capture(pipeline, results, img, rotated[:1])[1] for img in corpus])
+        times = []
+        for job in jobs:
+            start = time.perf_counter()
+            wait_translation(results, pipeline.retranslate(job, rotated[:1]))
+            times.append((time.perf_counter() - start) * 1000)
+        report("troca com retranslate()", times)
+    finally:
+        pipeline.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
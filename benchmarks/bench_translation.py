@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Latência de tradução contra o servidor stub (latência de rede simulada):
+# fluxo antigo (detect + translate, conexão nova a cada chamada) contra o
+# cliente atual (uma chamada com todos os parágrafos, conexão reaproveitada).
+#
+#   python3 benchmarks/bench_translation.py [--latency MS] [--runs N]
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import DEFAULT_CONFIG, TranslationClient, translate_text
+from corpus import SAMPLE_LINES
+from stub_server import detect
+from stub_server import start_stub_server
+
+
+def old_flow(url, text):
+    # Como o select_area_ocr original: detecta e depois traduz o bloco
+    def post(path, payload):
+        req = urllib.request.Request(url + path, json.dumps(payload).encode(),
+                                     {"Content-Type": "application/json"})
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read())
+    lang = post("/detect", {"q": text})[0][0]["language"]
+    if lang != "pt":
+        return post("/translate", {"q": text, "source": "auto", "target": "pt"})
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da tradução")
+    parser.add_argument("--latency", type=float, default=50, help="ms por requisição")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    server, url = start_stub_server(latency=args.latency / 1000)
+    english = [line for line in SAMPLE_LINES if detect(line) == "en"]
+    texts = ["\n\n".join(english[i % 2:i % 2 + 3]) for i in range(args.runs)]
+    client = TranslationClient(dict(DEFAULT_CONFIG, translation_backend="libretranslate",
+                                    translation_url=url))
+
+    for label, func in (("detect + translate", lambda t: old_flow(url, t)),
+                        ("cliente em lote", lambda t: translate_text(client, t))):
+        times = []
+        for text in texts:
+            start = time.perf_counter()
+            func(text)
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"{label:<20} média={statistics.mean(times):7.1f} ms  máx={max(times):7.1f} ms")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# Memória de tradução: telas sucessivas do mesmo documento (janela de
+# linhas que rola aos poucos, com ruído de OCR em parte das linhas) vão para
+# o tradutor stub, sem memória (texto inteiro a cada tela) e com a memória
+# (só as frases inéditas). A rolagem é um passeio aleatório: às vezes
+# avança, às vezes volta ou recaptura a mesma tela. Conta requisições e
+# caracteres enviados, mede a latência por tela (o stub cobra por
+# requisição e por caractere) e confere se alguma frase reaproveitada veio
+# de outra (ex. o mesmo texto com outro número).
+#
+#   python3 benchmarks/bench_translation_memory.py [--lines N] [--window N] [--step N]
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, NUMBER, TranslationClient, TranslationMemory,
+                                   fuzzy_form, similarity, translate_text)
+from corpus import LINES_BY_LANG
+from stub_server import start_stub_server
+
+# Trocas típicas do OCR
+CONFUSIONS = [("o", "0"), ("l", "1"), ("I", "l"), ("rn", "m"), ("e", "c"), (".", "")]
+
+
+def make_document(count, rng):
+    # Frases em inglês; algumas só diferem no número, como linhas de log
+    words = sorted({w.strip(".,:?()").lower() for line in LINES_BY_LANG["eng"]
+                    for w in line.split() if w.isalpha()})
+    lines = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            lines.append(f"Free disk space: {rng.randint(1, 40)} GB of 256 GB.")
+        else:
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(5, 11)))
+            lines.append(sentence.capitalize() + ".")
+    return lines
+
+
+def add_noise(line, rng, rate):
+    if rng.random() >= rate:
+        return line
+    old, new = rng.choice([c for c in CONFUSIONS if c[0] in line] or [(".", "")])
+    i = line.find(old, rng.randrange(len(line)))
+    if i < 0:
+        i = line.find(old)
+    return line[:i] + new + line[i + len(old):]
+
+
+class CountingBackend:
+    # Embrulha o backend para contar requisições e caracteres enviados
+    def __init__(self, backend):
+        self.backend = backend
+        self.requests = 0
+        self.chars = 0
+
+    def translate(self, texts, dest, src="auto"):
+        self.requests += 1
+        self.chars += sum(len(t) for t in texts)
+        return self.backend.translate(texts, dest, src)
+
+    def close(self):
+        self.backend.close()
+
+
+def wrong_reuses(screen_lines, translation):
+    # Linhas traduzidas (o stub devolve "[pt] " + original) cujo original
+    # não é a linha da tela: número diferente ou texto distante
+    wrong = 0
+    for truth, out in zip(screen_lines, translation.split("\n")):
+        source = out.removeprefix("[pt] ")
+        if (NUMBER.findall(source) != NUMBER.findall(truth)
+                or similarity(fuzzy_form(source), fuzzy_form(truth)) < 0.8):
+            wrong += 1
+    return wrong
+
+
+def run(label, client, screens):
+    client._backend = CountingBackend(client.backend)
+    times, wrong = [], 0
+    for clean, noisy in screens:
+        start = time.perf_counter()
+        translation = translate_text(client, "\n".join(noisy), src="en")
+        times.append((time.perf_counter() - start) * 1000)
+        wrong += wrong_reuses(clean, translation)
+    backend = client._backend
+    print(f"{label:<14} requisições={backend.requests:<4} caracteres={backend.chars:<6} "
+          f"média={statistics.mean(times):6.1f} ms/tela  máx={max(times):6.1f} ms  "
+          f"linhas trocadas={wrong}")
+    if client.memory is not None:
+        print(f"{'':<14} memória: {client.memory.stats()}")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da memória de tradução")
+    parser.add_argument("--lines", type=int, default=120, help="linhas do documento")
+    parser.add_argument("--window", type=int, default=12, help="linhas por tela")
+    parser.add_argument("--step", type=int, default=3, help="linhas roladas por tela")
+    parser.add_argument("--noise", type=float, default=0.3,
+                        help="fração das linhas com um erro de OCR a cada tela")
+    parser.add_argument("--latency", type=float, default=80, help="ms por requisição")
+    parser.add_argument("--char-latency", type=float, default=0.1,
+                        help="ms por caractere traduzido")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    document = make_document(args.lines, rng)
+    screens = []
+    top = 0
+    while top <= args.lines - args.window:
+        clean = document[top:top + args.window]
+        screens.append((clean, [add_noise(line, rng, args.noise) for line in clean]))
+        top = max(0, top + rng.choice([args.step, args.step, 0, -args.step]))
+
+    server, url = start_stub_server(latency=args.latency / 1000,
+                                    char_latency=args.char_latency / 1000)
+    config = dict(DEFAULT_CONFIG, translation_backend="libretranslate", translation_url=url)
+    print(f"{len(screens)} telas de {args.window} linhas, rolando até {args.step} por vez, "
+          f"{args.noise:.0%} das linhas com ruído\n")
+    run("sem memória", TranslationClient(config), screens)
+    with tempfile.TemporaryDirectory() as directory:
+        memory = TranslationMemory(os.path.join(directory, "memory.sqlite3"),
+                                   min_similarity=config["translation_memory_similarity"])
+        run("com memória", TranslationClient(config, memory=memory), screens)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Modo observar área: CPU gasta e chamadas ao OCR por tick, refazendo o OCR
+# do quadro inteiro a cada tick (ingênuo) contra o RegionWatcher (diff do
+# quadro + blocos comparados por hash perceptual). Os quadros simulam
+# legendas: um título fixo e duas linhas que trocam a cada --hold ticks,
+# sobre um fundo com ruído leve de vídeo.
+#
+#   python3 benchmarks/bench_watch.py [--ticks N] [--hold N] [--lang eng]
+import os
+import sys
+import time
+import queue
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, OCR_LANG, CaptureJob, OCRPipeline,
+                                   RegionWatcher, TranslationClient, import_signal_modules,
+                                   load_modules, preprocess_image)
+from PIL import Image, ImageDraw
+from corpus import LINES_BY_LANG, load_font
+
+SIZE = (900, 260)
+TITLE = "Episódio 3 — legendas automáticas"
+
+
+def make_frames(ticks, hold, seed=0):
+    rng = random.Random(seed)
+    font = load_font(28)
+    lines = LINES_BY_LANG["eng"] + LINES_BY_LANG["por"]
+    frames = []
+    for tick in range(ticks):
+        if tick % hold == 0:
+            subtitle = rng.sample(lines, 2)
+        img = Image.new("RGB", SIZE, (20, 24, 30))
+        # Ruído leve, como compressão de vídeo: muda a cada quadro
+        noise = Image.effect_noise(SIZE, 6).convert("RGB")
+        img = Image.blend(img, noise, 0.08)
+        draw = ImageDraw.Draw(img)
+        draw.text((20, 20), TITLE, font=font, fill=(200, 200, 120))
+        for i, line in enumerate(subtitle):
+            draw.text((20, 140 + i * 50), line, font=font, fill=(240, 240, 240))
+        frames.append(img)
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do modo observar área")
+    parser.add_argument("--ticks", type=int, default=60)
+    parser.add_argument("--hold", type=int, default=5,
+                        help="ticks que cada legenda fica na tela")
+    parser.add_argument("--lang", default=OCR_LANG)
+    args = parser.parse_args()
+
+    import_signal_modules()
+    load_modules()
+    config = dict(DEFAULT_CONFIG, ocr_lang=args.lang)
+    pipeline = OCRPipeline(TranslationClient(config), queue.Queue(), None, {}, config)
+    frames = make_frames(args.ticks, args.hold)
+    pipeline.engine.warm(args.lang)
+
+    start_cpu, start = time.process_time(), time.perf_counter()
+    for img in frames:
+        pipeline.engine.image_to_string(preprocess_image(img, config["preprocess"]),
+                                        lang=args.lang)
+    naive = (time.process_time() - start_cpu, time.perf_counter() - start, len(frames))
+
+    it = iter(frames)
+    watcher = RegionWatcher(pipeline, CaptureJob(translate=False), None, config,
+                            grab=lambda bbox: next(it))
+    start_cpu, start = time.process_time(), time.perf_counter()
+    changed = sum(watcher.tick() for _ in frames)
+    watched = (time.process_time() - start_cpu, time.perf_counter() - start,
+               watcher.ocr_calls)
+    pipeline.shutdown()
+
+    print(f"{args.ticks} ticks, legenda nova a cada {args.hold} "
+          f"({args.ticks // args.hold} trocas); {changed} quadros contados como mudados\n")
+    for label, (cpu, wall, calls) in (("OCR a cada tick", naive),
+                                      ("RegionWatcher", watched)):
+        print(f"{label:<18} CPU={cpu / args.ticks * 1000:7.1f} ms/tick  "
+              f"tempo={wall / args.ticks * 1000:7.1f} ms/tick  chamadas OCR={calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# Utilitários comuns aos benchmarks
+def percentile(values, pct):
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def edit_distance(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def char_error_rate(truth, text):
+    # CER sobre o texto com espaços normalizados
+    truth = " ".join(truth.split())
+    text = " ".join(text.split())
+    if not truth:
+        return 0.0 if not text else 1.0
+    return edit_distance(truth, text) / len(truth)
@@ -0,0 +1,152 @@
+# Corpus fixo de "screenshots" sintéticas para os benchmarks
+import os
+import random
+from PIL import Image, ImageDraw, ImageFont
+
+SAMPLE_LINES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Configurações salvas com sucesso.",
+    "Error: connection refused (port 8080)",
+    "Não foi possível abrir o arquivo solicitado.",
+    "Click OK to continue or Cancel to abort.",
+    "A tradução automática pode conter erros.",
+    "Downloading updates, please wait...",
+    "Versão 2.4.1 — todos os direitos reservados",
+]
+
+# Linhas por idioma para o corpus variado (as de SAMPLE_LINES e mais algumas)
+LINES_BY_LANG = {
+    "eng": SAMPLE_LINES[0::2] + [
+        "Your session has expired. Please sign in again.",
+        "Free disk space: 12.4 GB of 256 GB",
+        "Are you sure you want to delete 3 items?",
+        "Settings > Privacy > Location Services",
+    ],
+    "por": SAMPLE_LINES[1::2] + [
+        "Sua sessão expirou. Entre novamente.",
+        "Espaço livre em disco: 12,4 GB de 256 GB",
+        "Deseja mesmo excluir 3 itens?",
+        "Preferências > Privacidade > Localização",
+    ],
+}
+
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
+]
+
+FONT_FAMILIES = {
+    "sans": FONT_CANDIDATES,
+    "serif": [
+        "/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeSerif.ttf",
+    ],
+    "mono": [
+        "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationMono-Regular.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeMono.ttf",
+    ],
+    "bold": [
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf",
+    ],
+}
+
+
+def available_families():
+    # Famílias com pelo menos uma fonte instalada
+    return [family for family, paths in FONT_FAMILIES.items()
+            if any(os.path.exists(p) for p in paths)]
+
+
+def load_font(size, family="sans"):
+    for path in FONT_FAMILIES[family]:
+        if os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size=size)
+
+
+# Estilos: (cor do texto, fundo); "gradient" simula sombra/iluminação irregular
+STYLES = {
+    "light": ("black", "white"),
+    "dark": ((230, 230, 230), (30, 30, 36)),
+    "gradient": ((40, 40, 40), "gradient"),
+}
+
+
+def gradient_background(width, height, start=255, end=110):
+    ramp = Image.linear_gradient("L").rotate(90).resize((width, height))
+    ramp = ramp.point(lambda v: start + (end - start) * v // 255)
+    return Image.merge("RGB", (ramp, ramp, ramp))
+
+
+def render_sample(lines, size=18, fg="black", bg="white", padding=12, family="sans"):
+    font = load_font(size, family)
+    line_h = int(size * 1.4)
+    width = max(int(font.getlength(line)) for line in lines) + 2 * padding
+    height = line_h * len(lines) + 2 * padding
+    if bg == "gradient":
+        img = gradient_background(width, height)
+    else:
+        img = Image.new("RGB", (width, height), bg)
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(lines):
+        draw.text((padding, padding + i * line_h), line, font=font, fill=fg)
+    return img
+
+
+def generate_corpus(count=20, seed=0, styles=("light",)):
+    # Lista de (imagem, texto esperado), sempre igual para a mesma seed
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        lines = rng.sample(SAMPLE_LINES, rng.randint(1, 4))
+        size = rng.choice([12, 14, 18, 24])
+        fg, bg = STYLES[rng.choice(styles)]
+        corpus.append((render_sample(lines, size=size, fg=fg, bg=bg), "\n".join(lines)))
+    return corpus
+
+
+def generate_varied_corpus(count=40, seed=0, styles=tuple(STYLES),
+                           langs=("por", "eng", "mix"), sizes=(11, 12, 14, 18, 24, 32),
+                           max_lines=5):
+    # Como generate_corpus, variando também fonte e idioma ("mix" = linhas
+    # em português e inglês na mesma imagem). Devolve (imagem, texto, meta)
+    rng = random.Random(seed)
+    families = available_families() or ["sans"]
+    corpus = []
+    for _ in range(count):
+        lang = rng.choice(langs)
+        n = rng.randint(1, max_lines)
+        if lang == "mix":
+            pool = LINES_BY_LANG["por"] + LINES_BY_LANG["eng"]
+        else:
+            pool = LINES_BY_LANG[lang]
+        lines = rng.sample(pool, min(n, len(pool)))
+        meta = {"lang": lang, "style": rng.choice(styles),
+                "family": rng.choice(families), "size": rng.choice(sizes)}
+        fg, bg = STYLES[meta["style"]]
+        img = render_sample(lines, size=meta["size"], fg=fg, bg=bg, family=meta["family"])
+        corpus.append((img, "\n".join(lines), meta))
+    return corpus
+
+
+def load_corpus(directory):
+    # Imagens de um diretório; o texto esperado vem do .txt de mesmo nome
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        base, ext = os.path.splitext(name)
+        if ext.lower() not in (".png", ".jpg", ".jpeg", ".bmp"):
+            continue
+        img = Image.open(os.path.join(directory, name))
+        img.load()
+        truth = None
+        txt = os.path.join(directory, base + ".txt")
+        if os.path.exists(txt):
+            with open(txt, encoding="utf-8") as f:
+                truth = f.read()
+        corpus.append((img, truth))
+    return corpus
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Servidor de tradução falso com a API do LibreTranslate (/translate e
+# /detect), para benchmarks sem rede. "Traduz" prefixando o idioma de
+# destino e detecta português por acentos/palavras comuns. A latência de
+# rede é simulada com --latency.
+#
+# --char-latency soma um custo por caractere traduzido, como num tradutor real.
+#
+#   python3 benchmarks/stub_server.py --port 5000 --latency 80
+import re
+import json
+import time
+import socket
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PT_HINTS = re.compile(r"[ãõçáéíóúâêô]|\b(não|você|para|com|uma|são|está)\b", re.I)
+
+
+def detect(text):
+    return "pt" if PT_HINTS.search(text) else "en"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    char_latency = 0.0
+
+    def setup(self):
+        super().setup()
+        # Cabeçalho e corpo saem em escritas separadas: sem isso o Nagle
+        # soma ~40 ms por resposta numa conexão keep-alive
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def reply(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        texts = data.get("q", "")
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        time.sleep(self.latency + self.char_latency * sum(len(t) for t in texts))
+        langs = [{"language": detect(t), "confidence": 90} for t in texts]
+        if self.path.endswith("/detect"):
+            self.reply([[lang] for lang in langs])
+            return
+        target = data.get("target", "pt")
+        translated = [t if lang["language"] == target else f"[{target}] {t}"
+                      for t, lang in zip(texts, langs)]
+        if single:
+            self.reply({"translatedText": translated[0], "detectedLanguage": langs[0]})
+        else:
+            self.reply({"translatedText": translated, "detectedLanguage": langs})
+
+
+def start_stub_server(port=0, latency=0.0, char_latency=0.0):
+    # Sobe o servidor numa thread; devolve (servidor, url)
+    handler = type("Handler", (StubHandler,), {"latency": latency,
+                                               "char_latency": char_latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de tradução stub")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0, help="ms por requisição")
+    parser.add_argument("--char-latency", type=float, default=0.0,
+                        help="ms por caractere traduzido")
+    args = parser.parse_args()
+    server, url = start_stub_server(args.port, args.latency / 1000, args.char_latency / 1000)
+    print(f"Servidor stub em {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
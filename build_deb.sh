@@ -10,6 +10,15 @@ VERSION="1.0"
 ARCH="amd64"
 MAINTAINER="Marcos Carvalho <marcosabcarvalho@yahoo.com>"
 DEPENDS="gnome-screenshot, xclip, tesseract-ocr, tesseract-ocr-por"
+# onedir (padrão): abre mais rápido, sem descompactar tudo a cada execução
+# onefile: um único binário em /usr/bin
+BUNDLE="${BUNDLE:-onedir}"
+
+# Módulos importados só de forma lazy (o PyInstaller não os enxerga)
+HIDDEN_IMPORTS=(PIL._tkinter_finder PIL.Image PIL.ImageTk numpy)
+# Módulos que podem ser puxados por dependências mas não são usados
+EXCLUDES=(pandas matplotlib scipy IPython jedi pytest setuptools pydoc_data
+          lib2to3 tkinter.test xmlrpc curses)
 
 # --------------------------------------------------
 # Limpa builds anteriores
@@ -30,17 +39,18 @@ sudo apt-get install -y \
 # 2) Instala PyInstaller e libs Python no virtualenv
 # --------------------------------------------------
 python3 -m pip install --upgrade \
-  pyinstaller pillow pytesseract ttkthemes googletrans==4.0.0-rc1
+  pyinstaller pillow numpy pytesseract ttkthemes googletrans==4.0.0-rc1
 
 # --------------------------------------------------
 # 3) Gera executável com PyInstaller
 # --------------------------------------------------
-echo "→ Gerando executável com PyInstaller..."
+echo "→ Gerando executável com PyInstaller (${BUNDLE})..."
+# Sem UPX: descomprimir as bibliotecas atrasa cada abertura
+PYI_ARGS=(--"${BUNDLE}" --windowed --noupx)
+for mod in "${HIDDEN_IMPORTS[@]}"; do PYI_ARGS+=(--hidden-import="${mod}"); done
+for mod in "${EXCLUDES[@]}"; do PYI_ARGS+=(--exclude-module="${mod}"); done
 python3 -m PyInstaller \
-  --onefile \
-  --windowed \
-  --hidden-import=PIL._tkinter_finder \
-  --hidden-import=PIL.ImageTk \
+  "${PYI_ARGS[@]}" \
   "${PY_SCRIPT}" \
   --name "${PACKAGE}"
 
@@ -50,13 +60,21 @@ python3 -m PyInstaller \
 WORKDIR="build/${PACKAGE}-${VERSION}"
 DEBIAN_DIR="${WORKDIR}/DEBIAN"
 BIN_DIR="${WORKDIR}/usr/bin"
+LIB_DIR="${WORKDIR}/usr/lib/${PACKAGE}"
 APPS_DIR="${WORKDIR}/usr/share/applications"
 ICON_DIR="${WORKDIR}/usr/share/icons/hicolor/128x128/apps"
 
 mkdir -p "${DEBIAN_DIR}" "${BIN_DIR}" "${APPS_DIR}" "${ICON_DIR}"
 
-# Copia o binário para /usr/bin
-install -m755 "dist/${PACKAGE}" "${BIN_DIR}/${PACKAGE}"
+if [ "${BUNDLE}" = "onedir" ]; then
+  # Diretório em /usr/lib e link em /usr/bin
+  mkdir -p "${LIB_DIR}"
+  cp -a "dist/${PACKAGE}/." "${LIB_DIR}/"
+  ln -sf "/usr/lib/${PACKAGE}/${PACKAGE}" "${BIN_DIR}/${PACKAGE}"
+else
+  # Copia o binário para /usr/bin
+  install -m755 "dist/${PACKAGE}" "${BIN_DIR}/${PACKAGE}"
+fi
 
 # --------------------------------------------------
 # 5) Cria DEBIAN/control
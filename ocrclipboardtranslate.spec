@@ -6,11 +6,12 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['PIL._tkinter_finder', 'PIL.ImageTk'],
+    hiddenimports=['PIL._tkinter_finder', 'PIL.Image', 'PIL.ImageTk', 'numpy'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['pandas', 'matplotlib', 'scipy', 'IPython', 'jedi', 'pytest',
+              'setuptools', 'pydoc_data', 'lib2to3', 'tkinter.test', 'xmlrpc', 'curses'],
     noarchive=False,
     optimize=0,
 )
@@ -26,7 +27,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
@@ -0,0 +1,58 @@
+# Espera pelo arquivo da captura com um processo no lugar do
+# gnome-screenshot (com e sem inotify)
+#
+#   python3 -m pytest tests
+import os
+import sys
+import time
+import tempfile
+import unittest
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import CaptureCancelled, open_watch, wait_for_capture
+
+
+class WaitForCaptureTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "ocr_area.png")
+
+    def run_tool(self, code, use_watch):
+        # Tempo (s) até wait_for_capture voltar, com prazo de 10 s
+        watch = open_watch(os.path.dirname(self.path)) if use_watch else None
+        proc = subprocess.Popen([sys.executable, "-c", code, self.path])
+        start = time.monotonic()
+        try:
+            wait_for_capture(self.path, None, 10, watch, proc=proc)
+            return time.monotonic() - start
+        finally:
+            proc.wait()
+            if watch is not None:
+                watch.close()
+
+    def test_written(self):
+        code = "import sys, time; time.sleep(0.2); open(sys.argv[1], 'wb').write(b'png')"
+        for use_watch in (True, False):
+            with self.subTest(inotify=use_watch):
+                self.run_tool(code, use_watch)
+                os.remove(self.path)
+
+    def test_cancelled_selection(self):
+        # Sai sem gravar: falha ao fim do processo, não no prazo
+        for use_watch in (True, False):
+            with self.subTest(inotify=use_watch):
+                start = time.monotonic()
+                with self.assertRaises(CaptureCancelled):
+                    self.run_tool("import time; time.sleep(0.2)", use_watch)
+                self.assertLess(time.monotonic() - start, 2)
+
+    def test_tool_failed(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            self.run_tool("raise SystemExit(1)", True)
+
+
+if __name__ == "__main__":
+    unittest.main()
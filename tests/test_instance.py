@@ -0,0 +1,40 @@
+# Instância única: servidor no socket Unix e cliente send_command()
+#
+#   python3 -m pytest tests
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import InstanceServer, send_command
+
+
+class InstanceServerTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "instancia.sock")
+
+    def test_second_claim_forwards(self):
+        server = InstanceServer(self.path)
+        self.assertTrue(server.claim())
+        self.addCleanup(server.close)
+        self.assertFalse(InstanceServer(self.path).claim())
+        self.assertIsNotNone(send_command("capture", self.path))
+        self.assertEqual(server.commands.get(timeout=5), "capture")
+
+    def test_no_instance(self):
+        self.assertIsNone(send_command("capture", self.path))
+
+    def test_unusable_directory(self):
+        # main() avisa e abre sem o socket
+        server = InstanceServer(os.path.join(self.path, "sem-diretorio", "instancia.sock"))
+        with self.assertRaises(OSError):
+            server.claim()
+        self.assertIsNone(server.sock)
+
+
+if __name__ == "__main__":
+    unittest.main()
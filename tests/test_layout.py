@@ -0,0 +1,73 @@
+# Classificação do layout da captura e detecção do idioma do texto
+#
+#   python3 -m pytest tests
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import LanguageDetector, classify_layout, np
+
+
+def page(*rects, size=(300, 400)):
+    # Fundo branco com retângulos pretos (top, left, bottom, right) no
+    # lugar das palavras
+    arr = np.full((size[1], size[0]), 255, dtype=np.uint8)
+    for top, left, bottom, right in rects:
+        arr[top:bottom, left:right] = 0
+    return arr
+
+
+def lines(tops, left=10, right=120, height=20):
+    return [(top, left, top + height, right) for top in tops]
+
+
+class ClassifyLayoutTest(unittest.TestCase):
+    def test_blank(self):
+        self.assertEqual(classify_layout(page()), ("pagina", 0.0, []))
+
+    def test_single_word_and_line(self):
+        letters = [(10, x, 30, x + 8) for x in range(10, 60, 10)]
+        self.assertEqual(classify_layout(page(*letters))[0], "palavra")
+        words = [(10, 10, 30, 60), (10, 70, 30, 120)]
+        self.assertEqual(classify_layout(page(*words))[:2], ("linha", 20.0))
+
+    def test_block_and_sparse(self):
+        self.assertEqual(classify_layout(page(*lines(range(10, 160, 30))))[0], "bloco")
+        self.assertEqual(classify_layout(page(*lines([10, 40, 200])))[0], "esparso")
+
+    def test_columns(self):
+        layout, line_h, cuts = classify_layout(
+            page(*lines(range(10, 160, 30), 10, 100), *lines(range(10, 160, 30), 200, 290)))
+        self.assertEqual((layout, line_h), ("colunas", 20.0))
+        self.assertEqual(cuts, [150])
+
+    def test_mixed_heights(self):
+        rects = lines([10], height=80) + lines([120, 150], height=20)
+        self.assertEqual(classify_layout(page(*rects))[0], "pagina")
+
+    def test_ignores_specks(self):
+        self.assertEqual(classify_layout(page((5, 5, 7, 7)))[0], "pagina")
+
+
+class LanguageDetectorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.detector = LanguageDetector()
+
+    def test_detects(self):
+        self.assertEqual(self.detector.detect(
+            "Não foi possível salvar o arquivo porque a pasta está protegida"
+            " contra gravação."), "pt")
+        self.assertEqual(self.detector.detect(
+            "The quick brown fox jumps over the lazy dog while the farmer"
+            " watches from the window."), "en")
+
+    def test_too_short(self):
+        self.assertIsNone(self.detector.detect("OK"))
+        self.assertIsNone(self.detector.detect("   123 --- 45   "))
+
+
+if __name__ == "__main__":
+    unittest.main()
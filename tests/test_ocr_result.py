@@ -0,0 +1,106 @@
+# OCRResult: estrutura (blocos, linhas, palavras), junção de partes,
+# caixas e exportações, sem Tesseract
+#
+#   python3 -m pytest tests
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import OCRResult, export_ocr
+
+SIZE = (300, 200)
+
+
+def sample():
+    # Dois blocos: "Hello world" / "again" e "A & B"
+    return OCRResult.from_words(SIZE, [
+        ("Hello", (10, 10, 60, 30), 91.0, True, True),
+        ("world", (70, 10, 130, 30), 89.0, False, False),
+        ("", (0, 0, 0, 0), -1.0, False, True),
+        ("again", (10, 40, 70, 60), 80.0, False, False),
+        ("A", (10, 100, 20, 120), 95.0, True, True),
+        ("&", (25, 100, 35, 120), 50.0, False, False),
+        ("B", (40, 100, 50, 120), 95.0, False, False),
+    ])
+
+
+class OCRResultTest(unittest.TestCase):
+    def test_structure_and_text(self):
+        result = sample()
+        self.assertEqual(result.words, ["Hello", "world", "again", "A", "&", "B"])
+        self.assertEqual(result.structure(), [[(0, 2), (2, 3)], [(3, 6)]])
+        text, spans = result.compose()
+        self.assertEqual(text, "Hello world\nagain\n\nA & B")
+        self.assertEqual([text[a:b] for a, b in spans], ["Hello world", "again", "A & B"])
+        self.assertAlmostEqual(result.confidence, 500 / 6, places=3)
+
+    def test_boxes(self):
+        result = sample()
+        self.assertEqual(result.line_boxes().tolist(),
+                         [[10, 10, 130, 30], [10, 40, 70, 60], [10, 100, 50, 120]])
+        self.assertEqual(result.line_at(65, 20), 0)
+        self.assertEqual(result.line_at(30, 110), 2)
+        self.assertIsNone(result.line_at(200, 180))
+        moved = result.mapped((600, 400), scale=2.0, dy=5)
+        self.assertEqual(moved.size, (600, 400))
+        self.assertEqual(moved.boxes[0].tolist(), [20, 25, 120, 65])
+
+    def test_concat(self):
+        top = OCRResult.from_words(SIZE, [("one", (0, 0, 10, 10), 90.0, True, True),
+                                          ("two", (0, 20, 10, 30), 90.0, False, True)])
+        bottom = OCRResult.from_words(SIZE, [("three", (0, 0, 10, 10), 90.0, True, True)])
+        joined = OCRResult.concat([top, OCRResult.empty(SIZE), bottom.mapped(SIZE, dy=100)],
+                                  SIZE)
+        self.assertEqual(joined.text, "one\ntwo\n\nthree")
+        self.assertEqual(joined.line.tolist(), [0, 1, 2])
+        self.assertEqual(joined.block.tolist(), [0, 0, 1])
+        self.assertEqual(joined.boxes[2].tolist(), [0, 100, 10, 110])
+        self.assertEqual(OCRResult.concat([OCRResult.empty(SIZE)], SIZE).text, "")
+
+    def test_cache_round_trip(self):
+        result = sample()
+        again = OCRResult.from_cache(json.loads(json.dumps(result.to_cache())))
+        self.assertEqual(again.text, result.text)
+        self.assertEqual(again.boxes.tolist(), result.boxes.tolist())
+        self.assertEqual(again.structure(), result.structure())
+
+    def test_tsv(self):
+        rows = [row.split("\t") for row in sample().to_tsv().splitlines()]
+        self.assertEqual(rows[0][0], "level")
+        # Página, 2 x (bloco, parágrafo), 3 linhas e 6 palavras
+        self.assertEqual(len(rows) - 1, 1 + 4 + 3 + 6)
+        words = [row for row in rows[1:] if row[0] == "5"]
+        self.assertEqual(words[1][6:], ["70", "10", "60", "20", "89", "world"])
+
+    def test_hocr_and_json(self):
+        result = sample()
+        hocr = result.to_hocr()
+        self.assertIn('title="bbox 10 10 60 30; x_wconf 91">Hello</span>', hocr)
+        self.assertIn(">&amp;</span>", hocr)
+        self.assertEqual(hocr.count('class="ocr_line"'), 3)
+        data = result.to_json()
+        self.assertEqual(data["text"], result.text)
+        self.assertEqual([line["text"] for block in data["blocks"] for line in block["lines"]],
+                         ["Hello world", "again", "A & B"])
+        self.assertEqual(data["blocks"][1]["box"], (10, 100, 50, 120))
+
+    def test_export(self):
+        result = sample()
+        with tempfile.TemporaryDirectory() as directory:
+            for ext in (".txt", ".hocr", ".tsv", ".json"):
+                path = os.path.join(directory, "ocr" + ext)
+                export_ocr(result, path)
+                with open(path, encoding="utf-8") as f:
+                    self.assertTrue(f.read())
+            with open(os.path.join(directory, "ocr.json"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["text"], result.text)
+            with self.assertRaises(ValueError):
+                export_ocr(result, os.path.join(directory, "ocr.pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
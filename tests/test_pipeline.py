@@ -0,0 +1,166 @@
+# Testes do pipeline de captura sem Tesseract nem display: os blocos do OCR
+# em fluxo vêm prontos de um `ocr_block` falso.
+#
+#   python3 -m pytest tests
+import os
+import sys
+import queue
+import unittest
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import (DEFAULT_CONFIG, CaptureJob, OCRPipeline, OCRResult,
+                                   TranslationClient, ocr_cache_key, translation_cache_key)
+from PIL import Image
+
+SIZE = (400, 300)
+
+
+class InlineExecutor:
+    # Roda a tarefa na hora: todos os blocos já estão prontos no primeiro
+    # wait() do ocr_stream, no mesmo lote
+    def submit(self, func, *args):
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+def block_result(i):
+    return OCRResult.from_words(SIZE, [(f"bloco{i}", (10, 40 * i, 90, 40 * i + 30), 95.0,
+                                        True, True)])
+
+
+class FakeEngine:
+    # Texto fixo por captura; anota os pacotes pedidos
+    name = "falso"
+
+    def __init__(self):
+        self.text = ""
+        self.langs = []
+
+    def recognize(self, bw, lang):
+        self.langs.append(lang)
+        return OCRResult.from_words(bw.size, [(word, (0, 0, 10, 10), 95.0, False, False)
+                                              for word in self.text.split()])
+
+    def close(self):
+        pass
+
+
+class FakeTranslator:
+    class backend_class:
+        name = "falso"
+
+    memory = None
+    # Chamado a cada tradução (ex. o usuário trocando os destinos)
+    on_translate = None
+
+    def translate(self, text, dest, src):
+        if self.on_translate is not None:
+            self.on_translate()
+        return src, f"[{dest}] {text.upper()}"
+
+    def close(self):
+        pass
+
+
+class OCRAutoTest(unittest.TestCase):
+    def setUp(self):
+        config = dict(DEFAULT_CONFIG, ocr_lang="auto", ocr_adaptive=False, metrics_export="",
+                      target_langs=["es"])
+        self.engine = FakeEngine()
+        self.pipeline = OCRPipeline(FakeTranslator(), queue.Queue(), self.engine, {}, config)
+        self.addCleanup(self.pipeline.shutdown)
+
+    def capture(self, text):
+        self.engine.text = text
+        job = CaptureJob()
+        texto = self.pipeline.ocr(job, Image.new("L", SIZE, 255))
+        self.pipeline.translate(job, texto)
+        return job
+
+    def test_one_detection_per_capture(self):
+        self.capture("The quick brown fox jumps over the lazy dog and runs into the forest.")
+        # Idioma trocado: refeito com o pacote certo, ainda um "ocr" só
+        job = self.capture("Não foi possível salvar o arquivo porque a pasta está protegida "
+                           "contra gravação.")
+        self.assertEqual(self.engine.langs, ["por+eng", "eng", "por"])
+        self.assertEqual(job.language, "pt")
+        counts = {name: entry["count"] for name, entry in self.pipeline.metrics.snapshot().items()}
+        self.assertEqual((counts["ocr"], counts["deteccao"], counts["traducao"]), (2, 2, 2))
+
+
+class OCRStreamTest(unittest.TestCase):
+    def setUp(self):
+        config = dict(DEFAULT_CONFIG, ocr_lang="eng", metrics_export="", target_langs=["es"])
+        self.results = queue.Queue()
+        self.translator = FakeTranslator()
+        self.pipeline = OCRPipeline(self.translator, self.results, None, {}, config)
+        self.addCleanup(self.pipeline.shutdown)
+
+    def events(self, job):
+        found = []
+        while not self.results.empty():
+            kind, other, *payload = self.results.get_nowait()
+            if other is job:
+                found.append((kind, payload))
+        return found
+
+    def test_blocks_done_in_same_batch(self):
+        self.pipeline.ocr_executor = InlineExecutor()
+        job = CaptureJob(translate=False)
+        self.pipeline.ocr_stream(job, 4, SIZE, block_result)
+
+        events = self.events(job)
+        kinds = [kind for kind, _ in events]
+        self.assertNotIn("erro", kinds)
+        self.assertEqual(kinds.count("ocr_bloco"), 4)
+        self.assertEqual([payload for kind, payload in events if kind == "ocr"],
+                         [[job.ocr_text]])
+        self.assertEqual(job.ocr_text.split(), ["bloco0", "bloco1", "bloco2", "bloco3"])
+        self.assertEqual(self.pipeline.metrics.snapshot()["ocr"]["count"], 1)
+
+    def test_targets_changed_mid_stream(self):
+        # Destinos trocados depois do primeiro bloco traduzido, como faz
+        # apply_targets enquanto o OCR não terminou
+        self.pipeline.ocr_executor = InlineExecutor()
+        self.pipeline.translate_executor = InlineExecutor()
+        job = CaptureJob()
+
+        def retarget():
+            job.targets = ["fr", "de"]
+        self.translator.on_translate = retarget
+        self.pipeline.ocr_stream(job, 3, SIZE, block_result)
+
+        events = self.events(job)
+        # O bloco traduzido ainda para "es" não é exibido (a ordem dos
+        # blocos num mesmo lote do wait é qualquer)
+        shown = [payload[2] for kind, payload in events if kind == "traducao_bloco"]
+        self.assertEqual(len(shown), 2)
+        self.assertTrue(all(text.startswith("[fr] ") for text in shown))
+        full = job.ocr_text.upper()
+        self.assertEqual(job.translation, f"[FR]\n[fr] {full}\n\n[DE]\n[de] {full}")
+
+
+class TranslationCacheKeyTest(unittest.TestCase):
+    def test_source_and_backend_in_key(self):
+        key = translation_cache_key("Hello  world", "auto", "pt", "googletrans")
+        self.assertEqual(key, translation_cache_key("Hello world", "auto", "pt", "googletrans"))
+        self.assertNotEqual(key, translation_cache_key("Hello world", "en", "pt", "googletrans"))
+        self.assertNotEqual(key, translation_cache_key("Hello world", "auto", "pt", "argos"))
+
+
+class OCRCacheKeyTest(unittest.TestCase):
+    def test_engine_in_key(self):
+        img = Image.new("L", SIZE, 255)
+        key = ocr_cache_key(img, "eng", "tesserocr", "estruturado")
+        self.assertEqual(key, ocr_cache_key(img.copy(), "eng", "tesserocr", "estruturado"))
+        self.assertNotEqual(key, ocr_cache_key(img, "eng", "pytesseract", "estruturado"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# Camadas em disco: despejo do DiskCache e paginação/busca do histórico
+#
+#   python3 -m pytest tests
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import DiskCache, HistoryStore, fts_query
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        cache = DiskCache(self.path, "ocr", 1 << 20)
+        cache.put("k", {"text": "olá"}, 0.5)
+        self.assertEqual(cache.get("k"), ({"text": "olá"}, 0.5))
+        self.assertIsNone(cache.get("outra"))
+        cache.close()
+
+    def test_evicts_least_recently_used(self):
+        # Cada valor ocupa 12 bytes em JSON; cabem três
+        cache = DiskCache(self.path, "ocr", 36)
+        for key in "abc":
+            cache.put(key, "x" * 10, 1.0)
+        cache.get("a")
+        cache.put("d", "x" * 10, 1.0)
+        self.assertIsNone(cache.get("b"))
+        for key in "acd":
+            self.assertIsNotNone(cache.get(key))
+        cache.close()
+
+    def test_namespaces_are_separate(self):
+        ocr = DiskCache(self.path, "ocr", 12)
+        translation = DiskCache(self.path, "translation", 12)
+        ocr.put("k", "x" * 10, 1.0)
+        translation.put("k", "y" * 10, 1.0)
+        translation.put("j", "y" * 10, 1.0)
+        self.assertEqual(ocr.get("k"), ("x" * 10, 1.0))
+        self.assertIsNone(translation.get("k"))
+        ocr.close()
+        translation.close()
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = HistoryStore(os.path.join(self.tmp.name, "history.sqlite"))
+
+    def tearDown(self):
+        self.history.close()
+        self.tmp.cleanup()
+
+    def add(self, i, ocr, translation=""):
+        return self.history.add(f"hash{i}", (10, 10), b"", ocr, translation, {"ocr": 0.1})
+
+    def test_same_image_updates_entry(self):
+        first = self.add(1, "antigo")
+        self.assertEqual(self.add(1, "novo", "new"), first)
+        self.assertEqual(len(self.history), 1)
+        entry = self.history.get(first)
+        self.assertEqual((entry["count"], entry["ocr"]), (2, "novo"))
+        self.assertEqual(entry["timings"], {"ocr": 0.1})
+
+    def test_keyset_paging(self):
+        ids = [self.add(i, f"texto {i}") for i in range(7)]
+        seen, before = [], None
+        while True:
+            rows = self.history.page(before=before, limit=3)
+            if not rows:
+                break
+            seen.extend(row[0] for row in rows)
+            before = (rows[-1][1], rows[-1][0])
+        self.assertEqual(seen, ids[::-1])
+
+    def test_search(self):
+        kept = self.add(1, "arquivo salvo", "file saved")
+        self.add(2, "pasta protegida", "protected folder")
+        self.assertEqual([row[0] for row in self.history.page("arq")], [kept])
+        self.assertEqual([row[0] for row in self.history.page("saved")], [kept])
+        self.history.delete(kept)
+        self.assertEqual(self.history.page("arq"), [])
+
+    def test_fts_query_quotes_words(self):
+        self.assertEqual(fts_query('a "b" OR'), '"a"* """b"""* "OR"*')
+
+
+if __name__ == "__main__":
+    unittest.main()
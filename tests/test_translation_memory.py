@@ -0,0 +1,113 @@
+# Memória de tradução: reaproveitamento exato e com erros de OCR, sem
+# trocar o sentido da frase
+#
+#   python3 -m pytest tests
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OCRclipboardTranslate import TranslationMemory, fuzzy_form, ocr_variant, segment_text
+
+
+class TranslationMemoryTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "memory.sqlite3")
+        self.memory = self.open()
+
+    def open(self, **kwargs):
+        memory = TranslationMemory(self.path, **kwargs)
+        self.addCleanup(memory.close)
+        return memory
+
+    def add(self, source, target, src="en", backend="googletrans"):
+        self.memory.add([(source, "pt", "en", target)], src, backend)
+
+    def lookup(self, segment, src="en", backend="googletrans"):
+        return self.memory.lookup([segment], "pt", src, backend).get(segment)
+
+    def test_exact_and_ocr_noise(self):
+        self.add("Free disk space is running low.", "O espaço livre está acabando.")
+        self.assertEqual(self.lookup("Free disk space is running low."),
+                         ("en", "O espaço livre está acabando."))
+        self.assertEqual(self.lookup("Free disk space is rnnning l0w"),
+                         ("en", "O espaço livre está acabando."))
+        self.assertEqual(self.memory.stats(), {"hits_exact": 1, "hits_fuzzy": 1, "misses": 0})
+
+    def test_negation_not_reused(self):
+        self.add("The file could not be saved.", "O arquivo não pôde ser salvo.")
+        self.add("Do not delete the backup folder.", "Não exclua a pasta de backup.")
+        self.assertIsNone(self.lookup("The file could be saved."))
+        self.assertIsNone(self.lookup("Do delete the backup folder."))
+
+    def test_changed_words_not_reused(self):
+        self.add("The selected value is valid for this field.", "O valor é válido.")
+        self.add("Click the button in the toolbar.", "Clique no botão da barra.")
+        self.add("Free disk space: 12 GB of 256 GB.", "Espaço livre: 12 GB de 256 GB.")
+        self.assertIsNone(self.lookup("The selected value is invalid for this field."))
+        self.assertIsNone(self.lookup("Click the button on the toolbar."))
+        self.assertIsNone(self.lookup("Free disk space: 18 GB of 256 GB."))
+
+    def test_scoped_by_source_and_backend(self):
+        self.add("The download has finished.", "O download terminou.")
+        self.assertIsNone(self.lookup("The download has finished.", src="auto"))
+        self.assertIsNone(self.lookup("The download has finished.", backend="argos"))
+
+    def test_persisted_and_bounded(self):
+        self.add("The download has finished.", "O download terminou.")
+        self.add("The upload has finished.", "O envio terminou.")
+        self.memory.close()
+        memory = self.open(max_entries=1)
+        self.assertEqual(len(memory), 1)
+        self.assertEqual(memory.lookup(["The upload has finished."], "pt", "en", "googletrans"),
+                         {"The upload has finished.": ("en", "O envio terminou.")})
+
+    def test_old_schema_replaced(self):
+        self.memory.close()
+        os.remove(self.path)
+        db = sqlite3.connect(self.path)
+        db.execute("CREATE TABLE memory (dest TEXT, source TEXT, lang TEXT, target TEXT,"
+                   " used REAL, PRIMARY KEY (dest, source))")
+        db.execute("INSERT INTO memory VALUES ('pt', 'Old entry here.', 'en', 'Antiga.', 0)")
+        db.commit()
+        db.close()
+        self.memory = self.open()
+        self.assertEqual(len(self.memory), 0)
+        self.add("The download has finished.", "O download terminou.")
+        self.assertIsNotNone(self.lookup("The download has finished."))
+
+
+class OCRVariantTest(unittest.TestCase):
+    def check(self, a, b):
+        return ocr_variant(fuzzy_form(a), fuzzy_form(b))
+
+    def test_character_errors(self):
+        self.assertTrue(self.check("The modern interface", "The mod3rn interface"))
+        self.assertTrue(self.check("The modern interface", "The modem interface"))
+        self.assertTrue(self.check("all of the files", "a1l 0f the files"))
+
+    def test_word_changes(self):
+        self.assertFalse(self.check("could not be saved", "could be saved"))
+        self.assertFalse(self.check("não salve o arquivo", "salve o arquivo"))
+        self.assertFalse(self.check("file is valid", "file is invalid"))
+        self.assertFalse(self.check("click in the box", "click on the box"))
+        self.assertFalse(self.check("the system restarted", "the process restarted"))
+
+
+class SegmentTextTest(unittest.TestCase):
+    def test_sentences_and_wrapped_lines(self):
+        text = "First sentence here. Second one,\nwrapped here.\nNew line\n\nOther paragraph."
+        self.assertEqual(segment_text(text), [
+            [("", "First sentence here."), (" ", "Second one, wrapped here."),
+             ("\n", "New line")],
+            [("", "Other paragraph.")],
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()